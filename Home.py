@@ -1,4 +1,5 @@
 import streamlit as st
+from profiling import run_page
 
 # Set page config
 # st.set_page_config(
@@ -48,7 +49,7 @@ if not st.session_state.get('logged_in', False):
     }
 
 pg = st.navigation(pages)
-pg.run()
+run_page(pg)
 
 
 
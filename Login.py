@@ -1,6 +1,5 @@
 import streamlit as st
-import pyrebase
-from config import auth, db
+from config import auth
 from datetime import datetime
 
 
@@ -22,7 +21,6 @@ def login_user(email, password):
             st.session_state.admin = True
         else:
             st.session_state.admin = False
-        st.cache_data.clear()
         st.rerun()
     except Exception as e: # Catch generic Firebase errors or others
         st.error(f"Error de inicio de sesión: Usuario o contraseña incorrectos.")
@@ -0,0 +1,81 @@
+import logging
+import random
+import sys
+
+# Structured, level-gated logging for the app, replacing ad-hoc print() calls.
+# log_event() checks the logger's level before touching its fields, and the message is
+# only rendered ("event key=value ...") when a handler actually emits it, with every value
+# capped at max_chars. High-volume events pass sampled=True and are kept with probability
+# sample_rate. Loggers live under the "app" namespace and are set up by config.py.
+
+ROOT_LOGGER = 'app'
+
+_settings = {'sample_rate': 1.0, 'max_chars': 300}
+
+
+def configure(level='INFO', sample_rate: float = 1.0, max_chars: int = 300):
+    """
+    Set up the "app" loggers once per process.
+
+    Args:
+        level (str or int): Minimum level, e.g. 'DEBUG', 'INFO', 'WARNING'.
+        sample_rate (float): Fraction (0-1) of sampled events that are logged.
+        max_chars (int): Longest rendering of a single field value.
+    """
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+    _settings['sample_rate'] = min(max(float(sample_rate), 0.0), 1.0)
+    _settings['max_chars'] = int(max_chars)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a module, e.g. get_logger(__name__)."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def _render(value, max_chars: int) -> str:
+    if callable(value):
+        value = value()
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > max_chars:
+        text = f"{text[:max_chars]}...(+{len(text) - max_chars} chars)"
+    return text
+
+
+class _Event:
+    """A log message rendered on demand."""
+
+    __slots__ = ('event', 'fields')
+
+    def __init__(self, event: str, fields: dict):
+        self.event = event
+        self.fields = fields
+
+    def __str__(self):
+        max_chars = _settings['max_chars']
+        return " ".join([self.event] + [f"{key}={_render(value, max_chars)}" for key, value in self.fields.items()])
+
+
+def log_event(logger: logging.Logger, level: int, event: str, sampled: bool = False, exc_info=None, **fields):
+    """
+    Log a structured event.
+
+    Args:
+        logger (Logger): From get_logger().
+        level (int): logging.DEBUG, logging.INFO, ...
+        event (str): Short dotted event name, e.g. 'students.loaded'.
+        sampled (bool): Keep the event only with the configured sample_rate (for hot paths).
+        exc_info: Passed to the logger, e.g. True inside an except block.
+        **fields: Values to include. A callable is only called if the event is emitted,
+            so expensive summaries cost nothing when the level is disabled.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if sampled and random.random() >= _settings['sample_rate']:
+        return
+    logger.log(level, _Event(event, fields), exc_info=exc_info, extra={'event': event})
@@ -0,0 +1,182 @@
+import codecs
+import datetime
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+# Parsing of Teams attendance report CSVs ("Attendance report MM-DD-YY.csv").
+# Each file is decoded once with the encoding given by its BOM, read line by line up to
+# the end of the "2. Participants" section, and the files of a batch are parsed in a
+# worker pool. Nothing here touches Streamlit, so it is safe to run in worker threads;
+# the page reports progress and messages from the results.
+
+START_MARKER = "2. participants"
+END_MARKER = "3. in-meeting activities"
+DEFAULT_MAX_WORKERS = 4
+
+_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+
+def extract_date_from_filename(filename: str) -> datetime.date | None:
+    # Define patterns to match
+    patterns = [
+        r'(Informe de Asistencia )',
+        r'(Attendance report )'
+    ]
+
+    for pattern in patterns:
+        match_keyword = re.search(pattern, filename, re.IGNORECASE)
+        if match_keyword:
+            # Get the part after the matched keyword
+            date_str_candidate = filename[match_keyword.end():]
+
+            # Look for date pattern at the start
+            match_date = re.match(r'(\d{1,2})-(\d{1,2})-(\d{2})', date_str_candidate)
+            if match_date:
+                month, day, year_short = map(int, match_date.groups())
+                year = 2000 + year_short
+                try:
+                    return datetime.date(year, month, day)
+                except ValueError:
+                    return None
+    return None
+
+
+def detect_encoding(file_bytes: bytes) -> str:
+    """
+    Pick the encoding of a report from its byte order mark.
+
+    Teams exports UTF-16 with a BOM; files re-saved by other tools are usually UTF-8.
+    Without a BOM, NUL bytes in the first line mean UTF-16 (little endian), bytes that
+    are valid UTF-8 mean UTF-8, and anything else is read as cp1252.
+    """
+    for bom, encoding in _BOMS:
+        if file_bytes.startswith(bom):
+            return encoding
+    head = file_bytes[:4096]
+    if b'\x00' in head:
+        return 'utf-16-le' if head[1:2] == b'\x00' else 'utf-16-be'
+    try:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the end of the sample is still UTF-8
+        return 'utf-8' if e.start >= len(head) - 3 else 'cp1252'
+
+
+def iter_lines(file_bytes: bytes, encoding: str):
+    """Decode the file lazily, one line at a time."""
+    stream = io.TextIOWrapper(io.BytesIO(file_bytes), encoding=encoding, newline=None)
+    for line in stream:
+        yield line.rstrip('\n')
+
+
+def participant_names(lines) -> tuple:
+    """
+    Extract the unique attendee names from the "2. Participants" section.
+
+    Args:
+        lines: Iterable of report lines; it is consumed only up to the end of the section.
+
+    Returns:
+        tuple: (list of names, error message or None)
+    """
+    section = None
+    for line in lines:
+        line_stripped_lower = line.strip().lower()
+        if section is None:
+            if line_stripped_lower.startswith(START_MARKER):
+                section = []
+            continue
+        if line_stripped_lower.startswith(END_MARKER):
+            break
+        section.append(line)
+
+    if section is None:
+        return [], "No se pudo encontrar el marcador de sección '2. Participants'."
+    if not section:
+        return [], "No se encontraron líneas de datos entre '2. Participantes' y '3. Actividades en la reunión' (o fin de archivo)."
+
+    header_row_index = -1
+    for i, line in enumerate(section):
+        line_norm = line.strip().lower()
+        if "name" in line_norm and ("first join" in line_norm or "last leave" in line_norm or "email" in line_norm or "duration" in line_norm):
+            header_row_index = i
+            break
+    if header_row_index == -1:
+        return [], "No se pudo encontrar la fila de encabezado."
+
+    try:
+        df = pd.read_csv(io.StringIO("\n".join(section[header_row_index:])), sep='\t')
+    except pd.errors.EmptyDataError:
+        return [], "No se pudieron analizar filas de datos del contenido CSV. El encabezado identificado podría haber sido la última línea o los datos estaban vacíos."
+    except Exception as e:
+        return [], f"Error analizando datos CSV de la sección 'Participantes': {e}"
+
+    df.columns = [str(col).strip().lower() for col in df.columns]
+    if "name" not in df.columns:
+        return [], f"Columna 'nombre' no encontrada después del análisis. Columnas encontradas: {df.columns.tolist()}"
+    return df["name"].astype(str).str.strip().unique().tolist(), None
+
+
+def parse_report(filename: str, file_bytes: bytes) -> dict:
+    """
+    Parse one uploaded report.
+
+    Returns:
+        dict: {'filename', 'date' (datetime.date or None), 'encoding', 'names' (list),
+        'error' (Spanish message or None)}.
+    """
+    result = {'filename': filename, 'date': extract_date_from_filename(filename), 'encoding': None, 'names': [], 'error': None}
+    if result['date'] is None:
+        result['error'] = "Sin fecha en el nombre del archivo"
+        return result
+
+    result['encoding'] = detect_encoding(file_bytes)
+    try:
+        result['names'], result['error'] = participant_names(iter_lines(file_bytes, result['encoding']))
+    except UnicodeDecodeError:
+        result['error'] = f"Falló la decodificación ({result['encoding']})"
+    return result
+
+
+def ingest_reports(files, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None) -> tuple:
+    """
+    Parse a batch of reports concurrently.
+
+    Args:
+        files: Iterable of (filename, file bytes).
+        max_workers (int): Size of the worker pool.
+        on_progress (callable, optional): Called as on_progress(done, total, result) from the
+            calling thread after each file finishes, in completion order.
+
+    Returns:
+        tuple: ({date: set of names} merged across files, list of per-file results in input order)
+    """
+    files = list(files)
+    results = [None] * len(files)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files) or 1))) as executor:
+        futures = {executor.submit(parse_report, name, data): i for i, (name, data) in enumerate(files)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            position = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'filename': files[position][0], 'date': None, 'encoding': None, 'names': [], 'error': str(e)}
+            results[position] = result
+            if on_progress is not None:
+                on_progress(done, len(files), result)
+
+    names_by_date = {}
+    for result in results:
+        if result['names']:
+            names_by_date.setdefault(result['date'], set()).update(result['names'])
+    return names_by_date, results
@@ -0,0 +1,215 @@
+import pandas as pd
+import numpy as np
+
+# Boolean attendance matrix helpers shared by the attendance reports.
+# Rows are normalized student keys, columns are 'YYYY-MM-DD' date strings.
+
+
+def normalize_student_key(name) -> str:
+    """Return the key used to match a student across roster and attendance records."""
+    return str(name).strip().lower()
+
+
+def normalize_student_keys(names: pd.Series) -> pd.Series:
+    """Vectorized version of normalize_student_key for a Series of names."""
+    return names.astype(str).str.strip().str.lower()
+
+
+def attendance_records_to_dict(raw_data) -> dict:
+    """
+    Normalize the raw attendance payload of a single day into a dict keyed by student name.
+
+    Args:
+        raw_data: Value stored at attendance/<user>/<date>; a list of
+            {'Nombre': ..., 'Presente': ...} records or an older dict keyed by name.
+
+    Returns:
+        dict: {student name: record}, or an empty dict if there is no usable data.
+    """
+    if isinstance(raw_data, list):
+        # Convert list of records to a dictionary keyed by student name
+        processed_data = {}
+        for record in raw_data:
+            if isinstance(record, dict) and 'Nombre' in record:
+                # Ensure we don't overwrite if names aren't unique, though they should be per day
+                processed_data[record['Nombre']] = record
+        return processed_data
+    elif isinstance(raw_data, dict):
+        # If it's already a dict (e.g., older data or different save format), return as is
+        return raw_data
+    # No data or unexpected type
+    return {}
+
+
+# Bump when the meaning of attendance_stats/<user>/<date> changes; older entries are ignored
+ATTENDANCE_STATS_VERSION = 2
+
+
+def attendance_day_stats(raw_data) -> dict:
+    """
+    Compact aggregate of one day's attendance, stored at attendance_stats/<user>/<date>.
+
+    Names are matched like in build_attendance_matrix: duplicates that normalize to the
+    same key count once, as present if any of them is. The present keys are stored rather
+    than a count so reports can restrict them to the current roster (see stats_attendance_matrix).
+
+    Args:
+        raw_data: The day's payload (see attendance_records_to_dict).
+
+    Returns:
+        dict: {'present_keys': sorted normalized keys, 'total': int, 'version': ATTENDANCE_STATS_VERSION}
+    """
+    present_by_key = {}
+    for name, details in attendance_records_to_dict(raw_data).items():
+        present = bool(details.get('Presente', False)) if isinstance(details, dict) else bool(details)
+        key = normalize_student_key(name)
+        present_by_key[key] = present_by_key.get(key, False) or present
+    return {
+        'present_keys': sorted(key for key, present in present_by_key.items() if present),
+        'total': len(present_by_key),
+        'version': ATTENDANCE_STATS_VERSION,
+    }
+
+
+def stats_attendance_matrix(stats_by_date: dict) -> pd.DataFrame:
+    """
+    Build the boolean students × dates matrix from attendance_stats entries instead of
+    the full records.
+
+    Only students present on some day get a row; reindexed to the roster (absent students
+    filled with False) it equals the matrix of build_attendance_matrix.
+
+    Args:
+        stats_by_date (dict): {'YYYY-MM-DD': attendance_day_stats(...)}.
+
+    Returns:
+        DataFrame: Boolean matrix indexed by normalized student key with one sorted column per date.
+    """
+    dates = sorted(stats_by_date)
+    keys = sorted({key for stats in stats_by_date.values() for key in (stats.get('present_keys') or [])})
+    matrix = pd.DataFrame(False, index=pd.Index(keys, dtype=object), columns=dates)
+    for date_str in dates:
+        present_keys = stats_by_date[date_str].get('present_keys') or []
+        if present_keys:
+            matrix.loc[present_keys, date_str] = True
+    return matrix
+
+
+def build_attendance_matrix(records_by_date: dict) -> pd.DataFrame:
+    """
+    Turn raw attendance payloads into a boolean students × dates matrix.
+
+    Args:
+        records_by_date (dict): {'YYYY-MM-DD': raw day payload} as read from attendance/<user>/.
+
+    Returns:
+        DataFrame: Boolean matrix indexed by normalized student key with one sorted column
+        per date. Students missing from a day's records are absent that day.
+    """
+    names = []
+    dates = []
+    present = []
+    for date_str, day_data in (records_by_date or {}).items():
+        for name, details in attendance_records_to_dict(day_data).items():
+            names.append(name)
+            dates.append(date_str)
+            present.append(bool(details.get('Presente', False)) if isinstance(details, dict) else bool(details))
+
+    if not names:
+        return pd.DataFrame(dtype=bool)
+
+    long_df = pd.DataFrame({
+        'key': normalize_student_keys(pd.Series(names)),
+        'date': dates,
+        'present': present
+    })
+    # Duplicate names that normalize to the same key count as present if any of them is
+    matrix = long_df.pivot_table(index='key', columns='date', values='present', aggfunc='max', fill_value=False)
+    matrix = matrix.astype(bool)
+    matrix.columns.name = None
+    matrix.index.name = None
+    return matrix[sorted(matrix.columns)]
+
+
+def daily_counts(matrix: pd.DataFrame, roster_size: int = None) -> pd.DataFrame:
+    """
+    Count present and absent students per date.
+
+    Args:
+        matrix (DataFrame): Boolean attendance matrix.
+        roster_size (int, optional): Number of registered students. Defaults to the
+            number of rows in the matrix.
+
+    Returns:
+        DataFrame: Indexed by date with integer 'present' and 'absent' columns.
+    """
+    total = len(matrix.index) if roster_size is None else roster_size
+    present = matrix.sum(axis=0).astype(int)
+    return pd.DataFrame({'present': present, 'absent': total - present})
+
+
+def _run_lengths(values: np.ndarray) -> np.ndarray:
+    """Length of the run of True values ending at each cell, computed along axis 1."""
+    if values.size == 0:
+        return np.zeros(values.shape, dtype=int)
+    counts = np.cumsum(values, axis=1)
+    # Cumulative count at the most recent False cell, carried forward
+    resets = np.maximum.accumulate(np.where(values, 0, counts), axis=1)
+    return counts - resets
+
+
+def student_summary(matrix: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-student attendance rate and streaks over the matrix columns.
+
+    Returns:
+        DataFrame: Indexed by student key with 'days_present', 'attendance_rate' (0..1),
+        'longest_present_streak', 'longest_absent_streak' and 'current_absent_streak'.
+    """
+    values = matrix.to_numpy(dtype=bool)
+    num_dates = values.shape[1]
+    present_runs = _run_lengths(values)
+    absent_runs = _run_lengths(~values)
+    days_present = values.sum(axis=1)
+
+    return pd.DataFrame({
+        'days_present': days_present,
+        'attendance_rate': days_present / num_dates if num_dates else np.zeros(len(values)),
+        'longest_present_streak': present_runs.max(axis=1) if num_dates else 0,
+        'longest_absent_streak': absent_runs.max(axis=1) if num_dates else 0,
+        'current_absent_streak': absent_runs[:, -1] if num_dates else 0,
+    }, index=matrix.index)
+
+
+def never_attended(matrix: pd.DataFrame, roster_keys) -> pd.Index:
+    """
+    Roster students with no 'present' mark in the matrix.
+
+    Args:
+        matrix (DataFrame): Boolean attendance matrix.
+        roster_keys: Normalized keys of every registered student.
+
+    Returns:
+        Index: Sorted keys of students that never attended.
+    """
+    attended = matrix.index[matrix.any(axis=1)] if not matrix.empty else pd.Index([])
+    return pd.Index(roster_keys).unique().difference(attended).sort_values()
+
+
+def build_contact_index(students_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Index the roster by normalized student key for one-shot contact lookups.
+
+    Returns:
+        DataFrame: 'nombre', 'fecha_inicio', 'telefono' and 'email' indexed by student key.
+        When several rows share a key the first one wins.
+    """
+    columns = ['nombre', 'fecha_inicio', 'telefono', 'email']
+    contacts = students_df.reindex(columns=columns).copy()
+    contacts.index = normalize_student_keys(students_df['nombre'])
+    return contacts[~contacts.index.duplicated(keep='first')]
+
+
+def join_contact_info(keys, contact_index: pd.DataFrame) -> pd.DataFrame:
+    """Look up contact info for the given student keys; unknown keys get NaN values."""
+    return contact_index.reindex(pd.Index(keys))
@@ -0,0 +1,87 @@
+"""
+Compare the old per-cell student serializer with serialization.dataframe_to_records.
+
+Usage:
+    python benchmarks/bench_serialization.py [--sizes 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serialization import dataframe_to_records  # noqa: E402
+
+
+def legacy_records(students_df: pd.DataFrame) -> list:
+    """The iterrows serializer save_students/admin_save_students used before."""
+    df = students_df.copy()
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype('object').where(df[col].notna(), None)
+        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d')
+        else:
+            df[col] = df[col].fillna('').astype(str).str.strip()
+
+    records = []
+    for _, row in df.iterrows():
+        record = {}
+        for key, value in row.items():
+            if pd.isna(value) or value is None or value == '':
+                record[key] = None
+            else:
+                record[key] = str(value) if not isinstance(value, (int, float, bool, str)) else value
+        records.append(record)
+    return records
+
+
+def make_students(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic roster with the columns and null patterns of students/<course>/data."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-08') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D')
+    phones = pd.Series(rng.integers(3050000000, 3059999999, rows).astype(str))
+    phones[rng.random(rows) < 0.2] = None
+    return pd.DataFrame({
+        'nombre': [f"  Estudiante {i} " for i in range(rows)],
+        'email': [f"estudiante{i}@example.com" if i % 7 else '' for i in range(rows)],
+        'canvas_id': rng.integers(10000, 99999, rows).astype(float),
+        'telefono': phones,
+        'modulo': rng.choice(['Introducción', 'Redes', 'Bases de Datos', None], rows),
+        'ciclo': rng.integers(1, 4, rows),
+        'fecha_inicio': start,
+        'fecha_fin': start + pd.Timedelta(weeks=12),
+    })
+
+
+def best_of(func, df: pd.DataFrame, repeat: int) -> float:
+    """Fastest wall time in seconds over repeat runs."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for rows in args.sizes:
+        df = make_students(rows)
+        if legacy_records(df.head(200)) != dataframe_to_records(df.head(200)):
+            raise SystemExit("Vectorized output differs from the legacy serializer")
+        legacy = best_of(legacy_records, df, args.repeat)
+        vectorized = best_of(dataframe_to_records, df, args.repeat)
+        print(f"{rows:>8} {legacy:>12.4f} {vectorized:>15.4f} {legacy / vectorized:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
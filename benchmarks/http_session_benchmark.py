@@ -0,0 +1,192 @@
+"""
+Compare a new connection per Realtime Database call, pyrebase's default session and the tuned one.
+
+Usage:
+    python benchmarks/http_session_benchmark.py [--calls 20] [--rtt-ms 30] [--threads 16] [--output http.json]
+
+A local HTTPS stand-in for the database (self-signed certificate made with the openssl
+CLI) answers GET /<path>.json with a JSON payload over HTTP/1.1 keep-alive. Each new
+connection waits two simulated round trips (TCP + TLS) and each request one, on top of
+the real local TLS handshake, and the server counts the connections it accepted. pyrebase
+already shares one session between auth() and database(), so sequential calls through either
+session open one connection; the tuned pool only differs when more threads than pyrebase's
+10 pooled connections call at once.
+"""
+import argparse
+import datetime
+import gzip
+import json
+import os
+import platform
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+from requests.adapters import HTTPAdapter  # noqa: E402
+from http_session import build_session  # noqa: E402
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, rtt: float, payload: bytes):
+        super().__init__(address, StandInHandler)
+        self.rtt = rtt
+        self.payload = payload
+        self.compressed = gzip.compress(payload)
+        self.connections = 0
+        self._count_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._count_lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        time.sleep(2 * self.server.rtt)  # TCP + TLS handshake
+
+    def do_GET(self):
+        time.sleep(self.server.rtt)
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = self.server.compressed if use_gzip else self.server.payload
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def self_signed_certificate(directory: str) -> tuple:
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-subj', '/CN=localhost',
+                    '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1', '-days', '1',
+                    '-keyout', key, '-out', cert], check=True, capture_output=True)
+    return cert, key
+
+
+def start_server(cert: str, key: str, rtt: float, payload: bytes) -> StandInServer:
+    server = StandInServer(('127.0.0.1', 0), rtt, payload)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed_calls(get, urls: list, threads: int = 1) -> list:
+    def call(url):
+        started = time.perf_counter()
+        response = get(url)
+        response.raise_for_status()
+        response.json()
+        return time.perf_counter() - started
+
+    if threads == 1:
+        return [call(url) for url in urls]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(call, urls))
+
+
+def run(args) -> dict:
+    payload = json.dumps({f"student{i}": {'nombre': f"Estudiante {i}", 'Presente': i % 3 != 0}
+                          for i in range(args.payload_records)}).encode('utf-8')
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = self_signed_certificate(directory)
+        server = start_server(cert, key, args.rtt_ms / 1000, payload)
+        base = f"https://127.0.0.1:{server.server_address[1]}"
+        urls = [f"{base}/attendance/curso01@iti,edu/{i}.json" for i in range(args.calls)]
+
+        def fresh_connection(url):
+            with requests.Session() as session:
+                return session.get(url, verify=cert, headers={'Connection': 'close'})
+
+        # What pyrebase.initialize_app builds: requests' default pool of 10 per host
+        default = requests.Session()
+        default.mount('https://', HTTPAdapter(max_retries=3))
+        default.verify = cert
+        shared = build_session(pool_size=args.pool_size, gzip=args.gzip)
+        shared.verify = cert
+
+        cases = {
+            'new_connection_per_call': (fresh_connection, 1),
+            'pyrebase_session': (default.get, 1),
+            'pyrebase_session_threads': (default.get, args.threads),
+            'shared_session': (shared.get, 1),
+            'shared_session_threads': (shared.get, args.threads),
+        }
+        results = {}
+        for name, (get, threads) in cases.items():
+            before = server.connections
+            started = time.perf_counter()
+            timings = timed_calls(get, urls, threads)
+            wall = time.perf_counter() - started
+            results[name] = {
+                'calls': len(timings),
+                'threads': threads,
+                'wall_s': round(wall, 6),
+                'median_call_ms': round(statistics.median(timings) * 1000, 3),
+                'max_call_ms': round(max(timings) * 1000, 3),
+                'connections_opened': server.connections - before,
+            }
+        default.close()
+        shared.close()
+        server.shutdown()
+
+    return {
+        'generated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {
+            'calls': args.calls,
+            'rtt_ms': args.rtt_ms,
+            'threads': args.threads,
+            'pool_size': args.pool_size,
+            'gzip': args.gzip,
+            'payload_bytes': len(payload),
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--rtt-ms', type=float, default=30, help="Simulated network round trip")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--pool-size', type=int, default=20)
+    parser.add_argument('--payload-records', type=int, default=200)
+    parser.add_argument('--no-gzip', dest='gzip', action='store_false')
+    parser.add_argument('--output', help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
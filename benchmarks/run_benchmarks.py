@@ -0,0 +1,234 @@
+"""
+Time the app's hot paths against a synthetic school on the local database backend.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--courses 30 --students 200 --years 2 --modules 12]
+        [--repeat 5] [--latency-ms 0] [--output results.json]
+
+Each case is timed cold (its st.cache_data entry cleared first) unless its name says warm.
+Results are written as JSON (to stdout without --output) so runs can be compared release
+to release. Needs the app's dependencies (streamlit, pandas) but no Firebase project.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Select the in-memory backend before config creates the database
+os.environ['DATABASE_BACKEND'] = 'local'
+os.environ['LOCAL_DB_PATH'] = ''
+os.environ['LOCAL_DB_LATENCY_MS'] = '0'
+# Time the database itself, without the per-call instrumentation
+os.environ['DB_METRICS'] = '0'
+# Only warnings and errors from the app's log events, so logging is not part of the timings
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import streamlit as st  # noqa: E402
+import config  # noqa: E402
+import utils  # noqa: E402
+import utils_admin  # noqa: E402
+from module_schedule import find_anchor, schedule_modules, changed_dates  # noqa: E402
+from synthetic_data import generate_tree, course_key  # noqa: E402
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def timed(func, setup=None, repeat: int = 5) -> dict:
+    """Run setup (untimed) and func repeat times."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        'runs': repeat,
+        'min_s': round(min(timings), 6),
+        'median_s': round(statistics.median(timings), 6),
+        'max_s': round(max(timings), 6),
+    }
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def module_rows(course: str) -> list:
+    """A course's modules as module_schedule inputs, read like the admin page does."""
+    raw = config.db.child("modules").child(course).get().val() or {}
+    return [
+        {
+            'id': key,
+            'order': module.get('credits'),
+            'duration_weeks': module.get('duration_weeks'),
+            'start': _date(module.get('fecha_inicio_1')),
+            'end': _date(module.get('fecha_fin_1')),
+        }
+        for key, module in raw.items()
+    ]
+
+
+def module_cascade(course: str, today: datetime.date):
+    """Recalcular las fechas: read modules and breaks, schedule, write the changed dates."""
+    utils_admin.load_break_calendar_version.clear()
+    modules = module_rows(course)
+    anchor = find_anchor(modules, today)
+    if anchor is None:
+        raise SystemExit(f"No module of {course} contains {today}")
+    schedule = schedule_modules(modules, anchor, utils_admin.load_break_calendar())
+    utils_admin.admin_save_module_dates(course, changed_dates(modules, schedule))
+
+
+def shift_modules(course: str, today: datetime.date):
+    """Move every module but the current one a day later, so the cascade has dates to rewrite."""
+    modules = module_rows(course)
+    anchor = find_anchor(modules, today)
+    config.db.child("modules").child(course).update({
+        f"{module['id']}/fecha_inicio_1": (module['start'] + datetime.timedelta(days=1)).isoformat()
+        for module in modules if module['id'] != anchor and module['start'] is not None
+    })
+
+
+def run(args) -> dict:
+    today = datetime.date.today()
+    started = time.perf_counter()
+    tree = generate_tree(args.courses, args.students, args.years, args.modules, args.attendance_courses, today=today)
+    generate_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    config.db.set(tree)
+    del tree
+    load_s = time.perf_counter() - started
+    config.db.latency = args.latency_ms / 1000
+
+    course = course_key(1)
+    st.session_state.email = course.replace(',', '.')
+    students_lu = utils.get_last_updated('students')
+    attendance_lu = utils.get_last_updated('attendance', course)
+    modules_lu = utils.get_last_updated('modules', course)
+    history_start = today - datetime.timedelta(days=365 * args.years)
+    month_start = today - datetime.timedelta(days=30)
+
+    students_df, _ = utils.load_students(students_lu)
+    if students_df is None:
+        raise SystemExit("load_students returned no data; the synthetic tree was not loaded")
+    search_term = students_df['nombre'].iloc[0].split()[1][:4]
+
+    def clear_student_report():
+        utils.get_module_on_date.clear()
+        utils.load_students.clear()
+
+    def edit_one_student():
+        edited = students_df.copy()
+        edited.loc[edited.index[0], 'telefono'] = str(time.time_ns())[-10:]
+        utils.save_students_changes(students_df, edited)
+
+    cases = {
+        'load_students': dict(
+            setup=utils.load_students.clear,
+            func=lambda: utils.load_students(students_lu)),
+        'get_attendance_dates': dict(
+            setup=utils.get_attendance_dates.clear,
+            func=lambda: utils.get_attendance_dates(attendance_lu)),
+        'reportes_range_month': dict(
+            setup=utils.load_attendance_range.clear,
+            func=lambda: utils.load_attendance_range(month_start, today, attendance_lu)),
+        'reportes_range_full_history': dict(
+            setup=utils.load_attendance_range.clear,
+            func=lambda: utils.load_attendance_range(history_start, today, attendance_lu)),
+        'reportes_summary_stats_month': dict(
+            setup=utils.load_attendance_stats_range.clear,
+            func=lambda: utils.load_attendance_stats_range(month_start, today, attendance_lu)),
+        'admin_get_student_group_emails': dict(
+            setup=utils.load_course_keys.clear,
+            func=utils_admin.admin_get_student_group_emails),
+        'find_students_cold_index': dict(
+            setup=utils_admin.get_student_search_index.clear,
+            func=lambda: utils_admin.find_students(search_term, status="all")),
+        'find_students_warm': dict(
+            setup=None,
+            func=lambda: utils_admin.find_students(search_term, status="in_progress")),
+        'student_report_reads_sequential': dict(
+            setup=clear_student_report,
+            func=lambda: (utils.get_module_on_date(course, modules_lu), utils.load_students(students_lu))),
+        'student_report_reads_parallel': dict(
+            setup=clear_student_report,
+            func=lambda: utils.fetch_parallel(lambda: utils.get_module_on_date(course, modules_lu),
+                                              lambda: utils.load_students(students_lu))),
+        'module_cascade': dict(
+            setup=lambda: shift_modules(course, today),
+            func=lambda: module_cascade(course, today)),
+        'save_students_full': dict(
+            setup=None,
+            func=lambda: utils.save_students(students_df)),
+        'save_students_one_edit': dict(
+            setup=None,
+            func=edit_one_student),
+    }
+
+    selected = args.only or list(cases)
+    results = {name: timed(cases[name]['func'], cases[name]['setup'], args.repeat) for name in selected}
+
+    return {
+        'generated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {
+            'courses': args.courses,
+            'students': args.students,
+            'years': args.years,
+            'modules': args.modules,
+            'attendance_courses': args.attendance_courses,
+            'repeat': args.repeat,
+            'latency_ms': args.latency_ms,
+        },
+        'setup': {'generate_s': round(generate_s, 3), 'load_s': round(load_s, 3)},
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--courses', type=int, default=30)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--modules', type=int, default=12)
+    parser.add_argument('--attendance-courses', type=int, default=None,
+                        help="Only the first N courses get attendance (all by default)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help="Delay added to every database request")
+    parser.add_argument('--only', nargs='+', help="Run only these cases")
+    parser.add_argument('--output', help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
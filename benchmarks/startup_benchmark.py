@@ -0,0 +1,142 @@
+"""
+Measure the import cost of the app's entry points in fresh interpreters.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--repeat 5] [--backend local] [--rev HEAD~1] [--output startup.json]
+
+Every case runs in a new Python process, the way a container cold start or a new worker
+does. streamlit is imported first and timed separately, then the case's own imports (and
+requests) are timed and the heavy modules they pulled in are listed. With --rev the same
+cases are also run against that git revision (extracted with git archive), so the JSON
+shows before/after numbers side by side.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['pandas', 'numpy', 'pyrebase', 'requests', 'utils', 'utils_admin']
+
+# What each case does after `import streamlit`
+CASES = {
+    # Home.py + Login.py: navigation, profiling and the auth client
+    'login_page': "import config, profiling\nfrom config import auth",
+    # The first database request of a session creates the client
+    'first_db_request': "import config\nconfig.db.child('metadata').child('students').get()",
+    # A data page: the utils modules and everything they import
+    'data_page': "import utils, utils_admin",
+}
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import streamlit
+streamlit_s = time.perf_counter() - started
+before = set(sys.modules)
+started = time.perf_counter()
+exec({code!r})
+case_s = time.perf_counter() - started
+print(json.dumps({{
+    'streamlit_s': streamlit_s,
+    'case_s': case_s,
+    'loaded': sorted(name for name in {heavy!r} if name in sys.modules and name not in before),
+}}))
+"""
+
+
+def git_commit(rev: str = 'HEAD') -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', rev], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def export_revision(rev: str, target: str):
+    """Extract the tree of rev into target, plus the local secrets if there are any."""
+    archive = subprocess.run(['git', 'archive', rev], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', target], input=archive, check=True)
+    secrets = os.path.join(ROOT, '.streamlit', 'secrets.toml')
+    if os.path.exists(secrets):
+        os.makedirs(os.path.join(target, '.streamlit'), exist_ok=True)
+        shutil.copy(secrets, os.path.join(target, '.streamlit', 'secrets.toml'))
+
+
+def run_case(root: str, code: str, env: dict) -> dict:
+    script = PROBE.format(root=root, code=code, heavy=HEAVY_MODULES)
+    completed = subprocess.run([sys.executable, '-c', script], cwd=root, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'failed'}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: list) -> dict:
+    if any('error' in sample for sample in samples):
+        return {'error': next(sample['error'] for sample in samples if 'error' in sample)}
+    case = [sample['case_s'] for sample in samples]
+    return {
+        'runs': len(samples),
+        'min_s': round(min(case), 6),
+        'median_s': round(statistics.median(case), 6),
+        'max_s': round(max(case), 6),
+        'streamlit_median_s': round(statistics.median(sample['streamlit_s'] for sample in samples), 6),
+        'loaded': samples[-1]['loaded'],
+    }
+
+
+def run_tree(root: str, args, env: dict) -> dict:
+    selected = args.only or list(CASES)
+    return {name: summarize([run_case(root, CASES[name], env) for _ in range(args.repeat)]) for name in selected}
+
+
+def run(args) -> dict:
+    env = dict(os.environ)
+    env['DATABASE_BACKEND'] = args.backend
+    env.setdefault('LOCAL_DB_PATH', '')
+    env.setdefault('PYTHONDONTWRITEBYTECODE', '1')
+
+    results = {'current': run_tree(ROOT, args, env)}
+    if args.rev:
+        with tempfile.TemporaryDirectory() as tree:
+            export_revision(args.rev, tree)
+            results['baseline'] = run_tree(tree, args, env)
+
+    return {
+        'generated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'baseline_commit': git_commit(args.rev) if args.rev else None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {'repeat': args.repeat, 'backend': args.backend},
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--backend', default='local', help="DATABASE_BACKEND for the runs (firebase needs secrets)")
+    parser.add_argument('--rev', help="Also measure this git revision, e.g. HEAD~1")
+    parser.add_argument('--only', nargs='+', choices=list(CASES), help="Run only these cases")
+    parser.add_argument('--output', help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Synthetic Firebase tree for a school, in the shape documented at the bottom of utils_admin.py.
+
+Usage:
+    python benchmarks/synthetic_data.py --output school.json [--courses 30 --students 200 --years 2 --modules 12]
+
+The JSON can be used with the local backend (DATABASE_BACKEND=local LOCAL_DB_PATH=school.json).
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance_matrix import attendance_day_stats  # noqa: E402
+
+FIRST_NAMES = ['Samantha', 'Carlos', 'Ana', 'Luis', 'María', 'José', 'Lucía', 'Pedro', 'Sofía', 'Miguel',
+               'Valentina', 'Andrés', 'Camila', 'Jorge', 'Isabel', 'Diego', 'Paula', 'Ricardo', 'Elena', 'Tomás']
+LAST_NAMES = ['Perez', 'Rodriguez', 'Gómez', 'Martínez', 'López', 'Hernández', 'Díaz', 'Torres', 'Ramírez',
+              'Flores', 'Rivera', 'Morales', 'Ortiz', 'Castillo', 'Núñez', 'Vargas', 'Rojas', 'Mendoza']
+MODULE_NAMES = ['Introducción a la Computación', 'Quickbooks I', 'Quickbooks II', 'Excel Básico', 'Excel Avanzado',
+                'Redes', 'Bases de Datos', 'Contabilidad I', 'Contabilidad II', 'Inglés Técnico', 'Servicio al Cliente',
+                'Nómina', 'Programación I', 'Programación II', 'Seguridad Informática', 'Proyecto Final']
+
+
+def course_key(number: int) -> str:
+    """Firebase key of the n-th course, e.g. 'curso01@iti,edu'."""
+    return f"curso{number:02d}@iti,edu"
+
+
+def _monday(date: datetime.date) -> datetime.date:
+    return date - datetime.timedelta(days=date.weekday())
+
+
+def generate_tree(courses: int = 30, students: int = 200, years: int = 2, modules: int = 12,
+                  attendance_courses: int = None, today: datetime.date = None, seed: int = 0) -> dict:
+    """
+    Build a synthetic students/attendance/attendance_stats/modules/breaks/metadata tree.
+
+    Args:
+        courses (int): Number of courses (tenants).
+        students (int): Students per course.
+        years (int): Years of weekday attendance, ending today.
+        modules (int): Modules per course, scheduled back to back.
+        attendance_courses (int, optional): Only the first N courses get attendance; all by default.
+        today (datetime.date, optional): Reference date; defaults to today.
+        seed (int): Random seed, so runs are comparable.
+
+    Returns:
+        dict: The tree as a Firebase JSON export.
+    """
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    first_day = today - datetime.timedelta(days=365 * years)
+    now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    attendance_courses = courses if attendance_courses is None else min(attendance_courses, courses)
+
+    class_days = [first_day + datetime.timedelta(days=i) for i in range((today - first_day).days + 1)]
+    class_days = [day for day in class_days if day.weekday() < 5]
+
+    # Two one-week breaks per year
+    breaks = {}
+    for year in range(today.year - years, today.year + 1):
+        for month, name in ((4, 'Semana Santa'), (12, 'Navidad')):
+            start = _monday(datetime.date(year, month, 20))
+            breaks[f"break_{start.isoformat()}"] = {'name': name, 'start_date': start.isoformat(), 'duration_weeks': 1}
+
+    tree = {'students': {}, 'attendance': {}, 'attendance_stats': {}, 'modules': {}, 'breaks': breaks, 'metadata': {
+        'students': {'last_updated': now_iso},
+        'attendance': {},
+        'modules': {},
+        'breaks': {'last_updated': now_iso},
+    }}
+
+    for number in range(1, courses + 1):
+        course = course_key(number)
+
+        # Modules: back to back, duration 2-6 weeks, with today in the middle of the sequence
+        course_modules = {}
+        durations = [rng.randint(2, 6) for _ in range(modules)]
+        start = _monday(today) - datetime.timedelta(weeks=sum(durations) // 2)
+        module_ids = []
+        for order, duration in enumerate(durations, start=1):
+            end = start + datetime.timedelta(weeks=duration) - datetime.timedelta(days=1)
+            key = f"-M{number:02d}{order:03d}{rng.getrandbits(40):012x}"
+            course_modules[key] = {
+                'name': MODULE_NAMES[(order - 1) % len(MODULE_NAMES)],
+                'description': '',
+                'duration_weeks': duration,
+                'credits': order,
+                'fecha_inicio_1': start.isoformat(),
+                'fecha_fin_1': end.isoformat(),
+                'created_at': now_iso,
+                'module_id': key,
+                'firebase_key': '',
+            }
+            module_ids.append(key)
+            start = end + datetime.timedelta(days=1)
+        tree['modules'][course] = course_modules
+
+        # Students
+        roster = []
+        for i in range(students):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number:02d}{i:03d}"
+            start_module = rng.randrange(len(module_ids))
+            end_module = min(len(module_ids) - 1, start_module + rng.randint(3, 8))
+            fecha_inicio = datetime.date.fromisoformat(course_modules[module_ids[start_module]]['fecha_inicio_1'])
+            fecha_fin = datetime.date.fromisoformat(course_modules[module_ids[end_module]]['fecha_fin_1'])
+            roster.append({
+                'nombre': name,
+                'email': f"{name.split()[0].lower()}.{number:02d}{i:03d}@iti.edu",
+                'canvas_id': f"{rng.randint(1000, 9999)}{name.split()[1][:3].upper()}",
+                'telefono': f"786{rng.randint(1000000, 9999999)}",
+                'ciclo': str(rng.randint(1, 3)),
+                'modulo': course_modules[module_ids[start_module]]['name'],
+                'modulo_id': module_ids[start_module],
+                'modulo_fin_id': module_ids[end_module],
+                'modulo_fin_name': course_modules[module_ids[end_module]]['name'],
+                'modulo_fin_order': end_module + 1,
+                'fecha_inicio': fecha_inicio.isoformat(),
+                'fecha_fin': fecha_fin.isoformat(),
+            })
+        tree['students'][course] = {'data': roster, 'filename': 'students.xlsx', 'metadata timestamp': now_iso}
+        tree['metadata']['students'][course] = {'last_updated': now_iso}
+        tree['metadata']['modules'][course] = {'last_updated': now_iso}
+
+        # Attendance: every weekday, about 85% present
+        if number <= attendance_courses:
+            names = [student['nombre'] for student in roster]
+            tree['attendance'][course] = {
+                day.isoformat(): [{'Nombre': name, 'Presente': rng.random() < 0.85} for name in names]
+                for day in class_days
+            }
+            tree['attendance_stats'][course] = {
+                day: attendance_day_stats(records) for day, records in tree['attendance'][course].items()
+            }
+            tree['metadata']['attendance'][course] = {'last_updated': now_iso}
+
+    return tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--courses', type=int, default=30)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--modules', type=int, default=12)
+    parser.add_argument('--attendance-courses', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tree = generate_tree(args.courses, args.students, args.years, args.modules, args.attendance_courses, seed=args.seed)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(tree, f, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
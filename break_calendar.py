@@ -0,0 +1,140 @@
+import bisect
+import datetime
+
+# Break (vacation) weeks as sorted, merged date intervals.
+# Lookups use bisect over the interval starts and a prefix sum of break days, so checking
+# a date, finding the next working Monday or extending a period by its break days is
+# O(log n) instead of a scan over every break.
+
+
+def break_end_date(start_date: datetime.date, duration_weeks: int) -> datetime.date:
+    """Last day (Sunday for a Monday start) of a break of duration_weeks weeks."""
+    return start_date + datetime.timedelta(days=duration_weeks * 7 - 1)
+
+
+def break_entries(breaks_data: dict) -> list:
+    """
+    Normalize the breaks/ node into display-ready entries.
+
+    Args:
+        breaks_data (dict): {break_id: {'name', 'start_date' ('YYYY-MM-DD'), 'duration_weeks'}}
+
+    Returns:
+        list: Dicts with 'id', 'name', 'start_date' and 'end_date' (datetime.date, None if the
+        start date is invalid) and 'duration_weeks', most recent first.
+    """
+    entries = []
+    for break_id, break_info in (breaks_data or {}).items():
+        if not isinstance(break_info, dict):
+            continue
+        try:
+            duration_weeks = int(break_info.get('duration_weeks', 1))
+        except (ValueError, TypeError):
+            duration_weeks = 1
+        try:
+            start_date = datetime.date.fromisoformat(str(break_info.get('start_date', ''))[:10])
+        except ValueError:
+            start_date = None
+        entries.append({
+            'id': break_id,
+            'name': break_info.get('name', ''),
+            'start_date': start_date,
+            'end_date': break_end_date(start_date, duration_weeks) if start_date else None,
+            'duration_weeks': duration_weeks,
+        })
+    entries.sort(key=lambda entry: entry['start_date'] or datetime.date.min, reverse=True)
+    return entries
+
+
+def _next_monday(date: datetime.date) -> datetime.date:
+    """The date itself if it is a Monday, otherwise the following Monday."""
+    return date + datetime.timedelta(days=(7 - date.weekday()) % 7)
+
+
+class BreakCalendar:
+    """
+    Sorted, merged break intervals with O(log n) lookups.
+
+    Args:
+        breaks: Iterable of (start_date, end_date) tuples, both inclusive. Overlapping or
+            adjacent breaks are merged so their days are counted once.
+    """
+
+    def __init__(self, breaks=()):
+        merged = []
+        for start, end in sorted((start, end) for start, end in breaks if start <= end):
+            if merged and start <= merged[-1][1] + datetime.timedelta(days=1):
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+        # _prefix[i]: break days in the intervals before interval i
+        self._prefix = [0]
+        for start, end in merged:
+            self._prefix.append(self._prefix[-1] + (end - start).days + 1)
+
+    @classmethod
+    def from_entries(cls, entries: list) -> 'BreakCalendar':
+        """Build from break_entries() output; entries without a valid start date are skipped."""
+        return cls((entry['start_date'], entry['end_date']) for entry in entries if entry['start_date'])
+
+    def __len__(self):
+        return len(self._starts)
+
+    @property
+    def intervals(self) -> list:
+        """The merged (start, end) intervals in order."""
+        return list(zip(self._starts, self._ends))
+
+    def break_containing(self, date: datetime.date):
+        """The (start, end) break interval that contains date, or None."""
+        i = bisect.bisect_right(self._starts, date) - 1
+        if i >= 0 and date <= self._ends[i]:
+            return self._starts[i], self._ends[i]
+        return None
+
+    def is_break(self, date: datetime.date) -> bool:
+        return self.break_containing(date) is not None
+
+    def _break_days_through(self, date: datetime.date) -> int:
+        """Number of break days on or before date."""
+        i = bisect.bisect_right(self._starts, date)
+        if i == 0:
+            return 0
+        last_end = min(date, self._ends[i - 1])
+        return self._prefix[i - 1] + (last_end - self._starts[i - 1]).days + 1
+
+    def break_days_between(self, start: datetime.date, end: datetime.date) -> int:
+        """Number of break days in [start, end], both inclusive."""
+        if end < start:
+            return 0
+        return self._break_days_through(end) - self._break_days_through(start - datetime.timedelta(days=1))
+
+    def next_working_monday(self, date: datetime.date) -> datetime.date:
+        """
+        First Monday on or after date that is not inside a break. A date inside a break
+        moves to the first Monday after the break ends.
+        """
+        candidate = date
+        while True:
+            interval = self.break_containing(candidate)
+            if interval is not None:
+                candidate = interval[1] + datetime.timedelta(days=1)
+            monday = _next_monday(candidate)
+            if not self.is_break(monday):
+                return monday
+            candidate = monday
+
+    def extend_for_breaks(self, start: datetime.date, end: datetime.date) -> datetime.date:
+        """end pushed back by the number of break days that fall in [start, end]."""
+        return end + datetime.timedelta(days=self.break_days_between(start, end))
+
+    def end_date(self, start: datetime.date, num_weeks) -> datetime.date:
+        """End of a period of num_weeks weeks from start, extended by the breaks inside it."""
+        return self.extend_for_breaks(start, start + datetime.timedelta(weeks=num_weeks))
+
+
+def as_break_calendar(breaks) -> BreakCalendar:
+    """Accept a BreakCalendar or a list of (start, end) tuples."""
+    return breaks if isinstance(breaks, BreakCalendar) else BreakCalendar(breaks or ())
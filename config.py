@@ -1,26 +1,159 @@
+import os
+import threading
 import streamlit as st
-import pyrebase
 from dotenv import load_dotenv
+import app_log
+from db_metrics import InstrumentedDatabase, MetricsRegistry, track_cache
 
 # Load environment variables
 load_dotenv()
 
-# Firebase configuration
-firebaseConfig = {
-    "apiKey": st.secrets["firebase"]["apiKey"],
-    "databaseURL": st.secrets["firebase"]["databaseURL"],
-    "authDomain": st.secrets["firebase"]["authDomain"],
-    "projectId": st.secrets["firebase"]["projectId"],
-    "storageBucket": st.secrets["firebase"]["storageBucket"],
-    "messagingSenderId": st.secrets["firebase"]["messagingSenderId"],
-    "appId": st.secrets["firebase"]["appId"],
-    "measurementId": st.secrets["firebase"]["measurementId"]
-}
-
-# Initialize Firebase
-firebase = pyrebase.initialize_app(firebaseConfig)
-auth = firebase.auth()
-db = firebase.database()
+def _setting(section, key, default=None, env=None):
+    """A setting from the environment (if env is given and set), else st.secrets[section][key], else default."""
+    if env and os.getenv(env) is not None:
+        return os.getenv(env)
+    try:
+        return st.secrets.get(section, {}).get(key, default)
+    except FileNotFoundError:
+        return default
+
+def _flag(value) -> bool:
+    """A boolean setting that may come from the environment as a string."""
+    return str(value).strip().lower() not in ("0", "false", "no", "off", "")
+
+# Logging (app_log.py): minimum level, share of high-volume events kept, longest field value
+LOG_LEVEL = _setting("logging", "level", "INFO", env="LOG_LEVEL")
+LOG_SAMPLE_RATE = float(_setting("logging", "sample_rate", 0.1, env="LOG_SAMPLE_RATE"))
+LOG_MAX_FIELD_CHARS = int(_setting("logging", "max_field_chars", 300, env="LOG_MAX_FIELD_CHARS"))
+app_log.configure(LOG_LEVEL, LOG_SAMPLE_RATE, LOG_MAX_FIELD_CHARS)
+
+# Database backend: "firebase" (default) or "local" for the in-memory/JSON stand-in in local_db.py
+DATABASE_BACKEND = _setting("database", "backend", "firebase", env="DATABASE_BACKEND")
+# HTTP session (http_session.py) of the Firebase clients: connection pool size and retries
+HTTP_POOL_SIZE = int(_setting("http", "pool_size", 20, env="HTTP_POOL_SIZE"))
+HTTP_RETRIES = int(_setting("http", "retries", 3, env="HTTP_RETRIES"))
+HTTP_GZIP = _flag(_setting("http", "gzip", True, env="HTTP_GZIP"))
+
+@st.cache_resource(show_spinner=False)
+def get_clients() -> dict:
+    """
+    Create the auth and database clients of the configured backend, once per process.
+
+    pyrebase is only imported here, so importing config (e.g. for the login page) does not
+    pay for it; the clients are built on first use of config.auth or config.db.
+
+    Returns:
+        dict: {'auth': ..., 'new_database': callable returning a new Database handle}
+    """
+    if DATABASE_BACKEND == "local":
+        from local_db import LocalDatabase, LocalAuth
+        local = LocalDatabase(
+            path=_setting("database", "local_path", None, env="LOCAL_DB_PATH"),
+            latency=float(_setting("database", "local_latency_ms", 0, env="LOCAL_DB_LATENCY_MS")) / 1000,
+        )
+        return {'auth': LocalAuth(), 'new_database': local.handle}
+
+    import pyrebase
+    from http_session import shared_session
+
+    # Firebase configuration
+    firebaseConfig = {
+        "apiKey": st.secrets["firebase"]["apiKey"],
+        "databaseURL": st.secrets["firebase"]["databaseURL"],
+        "authDomain": st.secrets["firebase"]["authDomain"],
+        "projectId": st.secrets["firebase"]["projectId"],
+        "storageBucket": st.secrets["firebase"]["storageBucket"],
+        "messagingSenderId": st.secrets["firebase"]["messagingSenderId"],
+        "appId": st.secrets["firebase"]["appId"],
+        "measurementId": st.secrets["firebase"]["measurementId"]
+    }
+
+    # Initialize Firebase
+    firebase = pyrebase.initialize_app(firebaseConfig)
+    # auth() and database() already share firebase.requests; replace it with the tuned one
+    firebase.requests = shared_session(HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_GZIP)
+    return {'auth': firebase.auth(), 'new_database': firebase.database}
+
+_thread_clients = threading.local()
+
+def thread_database():
+    """
+    This thread's Database handle, created on first use.
+
+    A Database keeps the path being built by child() until the request is sent, so threads
+    (each Streamlit session's script thread, fetch_parallel workers) must not share one.
+    Handles are cheap and share the HTTP session (or the local tree).
+    """
+    database = getattr(_thread_clients, 'db', None)
+    if database is None:
+        database = _thread_clients.db = get_clients()['new_database']()
+    return database
+
+class LazyClient:
+    """
+    Stands in for a client that is only resolved on attribute access; reads and writes of
+    attributes go to the real client.
+
+    Args:
+        resolve (callable): Returns the client, e.g. thread_database.
+    """
+
+    def __init__(self, resolve):
+        object.__setattr__(self, '_resolve', resolve)
+
+    def _client(self):
+        return self._resolve()
+
+    def __getattr__(self, attribute):
+        return getattr(self._client(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._client(), attribute, value)
+
+auth = LazyClient(lambda: get_clients()['auth'])
+db = LazyClient(thread_database)
+
+# Record path, operation, bytes, latency and cache hit/miss of every database request
+DB_METRICS_ENABLED = _flag(_setting("database", "metrics", True, env="DB_METRICS"))
+# Payload sizes cost one more JSON serialization of every request and response, so they are opt-in
+DB_METRICS_BYTES = _flag(_setting("database", "metrics_bytes", False, env="DB_METRICS_BYTES"))
+PROCESS_DB_METRICS = MetricsRegistry()
+
+def session_db_metrics():
+    """The database metrics of the current session (created on first use)."""
+    if 'db_metrics' not in st.session_state:
+        st.session_state.db_metrics = MetricsRegistry()
+    return st.session_state.db_metrics
+
+def record_db_call(record):
+    """Add one database call to the process registry and, when a session is active, to its registry."""
+    PROCESS_DB_METRICS.add(record)
+    try:
+        session_db_metrics().add(record)
+    except Exception:
+        pass # No session (background thread or bare script)
+
+if DB_METRICS_ENABLED:
+    db = InstrumentedDatabase(db, record_db_call, count_bytes=DB_METRICS_BYTES)
+    # Put above @st.cache_data so the loader's cache hits and misses are recorded
+    track_loader = track_cache(record_db_call)
+else:
+    track_loader = lambda func: func
+
+# Seconds the metadata snapshot (all last_updated timestamps) is reused before it is read again
+METADATA_TTL_SECONDS = int(_setting("cache", "metadata_ttl_seconds", 10))
+# Keep metadata current through a Firebase stream instead of polling it (opt-in)
+METADATA_STREAM_ENABLED = _flag(_setting("cache", "metadata_stream", False, env="METADATA_STREAM"))
+# Seconds the list of courses (top-level keys of students/) is reused
+COURSES_TTL_SECONDS = int(_setting("cache", "courses_ttl_seconds", 300))
+# Threads used by utils.fetch_parallel for the independent reads of a page
+FETCH_MAX_WORKERS = int(_setting("database", "fetch_max_workers", 8))
+
+# Opt-in page profiling (profiling.py): section timings, reruns per action, cProfile dumps of the slowest runs
+PROFILING_ENABLED = _flag(_setting("profiling", "enabled", False, env="PROFILING"))
+PROFILING_DIR = _setting("profiling", "dir", ".profiles", env="PROFILING_DIR")
+# Number of .pstats dumps kept per page
+PROFILING_KEEP_SLOWEST = int(_setting("profiling", "keep_slowest", 5))
 
 @st.cache_data(ttl=300)
 
@@ -0,0 +1,232 @@
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import KeysView
+
+from app_log import get_logger, log_event
+
+# Round-trip instrumentation for the Realtime Database.
+# InstrumentedDatabase wraps a pyrebase (or local_db) Database and reports every request
+# -- path, operation, payload bytes (opt-in), latency and whether it ran inside a cached
+# loader -- to a sink, usually one or more MetricsRegistry objects. track_cache wraps
+# st.cache_data loaders so their hits (calls that made no request) are recorded too.
+
+logger = get_logger(__name__)
+
+_cache_scope = contextvars.ContextVar('db_metrics_cache_scope', default=None)
+
+def _json_default(value):
+    return list(value) if isinstance(value, (KeysView, set)) else str(value)
+
+
+def payload_size(value) -> int:
+    """Size in bytes of value as JSON, which is roughly what goes over the wire."""
+    if value is None:
+        return 0
+    try:
+        return len(json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=_json_default).encode('utf-8'))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _response_value(response):
+    try:
+        return response.val()
+    except Exception:
+        return None
+
+
+class MetricsRegistry:
+    """
+    Aggregated database calls, safe to share between threads.
+
+    Args:
+        recent (int): Number of individual calls kept for inspection.
+    """
+
+    def __init__(self, recent: int = 200):
+        self._lock = threading.Lock()
+        self._by_key = {}   # (path, operation) -> aggregate dict
+        self._recent = deque(maxlen=recent)
+        self.started_at = time.time()
+
+    def add(self, record: dict):
+        """Add one call: {'path', 'operation', 'bytes', 'seconds', 'cache', 'at'}."""
+        key = (record['path'], record['operation'])
+        with self._lock:
+            entry = self._by_key.get(key)
+            if entry is None:
+                entry = self._by_key[key] = {
+                    'path': record['path'], 'operation': record['operation'], 'calls': 0,
+                    'seconds': 0.0, 'max_seconds': 0.0, 'bytes': 0, 'cache_hits': 0, 'cache_misses': 0,
+                }
+            entry['calls'] += 1
+            entry['seconds'] += record['seconds']
+            entry['max_seconds'] = max(entry['max_seconds'], record['seconds'])
+            entry['bytes'] += record['bytes']
+            if record['cache'] == 'hit':
+                entry['cache_hits'] += 1
+            elif record['cache'] == 'miss':
+                entry['cache_misses'] += 1
+            self._recent.append(record)
+
+    def summary(self, sort_by: str = 'seconds', limit: int = None) -> list:
+        """Aggregates per (path, operation), largest sort_by first."""
+        with self._lock:
+            rows = [dict(entry) for entry in self._by_key.values()]
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def recent(self) -> list:
+        with self._lock:
+            return list(self._recent)
+
+    def totals(self) -> dict:
+        """Request count, time and bytes over all database calls (cache events excluded)."""
+        with self._lock:
+            entries = [entry for entry in self._by_key.values() if entry['operation'] != 'cache']
+            cache = [entry for entry in self._by_key.values() if entry['operation'] == 'cache']
+        return {
+            'requests': sum(entry['calls'] for entry in entries),
+            'seconds': sum(entry['seconds'] for entry in entries),
+            'bytes': sum(entry['bytes'] for entry in entries),
+            'cache_hits': sum(entry['cache_hits'] for entry in cache),
+            'cache_misses': sum(entry['cache_misses'] for entry in cache),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._by_key.clear()
+            self._recent.clear()
+            self.started_at = time.time()
+
+
+class InstrumentedDatabase:
+    """
+    A Database that reports every request to sink(record) and otherwise behaves like the
+    wrapped one (child()/query chaining returns the wrapper, other attributes pass through).
+
+    Args:
+        database: pyrebase Database or local_db.LocalDatabase.
+        sink (callable): Called with {'path', 'operation', 'bytes', 'seconds', 'cache', 'at'};
+            cache is 'miss' inside a track_cache loader and None otherwise.
+        count_bytes (bool): Measure payload sizes (serializes each payload once more);
+            off reports 0 bytes.
+    """
+
+    def __init__(self, database, sink, count_bytes: bool = False):
+        self._database = database
+        self._sink = sink
+        self.count_bytes = count_bytes
+
+    def __getattr__(self, name):
+        return getattr(self._database, name)
+
+    def _chain(name):
+        def method(self, *args, **kwargs):
+            getattr(self._database, name)(*args, **kwargs)
+            return self
+        method.__name__ = name
+        return method
+
+    child = _chain('child')
+    order_by_key = _chain('order_by_key')
+    order_by_value = _chain('order_by_value')
+    order_by_child = _chain('order_by_child')
+    start_at = _chain('start_at')
+    end_at = _chain('end_at')
+    equal_to = _chain('equal_to')
+    limit_to_first = _chain('limit_to_first')
+    limit_to_last = _chain('limit_to_last')
+    shallow = _chain('shallow')
+    del _chain
+
+    def _request(self, operation, payload, *args, **kwargs):
+        path = '/' + str(self._database.path or '').strip('/')
+        if getattr(self._database, 'build_query', None):
+            if self._database.build_query.get('shallow'):
+                path += '?shallow'
+            elif self._database.build_query.get('orderBy'):
+                path += '?query'
+        started = time.perf_counter()
+        try:
+            return_value = getattr(self._database, operation)(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+        scope = _cache_scope.get()
+        if scope is not None:
+            scope.append(path)
+        if not self.count_bytes:
+            size = 0
+        elif operation == 'get':
+            size = payload_size(_response_value(return_value))
+        else:
+            size = payload_size(payload)
+        self._report(path, operation, size, seconds, 'miss' if scope is not None else None)
+        return return_value
+
+    def _report(self, path, operation, size, seconds, cache):
+        try:
+            self._sink({'path': path, 'operation': operation, 'bytes': size, 'seconds': seconds,
+                        'cache': cache, 'at': time.time()})
+        except Exception as e:
+            log_event(logger, logging.WARNING, "db_metrics.record_failed", error=str(e))
+
+    def get(self, *args, **kwargs):
+        return self._request('get', None, *args, **kwargs)
+
+    def set(self, data, *args, **kwargs):
+        return self._request('set', data, data, *args, **kwargs)
+
+    def update(self, data, *args, **kwargs):
+        return self._request('update', data, data, *args, **kwargs)
+
+    def push(self, data, *args, **kwargs):
+        return self._request('push', data, data, *args, **kwargs)
+
+    def remove(self, *args, **kwargs):
+        return self._request('remove', None, *args, **kwargs)
+
+    def stream(self, *args, **kwargs):
+        return self._request('stream', None, *args, **kwargs)
+
+
+def track_cache(sink):
+    """
+    Decorator factory for cached loaders (put it above @st.cache_data).
+
+    Each call is reported to sink as operation 'cache' on the loader's name, as a 'hit' if
+    it made no database request and a 'miss' otherwise; the requests of a miss are tagged
+    cache='miss' by InstrumentedDatabase. .clear() of the cached function stays available.
+    """
+    def decorator(cached_func):
+        name = getattr(cached_func, '__name__', 'loader')
+
+        @functools.wraps(cached_func)
+        def wrapper(*args, **kwargs):
+            token = _cache_scope.set([])
+            started = time.perf_counter()
+            try:
+                return cached_func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - started
+                requests = _cache_scope.get()
+                _cache_scope.reset(token)
+                outer = _cache_scope.get()
+                if outer is not None:
+                    # A loader called from another loader: its requests count for both
+                    outer.extend(requests)
+                try:
+                    sink({'path': name, 'operation': 'cache', 'bytes': 0, 'seconds': seconds,
+                          'cache': 'miss' if requests else 'hit', 'at': time.time()})
+                except Exception as e:
+                    log_event(logger, logging.WARNING, "db_metrics.cache_record_failed", error=str(e))
+
+        if hasattr(cached_func, 'clear'):
+            wrapper.clear = cached_func.clear
+        return wrapper
+    return decorator
@@ -0,0 +1,60 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Tuned HTTP session for the Realtime Database and auth requests of the process.
+# pyrebase already sends every auth() and database() request through the single
+# requests.Session it creates in initialize_app, so connections are reused either way;
+# this one replaces it to size the pool for the number of script threads working at
+# once and to retry failed connections and reads. requests.Session is safe to share for
+# plain requests; the connection pools are thread-safe.
+
+_lock = threading.Lock()
+_shared = None
+
+
+def build_session(pool_size: int = 20, retries: int = 3, gzip: bool = True) -> requests.Session:
+    """
+    Create a keep-alive session with a tuned connection pool.
+
+    Args:
+        pool_size (int): Connections kept open per host; concurrent requests beyond it
+            open extra connections that are not kept.
+        retries (int): Retries of failed connections and of GET/DELETE requests that
+            got a 502/503/504. PUT is not retried: a set() that reached the server but
+            timed out could be replayed over a newer write.
+        gzip (bool): Ask for gzip-compressed responses; off sends identity.
+
+    Returns:
+        requests.Session
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET', 'DELETE', 'HEAD', 'OPTIONS'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Connection': 'keep-alive',
+        'Accept-Encoding': 'gzip, deflate' if gzip else 'identity',
+    })
+    return session
+
+
+def shared_session(pool_size: int = 20, retries: int = 3, gzip: bool = True) -> requests.Session:
+    """The process-wide session, created by the first call (later arguments are ignored)."""
+    global _shared
+    with _lock:
+        if _shared is None:
+            _shared = build_session(pool_size, retries, gzip)
+        return _shared
@@ -0,0 +1,444 @@
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from app_log import get_logger, log_event
+
+# In-process stand-in for the pyrebase Realtime Database (and a permissive auth).
+# It mirrors the pyrebase surface the app uses -- child() path building, get/set/update/
+# push/remove, shallow and orderBy queries, generate_key and stream -- with Firebase's
+# storage rules: nulls delete, empty nodes disappear, integer-keyed nodes read back as
+# arrays. The tree can be loaded from and persisted to a JSON export, and every request
+# can be delayed to simulate network latency. Nothing here imports Streamlit or pyrebase.
+
+logger = get_logger(__name__)
+
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+
+
+def _split(path) -> list:
+    return [part for part in str(path).split('/') if part]
+
+
+def _normalize(value):
+    """Stored form of a value: dicts with string keys, no nulls and no empty nodes."""
+    if isinstance(value, (list, tuple)):
+        value = {str(i): item for i, item in enumerate(value)}
+    if isinstance(value, dict):
+        normalized = {}
+        for key, item in value.items():
+            item = _normalize(item)
+            if item is not None:
+                normalized[str(key)] = item
+        return normalized or None
+    return value
+
+
+def _array_keys(node: dict):
+    """Sorted integer keys if Firebase would return node as an array, otherwise None."""
+    if not all(key.isdigit() and (key == '0' or not key.startswith('0')) for key in node):
+        return None
+    keys = sorted(int(key) for key in node)
+    # Firebase returns an array when more than half of the slots 0..max are filled
+    return keys if keys and len(keys) * 2 > keys[-1] + 1 else None
+
+
+def _export(value):
+    """Value as Firebase would return it: integer-keyed nodes become lists with None holes."""
+    if not isinstance(value, dict):
+        return value
+    keys = _array_keys(value)
+    if keys is not None:
+        array = [None] * (keys[-1] + 1)
+        for key in keys:
+            array[key] = _export(value[str(key)])
+        return array
+    return OrderedDict((key, _export(value[key])) for key in sorted(value, key=_key_order))
+
+
+def _key_order(key: str):
+    """Firebase key ordering: integer keys numerically first, then strings lexicographically."""
+    return (0, int(key), '') if key.lstrip('-').isdigit() and len(key) < 10 else (1, 0, key)
+
+
+def _value_order(value):
+    """Firebase value ordering: null, false, true, numbers, strings, objects."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, int(value))
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    return (4, 0)
+
+
+class LocalPyre:
+    """One child of a query result, like pyrebase's Pyre."""
+
+    def __init__(self, key, value):
+        self._key = key
+        self._value = value
+
+    def key(self):
+        return self._key
+
+    def val(self):
+        return self._value
+
+
+class LocalResponse:
+    """Result of get(), like pyrebase's PyreResponse."""
+
+    def __init__(self, value, query_key):
+        self._value = value
+        self._query_key = query_key
+
+    def val(self):
+        return self._value
+
+    def key(self):
+        return self._query_key
+
+    def each(self):
+        if isinstance(self._value, list):
+            return [LocalPyre(i, item) for i, item in enumerate(self._value) if item is not None]
+        if isinstance(self._value, dict):
+            return [LocalPyre(key, item) for key, item in self._value.items()]
+        return None
+
+
+class LocalStream:
+    """An open stream; messages are delivered to the handler from its own thread."""
+
+    def __init__(self, database, parts, handler, stream_id=None):
+        self._database = database
+        self.parts = parts
+        self._handler = handler
+        self._stream_id = stream_id
+        self._queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def send(self, event: str, path: str, data):
+        message = {'event': event, 'path': path, 'data': data}
+        if self._stream_id is not None:
+            message['stream_id'] = self._stream_id
+        self._queue.put(message)
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            try:
+                self._handler(message)
+            except Exception as e:
+                log_event(logger, logging.ERROR, "local_db.stream_handler_failed", error=str(e))
+
+    def close(self):
+        self._database._remove_stream(self)
+        self._queue.put(None)
+        return self
+
+
+class LocalDatabase:
+    """
+    In-memory Realtime Database with pyrebase's Database interface.
+
+    Like pyrebase, child() and the query methods accumulate state on the object and every
+    request resets it, so one instance should not be shared between threads that build
+    paths concurrently; handle() gives each thread its own view of the same tree.
+
+    Args:
+        data (dict, optional): Initial tree, e.g. a Firebase JSON export.
+        path (str, optional): JSON file the tree is loaded from (if it exists) and written
+            back to after every write.
+        latency (float or callable, optional): Seconds to wait before each request, or a
+            callable returning them (e.g. lambda: random.uniform(0.05, 0.2)).
+    """
+
+    def __init__(self, data=None, path=None, latency=0.0):
+        self.file_path = path
+        self._shared = {'latency': latency}  # shared with every handle()
+        if data is None and path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        self._root = _normalize(data) or {}
+        self._lock = threading.RLock()
+        self._streams = []
+        self._last_push_time = 0
+        self._last_rand_chars = []
+        self.path = ""
+        self.build_query = {}
+
+    @property
+    def latency(self):
+        return self._shared['latency']
+
+    @latency.setter
+    def latency(self, value):
+        self._shared['latency'] = value
+
+    def handle(self):
+        """Another LocalDatabase on the same tree, streams and lock, with its own path/query state."""
+        other = copy.copy(self)
+        other.path = ""
+        other.build_query = {}
+        return other
+
+    # --- Path and query building ---
+
+    def child(self, *args):
+        new_path = "/".join(str(arg) for arg in args)
+        if self.path:
+            self.path += "/{}".format(new_path)
+        else:
+            if new_path.startswith("/"):
+                new_path = new_path[1:]
+            self.path = new_path
+        return self
+
+    def order_by_key(self):
+        self.build_query["orderBy"] = "$key"
+        return self
+
+    def order_by_value(self):
+        self.build_query["orderBy"] = "$value"
+        return self
+
+    def order_by_child(self, order):
+        self.build_query["orderBy"] = order
+        return self
+
+    def start_at(self, start):
+        self.build_query["startAt"] = start
+        return self
+
+    def end_at(self, end):
+        self.build_query["endAt"] = end
+        return self
+
+    def equal_to(self, equal):
+        self.build_query["equalTo"] = equal
+        return self
+
+    def limit_to_first(self, limit_first):
+        self.build_query["limitToFirst"] = limit_first
+        return self
+
+    def limit_to_last(self, limit_last):
+        self.build_query["limitToLast"] = limit_last
+        return self
+
+    def shallow(self):
+        self.build_query["shallow"] = True
+        return self
+
+    def _take_request(self):
+        """Current path parts and query; resets both like a pyrebase request does."""
+        parts, query = _split(self.path), self.build_query
+        self.path = ""
+        self.build_query = {}
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        return parts, query
+
+    # --- Tree access ---
+
+    def _read(self, parts):
+        node = self._root
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _write(self, parts, value):
+        """Set the node at parts (None deletes it) and prune emptied parents."""
+        value = _normalize(value)
+        if not parts:
+            # In place, so every handle() keeps seeing the same root
+            self._root.clear()
+            self._root.update(value or {})
+            return
+        trail = [self._root]
+        node = self._root
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                if value is None:
+                    return
+                child = node[part] = {}
+            node = child
+            trail.append(node)
+        if value is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = value
+        for depth in range(len(parts) - 1, 0, -1):
+            if not trail[depth]:
+                trail[depth - 1].pop(parts[depth - 1], None)
+
+    def _persist(self):
+        if self.file_path:
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                json.dump(self._root, f, ensure_ascii=False)
+
+    def _apply(self, writes: list):
+        """Apply [(parts, value)] atomically, persist, and notify the open streams."""
+        with self._lock:
+            for parts, value in writes:
+                self._write(parts, value)
+            self._persist()
+            for stream in list(self._streams):
+                self._notify(stream, writes)
+
+    def _notify(self, stream, writes):
+        covered = {}
+        for parts, _ in writes:
+            if parts[:len(stream.parts)] == stream.parts:
+                relative = parts[len(stream.parts):]
+                covered['/'.join(relative)] = _export(self._read(parts))
+            elif stream.parts[:len(parts)] == parts:
+                # A write above the stream replaces everything it watches
+                stream.send('put', '/', _export(self._read(stream.parts)))
+                return
+        if len(covered) == 1:
+            path, data = next(iter(covered.items()))
+            stream.send('put', '/' + path, data)
+        elif covered:
+            stream.send('patch', '/', covered)
+
+    def _remove_stream(self, stream):
+        with self._lock:
+            if stream in self._streams:
+                self._streams.remove(stream)
+
+    def _query(self, value, query):
+        if query.get("shallow"):
+            return dict.fromkeys(value).keys() if isinstance(value, dict) else value
+        if not isinstance(value, dict):
+            return _export(value)
+        order = query.get("orderBy")
+        if order == "$key":
+            position = lambda item: _key_order(item[0])
+            to_order = lambda bound: _key_order(str(bound))
+        elif order == "$value":
+            position = lambda item: _value_order(item[1])
+            to_order = _value_order
+        elif order:
+            position = lambda item: _value_order(item[1].get(order) if isinstance(item[1], dict) else None)
+            to_order = _value_order
+        else:
+            return _export(value)
+
+        items = sorted(value.items(), key=position)
+        if "equalTo" in query:
+            items = [item for item in items if position(item) == to_order(query["equalTo"])]
+        if "startAt" in query:
+            items = [item for item in items if position(item) >= to_order(query["startAt"])]
+        if "endAt" in query:
+            items = [item for item in items if position(item) <= to_order(query["endAt"])]
+        if "limitToFirst" in query:
+            items = items[:query["limitToFirst"]]
+        if "limitToLast" in query:
+            items = items[-query["limitToLast"]:] if query["limitToLast"] else []
+        return OrderedDict((key, _export(item)) for key, item in items) if items else None
+
+    # --- Requests ---
+
+    def get(self, token=None, json_kwargs={}):
+        parts, query = self._take_request()
+        with self._lock:
+            # _query/_export build new containers, so callers never share the stored tree
+            value = self._query(self._read(parts), query)
+        return LocalResponse(value, parts[-1] if parts else "")
+
+    def set(self, data, token=None, json_kwargs={}):
+        parts, _ = self._take_request()
+        self._apply([(parts, data)])
+        return data
+
+    def update(self, data, token=None, json_kwargs={}):
+        parts, _ = self._take_request()
+        # Keys may be multi-location paths relative to the current node
+        self._apply([(parts + _split(key), value) for key, value in data.items()])
+        return data
+
+    def push(self, data, token=None, json_kwargs={}):
+        parts, _ = self._take_request()
+        name = self.generate_key()
+        self._apply([(parts + [name], data)])
+        return {"name": name}
+
+    def remove(self, token=None):
+        parts, _ = self._take_request()
+        self._apply([(parts, None)])
+        return None
+
+    def stream(self, stream_handler, token=None, stream_id=None, is_async=True):
+        parts, _ = self._take_request()
+        with self._lock:
+            stream = LocalStream(self, parts, stream_handler, stream_id)
+            stream.send('put', '/', _export(self._read(parts)))
+            self._streams.append(stream)
+        return stream
+
+    def generate_key(self):
+        """Chronologically ordered push ID, generated like the Firebase clients do."""
+        now = int(time.time() * 1000)
+        duplicate_time = now == self._last_push_time
+        self._last_push_time = now
+        time_stamp_chars = []
+        for _ in range(8):
+            time_stamp_chars.insert(0, PUSH_CHARS[now % 64])
+            now = now // 64
+        new_id = "".join(time_stamp_chars)
+        if not duplicate_time:
+            self._last_rand_chars = [random.randint(0, 63) for _ in range(12)]
+        else:
+            for i in range(11, -1, -1):
+                if self._last_rand_chars[i] != 63:
+                    self._last_rand_chars[i] += 1
+                    break
+                self._last_rand_chars[i] = 0
+        return new_id + "".join(PUSH_CHARS[i] for i in self._last_rand_chars)
+
+    def export(self):
+        """The whole tree as Firebase would return it from the root."""
+        with self._lock:
+            return _export(self._root)
+
+
+class LocalAuth:
+    """
+    Stand-in for pyrebase's Auth.
+
+    Args:
+        users (dict, optional): {email: password}. Without it any email/password signs in.
+    """
+
+    def __init__(self, users=None):
+        self.users = users
+        self.current_user = None
+
+    def sign_in_with_email_and_password(self, email, password):
+        if self.users is not None and self.users.get(email) != password:
+            raise ValueError("INVALID_PASSWORD")
+        self.current_user = {
+            'email': email,
+            'localId': email,
+            'idToken': f"local-{email}",
+            'refreshToken': f"local-refresh-{email}",
+            'expiresIn': '3600',
+        }
+        return self.current_user
@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+
+from app_log import get_logger, log_event
+
+logger = get_logger(__name__)
+
+# Push-based view of the Firebase metadata/ tree.
+# A single streaming connection per process keeps every last_updated timestamp current,
+# so cache keys can be resolved without a GET on each script run.
+#
+# The listener only needs a stream factory: a callable that takes the event handler and
+# returns an object with close() (pyrebase's Stream, or any fake that calls the handler
+# with {'event': 'put'/'patch', 'path': ..., 'data': ...} messages).
+#
+# pyrebase's Stream.close() waits in a loop until the connection exists, so it never
+# returns for a stream whose first connect failed (its thread died with sse still None).
+# Such streams are dropped without close(), and every close() runs in a helper thread
+# that is given at most close_timeout seconds.
+
+
+def lookup_last_updated(tree: dict, table_name: str, user_email: str = None):
+    """
+    Find the last_updated timestamp of a table (optionally for one user/course) in a metadata tree.
+
+    Args:
+        tree (dict): The metadata/ tree, e.g. {'students': {'cba2@iti,edu': {'last_updated': ...}}}.
+        table_name (str): The name of the data section ('attendance', 'students', 'modules', etc.)
+        user_email (str, optional): The user/course the timestamp belongs to.
+
+    Returns:
+        str or None: The last_updated ISO timestamp, or None if not found.
+    """
+    metadata = (tree or {}).get(table_name)
+    if user_email and isinstance(metadata, dict):
+        metadata = metadata.get(user_email.replace('.', ','))
+    if isinstance(metadata, dict) and 'last_updated' in metadata:
+        return metadata['last_updated']
+    return None
+
+
+def _set_path(tree: dict, parts: list, value) -> dict:
+    """Write value at the given path inside tree (None deletes), returning the new root."""
+    if not parts:
+        return value if isinstance(value, dict) else {}
+    node = tree
+    for part in parts[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = {}
+            node[part] = child
+        node = child
+    if value is None:
+        node.pop(parts[-1], None)
+    else:
+        node[parts[-1]] = value
+    return tree
+
+
+def _is_connected(stream) -> bool:
+    """False for a stream whose thread died or (pyrebase) whose connection never opened."""
+    thread = getattr(stream, 'thread', None)
+    if thread is not None and not thread.is_alive():
+        return False
+    return getattr(stream, 'sse', True) is not None
+
+
+def _close_quietly(stream):
+    try:
+        stream.close()
+    except Exception as e:
+        log_event(logger, logging.WARNING, "metadata_stream.close_failed", error=str(e))
+
+
+class MetadataListener:
+    """
+    Keeps an in-process copy of metadata/ up to date from a Firebase event stream.
+
+    Args:
+        stream_factory (callable): Called with the event handler; returns the open stream.
+        restart_interval (float): Minimum seconds between reconnect attempts after the
+            stream dies or is cancelled.
+        close_timeout (float): Longest wait for an old stream's close() on restart.
+    """
+
+    def __init__(self, stream_factory, restart_interval: float = 30, close_timeout: float = 2):
+        self._stream_factory = stream_factory
+        self._restart_interval = restart_interval
+        self._close_timeout = close_timeout
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._tree = {}
+        self._ready = False
+        self._version = 0
+        self._stream = None
+        self._started_at = 0.0
+
+    def start(self):
+        """Open the stream. The listener is live once the initial full snapshot arrives."""
+        with self._lock:
+            self._ready = False
+        self._started_at = time.monotonic()
+        try:
+            self._stream = self._stream_factory(self.handle_event)
+        except Exception as e:
+            log_event(logger, logging.ERROR, "metadata_stream.start_failed", error=str(e))
+            self._stream = None
+
+    def close(self):
+        """Close the underlying stream; lookups fall back to the caller's polling path."""
+        with self._lock:
+            self._ready = False
+        stream, self._stream = self._stream, None
+        if stream is None or not _is_connected(stream):
+            # Never connected or already dead: pyrebase's close() would block forever
+            return
+        closer = threading.Thread(target=_close_quietly, args=(stream,), name='metadata-stream-close', daemon=True)
+        closer.start()
+        closer.join(self._close_timeout)
+        if closer.is_alive():
+            log_event(logger, logging.WARNING, "metadata_stream.close_timeout", seconds=self._close_timeout)
+
+    def handle_event(self, message: dict):
+        """
+        Apply one stream message to the local tree.
+
+        Args:
+            message (dict): {'event': ..., 'path': ..., 'data': ...} as delivered by pyrebase.
+        """
+        if not isinstance(message, dict):
+            return
+        event = message.get('event')
+        if event in ('cancel', 'auth_revoked'):
+            with self._lock:
+                self._ready = False
+            return
+        if event not in ('put', 'patch'):
+            return
+
+        parts = [part for part in (message.get('path') or '/').split('/') if part]
+        data = message.get('data')
+        with self._lock:
+            if event == 'put':
+                self._tree = _set_path(self._tree, parts, data)
+                # The first message of a stream is a put of the whole tree at '/'
+                if not parts:
+                    self._ready = True
+            elif isinstance(data, dict):
+                for key, value in data.items():
+                    sub_parts = [part for part in key.split('/') if part]
+                    self._tree = _set_path(self._tree, parts + sub_parts, value)
+            self._version += 1
+
+    def record_local_write(self, table_name: str, last_updated: str, user_email: str = None):
+        """Apply a metadata write made by this process without waiting for its echo on the stream."""
+        parts = [table_name]
+        if user_email:
+            parts.append(user_email.replace('.', ','))
+        parts.append('last_updated')
+        with self._lock:
+            self._tree = _set_path(self._tree, parts, last_updated)
+            self._version += 1
+
+    def is_live(self) -> bool:
+        """True when the stream delivered its initial snapshot and its thread is still running."""
+        if not self._ready or self._stream is None:
+            return False
+        thread = getattr(self._stream, 'thread', None)
+        return thread is None or thread.is_alive()
+
+    def ensure_running(self):
+        """Reconnect a dead or cancelled stream, at most once per restart_interval."""
+        if self.is_live() or time.monotonic() - self._started_at < self._restart_interval:
+            return
+        # Script threads of other sessions skip the restart instead of waiting for it
+        if not self._restart_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self._started_at < self._restart_interval:
+                return
+            log_event(logger, logging.INFO, "metadata_stream.restart")
+            self.close()
+            self.start()
+        finally:
+            self._restart_lock.release()
+
+    @property
+    def version(self) -> int:
+        """Number of changes applied so far; increases on every event."""
+        return self._version
+
+    def last_updated(self, table_name: str, user_email: str = None):
+        """last_updated for a table (and optional user/course) from the streamed tree."""
+        with self._lock:
+            return lookup_last_updated(self._tree, table_name, user_email)
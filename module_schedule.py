@@ -0,0 +1,70 @@
+import datetime
+
+from break_calendar import BreakCalendar
+
+# Date recalculation for a course's module sequence.
+# Starting at the anchor module (the one running today), every module begins on the first
+# working Monday after the previous one ends and lasts its duration in weeks. Modules
+# ordered before the anchor wrap around and are scheduled after the last one. The whole
+# sequence is computed in one pass from plain values, so the caller can write every
+# changed date at once.
+
+
+def find_anchor(modules: list, today: datetime.date):
+    """
+    The id of the first module whose [start, end] contains today, or None.
+
+    Args:
+        modules (list): Dicts with 'id', 'start' and 'end' (datetime.date or None).
+        today (datetime.date): Reference date.
+    """
+    for module in modules:
+        if module['start'] is not None and module['end'] is not None and module['start'] <= today <= module['end']:
+            return module['id']
+    return None
+
+
+def schedule_modules(modules: list, anchor_id, calendar: BreakCalendar) -> dict:
+    """
+    Recompute start and end dates of every module from the anchor onwards.
+
+    Args:
+        modules (list): Dicts with 'id', 'order', 'duration_weeks' (None when missing),
+            'start' and 'end' (datetime.date or None), in any order.
+        anchor_id: id of the module the sequence is anchored to; it keeps its start week.
+        calendar (BreakCalendar): Breaks to skip when choosing start dates.
+
+    Returns:
+        dict: {id: (start, end)} for every scheduled module. Modules without a duration
+        are left out and do not move the modules after them.
+    """
+    by_id = {module['id']: module for module in modules}
+    anchor_order = by_id[anchor_id]['order']
+    # Stable sort so modules sharing an order keep their table position
+    ordered = sorted(modules, key=lambda module: module['order'])
+    sequence = [m for m in ordered if m['order'] >= anchor_order] + [m for m in ordered if m['order'] < anchor_order]
+
+    schedule = {}
+    last_end = None
+    for module in sequence:
+        if module['duration_weeks'] is None:
+            continue
+        if last_end is None:
+            if module['start'] is None:
+                continue
+            start = calendar.next_working_monday(module['start'])
+        else:
+            start = calendar.next_working_monday(last_end + datetime.timedelta(days=1))
+        end = start + datetime.timedelta(weeks=module['duration_weeks']) - datetime.timedelta(days=1)
+        schedule[module['id']] = (start, end)
+        last_end = end
+    return schedule
+
+
+def changed_dates(modules: list, schedule: dict) -> dict:
+    """The entries of schedule whose (start, end) differ from the modules' current dates."""
+    return {
+        module['id']: schedule[module['id']]
+        for module in modules
+        if module['id'] in schedule and schedule[module['id']] != (module['start'], module['end'])
+    }
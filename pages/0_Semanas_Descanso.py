@@ -3,8 +3,9 @@ import pandas as pd
 import datetime
 # Assuming 'config' module has 'setup_page' and 'db' (Firebase instance)
 from config import setup_page, db 
-from utils import date_format
+from utils import date_format, set_last_updated
 from utils_admin import load_breaks
+from break_calendar import break_entries, break_end_date
 
 # --- Page Setup and Login Check ---
 setup_page("Semanas de Descanso")
@@ -26,6 +27,7 @@ def save_break(break_id, break_data):
         # Create a fresh reference to the specific break using its ID
         break_ref = db.child("breaks").child(break_id)
         break_ref.set(break_data) # Set (create or overwrite) the data
+        set_last_updated('breaks')
         return True
     except Exception as e:
         st.error(f"Error al guardar la semana de descanso: {e}")
@@ -43,40 +45,25 @@ def display_breaks_table(breaks_data):
         return []
     
     breaks_list = []
-    for break_id, break_info in breaks_data.items():
-        if isinstance(break_info, dict):
-            start_date_str = break_info.get('start_date')
-            start_date = None
-            try:
-                # Attempt to parse start_date from ISO format string
-                if start_date_str:
-                    start_date = datetime.datetime.fromisoformat(start_date_str).date()
-            except ValueError:
-                st.warning(f"Formato de fecha inválido para el ID '{break_id}': '{start_date_str}'. Se ignorará esta entrada o se mostrará como 'N/A'.")
-                # start_date remains None, handled below
-            
-            duration_weeks = break_info.get('duration_weeks', 1)
-            
-            # Calculate end_date (Sunday of the last week) only if start_date was successfully parsed
-            end_date = (start_date + datetime.timedelta(days=(7 * duration_weeks) - 1)) if start_date else None
-            
-            breaks_list.append({
-                'ID': break_id,
-                'Eliminar': False,  # Add checkbox column
-                'Nombre': break_info.get('name', ''),
-                'Duración (semanas)': duration_weeks,
-                'Fecha Inicio': date_format(start_date, "%Y/%m/%d") if start_date else 'N/A',
-                'Fecha Fin': date_format(end_date, "%Y/%m/%d") if end_date else 'N/A',
-                'start_date_obj': start_date  # Store as date object for sorting
-            })
+    for entry in break_entries(breaks_data):
+        if entry['start_date'] is None:
+            st.warning(f"Formato de fecha inválido para el ID '{entry['id']}'. Se mostrará como 'N/A'.")
+        
+        breaks_list.append({
+            'ID': entry['id'],
+            'Eliminar': False,  # Add checkbox column
+            'Nombre': entry['name'],
+            'Duración (semanas)': entry['duration_weeks'],
+            'Fecha Inicio': date_format(entry['start_date'], "%Y/%m/%d") if entry['start_date'] else 'N/A',
+            # end_date is the Sunday of the last week
+            'Fecha Fin': date_format(entry['end_date'], "%Y/%m/%d") if entry['end_date'] else 'N/A',
+        })
     
     if not breaks_list:
         st.info("No hay semanas de descanso configuradas.")
         return []
     
-    # Sort by start date (most recent first)
-    breaks_list.sort(key=lambda x: x['start_date_obj'] or datetime.date.min, reverse=True)
-    
+    # break_entries already sorts by start date (most recent first)
     # Create DataFrame
     df = pd.DataFrame(breaks_list)
     
@@ -99,8 +86,7 @@ def display_breaks_table(breaks_data):
             'Nombre': 'Nombre',
             'Fecha Inicio': 'Inicio',
             'Fecha Fin': 'Fin',
-            'Duración (semanas)': 'Semanas',
-            'start_date_obj': None  # Hide the sort helper column
+            'Duración (semanas)': 'Semanas'
         },
         hide_index=True,
         use_container_width=True,
@@ -127,6 +113,7 @@ def display_breaks_table(breaks_data):
                     st.error(f"Error al eliminar la semana de descanso '{row['Nombre']}': {str(e)}")
             
             if success_count > 0:
+                set_last_updated('breaks') # Date calculations reload the break calendar
                 st.success(f"Se eliminaron {success_count} semana(s) de descanso correctamente.")
                 st.rerun()
     
@@ -198,8 +185,8 @@ def add_break_form():
     
     # Calculate and display the date range dynamically.
     # A week is from Monday to Sunday (7 days total)
-    end_date_display = start_date + datetime.timedelta(days=(7 * duration_weeks) - 1)  # Sunday of the last week
-    st.caption(f"Período: {date_format(start_date, "%Y/%m/%d")} al {date_format(end_date_display, "%Y/%m/%d")} "
+    end_date_display = break_end_date(start_date, duration_weeks)  # Sunday of the last week
+    st.caption(f"Período: {date_format(start_date, '%Y/%m/%d')} al {date_format(end_date_display, '%Y/%m/%d')} "
               f"({duration_weeks} semana{'s' if duration_weeks != 1 else ''})")
     
     # Regular Streamlit button for saving data.
@@ -255,6 +242,7 @@ def main():
         # Save the new break to Firebase
         try:
             db.child("breaks").child(break_id).set(break_data)
+            set_last_updated('breaks') # Date calculations reload the break calendar
             st.success("¡Semana de descanso agregada exitosamente!")
             st.rerun()
         except Exception as e:
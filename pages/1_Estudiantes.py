@@ -3,7 +3,8 @@ import pandas as pd
 import datetime
 import urllib.parse
 from config import setup_page
-from utils import save_students, load_students, get_available_modules, get_last_updated, set_last_updated, get_module_name_by_id
+from student_records import append_students
+from utils import save_students, save_students_changes, load_students, get_available_modules, get_last_updated, get_module_name_by_id
 
 def create_whatsapp_link(phone: str) -> str:
     if pd.isna(phone) or not str(phone).strip():
@@ -155,7 +156,6 @@ if uploaded_file is not None:
             if st.button("Guardar Estudiantes Subidos (reemplaza la lista existente)"):
                 if save_students(df_upload):
                     st.success("¡Datos de estudiantes del archivo guardados exitosamente! La lista existente fue reemplazada.")
-                    set_last_updated('students')
                     st.rerun()
     
     except Exception as e:
@@ -221,7 +221,7 @@ if 'text_area_input' in st.session_state and st.session_state.text_area_input an
             if 'selected_module' in st.session_state and 'selected_module_id' in st.session_state:
                 module_info = {
                     'fecha_inicio': st.session_state.selected_module.get('start_date'),
-                    'modulo': get_module_name_by_id(user_email, st.session_state.selected_module_id) or '',
+                    'modulo': get_module_name_by_id(user_email, st.session_state.selected_module_id, get_last_updated('modules', user_email)) or '',
                     'ciclo': st.session_state.selected_module.get('ciclo', ''),
                     'modulo_id': st.session_state.selected_module_id  # Store the Firebase key as modulo_id
                 }
@@ -273,10 +273,9 @@ if 'text_area_input' in st.session_state and st.session_state.text_area_input an
                     st.caption(f"Nombres omitidos (ya existen o duplicados): {', '.join(skipped_names)}")
             else:
                 new_students_df = pd.DataFrame(students_to_add_list)
-                updated_students_df = pd.concat([current_students_df, new_students_df], ignore_index=True)
+                updated_students_df = append_students(current_students_df, new_students_df)
                 
-                if save_students(updated_students_df):
-                    set_last_updated('students')
+                if save_students_changes(df_loaded, updated_students_df):
                     st.success(f"¡{added_count} estudiante(s) agregado(s) exitosamente!")
                     if skipped_names:
                         st.caption(f"Nombres omitidos (ya existen o duplicados en la entrada): {', '.join(skipped_names)}")
@@ -306,10 +305,10 @@ if df_loaded is not None and not df_loaded.empty:
                 df_display[col] = ''
         
         # Update module names using modulo_id
+        modules_last_updated = get_last_updated('modules', user_email)
         for idx, row in df_display.iterrows():
             if pd.notna(row.get('modulo_id')) and row['modulo_id']:
-                module_name = get_module_name_by_id(user_email, str(row['modulo_id']))
-                print("\n module name returned", module_name)
+                module_name = get_module_name_by_id(user_email, str(row['modulo_id']), modules_last_updated)
                 if module_name:
                     df_display.at[idx, 'modulo'] = module_name
         
@@ -426,12 +425,10 @@ if df_loaded is not None and not df_loaded.empty:
                 
                 # Apply changes to the original dataframe
                 for idx, row in name_changes.iterrows():
-                    original_idx = df_loaded.index[idx]
-                    updated_df.at[original_idx, 'nombre'] = row['nombre']
+                    updated_df.at[idx, 'nombre'] = row['nombre']
                 
-                # Save the updated dataframe
-                if save_students(updated_df):
-                    set_last_updated('students')
+                # Save only the changed names
+                if save_students_changes(df_loaded, updated_df):
                     st.success("¡Cambios guardados exitosamente!")
                     # Add a button to refresh the page to see changes
                     if st.button("Actualizar página"):
@@ -457,8 +454,7 @@ if df_loaded is not None and not df_loaded.empty:
                         ~current_students_df_from_db['nombre'].astype(str).str.lower().str.strip().isin(normalized_names_to_delete)
                     ]
                     
-                    if save_students(students_to_keep_df):
-                        set_last_updated('students')
+                    if save_students_changes(current_students_df_from_db, students_to_keep_df):
                         st.success(f"¡{len(names_to_delete)} estudiante(s) eliminado(s) exitosamente!")
                         st.rerun()
                     else:
@@ -3,9 +3,14 @@ import pandas as pd
 import datetime
 import time
 import urllib.parse
+import logging
 from config import setup_page
+from app_log import get_logger, log_event
 from utils import get_available_modules, get_last_updated, set_last_updated, get_module_name_by_id
-from utils_admin import admin_get_students_by_email, admin_get_student_group_emails, admin_load_students, admin_save_students, load_breaks, parse_breaks, calculate_end_date, load_breaks_from_db
+from student_records import append_students
+from utils_admin import admin_get_students_by_email, admin_get_student_group_emails, admin_load_students, admin_save_students, admin_save_students_changes, load_breaks, calculate_end_date, load_break_calendar
+
+logger = get_logger('pages.estudiantes_admin')
 
 def create_whatsapp_link(phone: str) -> str:
     if pd.isna(phone) or not str(phone).strip():
@@ -84,14 +89,11 @@ def get_end_date(start_date, num_weeks):
 
         start_date = start_date.date()  # <-- línea clave para evitar el error
 
-        break_data = load_breaks_from_db()
-        break_list = parse_breaks(break_data)
-        end_date = calculate_end_date(start_date, num_weeks, break_list)
+        end_date = calculate_end_date(start_date, num_weeks, load_break_calendar())
 
-        print("\n\nend_date", end_date)
         return end_date.isoformat()
     except (ValueError, TypeError) as e:
-        print("❌ Error al calcular la fecha final:", e)
+        log_event(logger, logging.WARNING, "students.end_date_failed", start=start_date, weeks=num_weeks, error=str(e))
         return None
 
 def get_weeks(selected_course):
@@ -361,7 +363,7 @@ if 'text_area_input' in st.session_state and st.session_state.text_area_input an
                 module_info = {
                     'fecha_inicio': st.session_state.selected_module.get('start_date'),
                     'fecha_fin': st.session_state.selected_module.get('end_date'),
-                    'modulo': get_module_name_by_id(selected_course, st.session_state.selected_module_id) or '',
+                    'modulo': get_module_name_by_id(selected_course, st.session_state.selected_module_id, get_last_updated('modules', selected_course)) or '',
                     'ciclo': st.session_state.selected_module.get('ciclo', ''),
                     'modulo_id': st.session_state.selected_module_id,
                     'duration_weeks': st.session_state.selected_module.get('duration_weeks')
@@ -434,10 +436,10 @@ if 'text_area_input' in st.session_state and st.session_state.text_area_input an
                     student_data.pop('teams', None)
 
                 new_students_df = pd.DataFrame(students_to_add_list_copy)
-                updated_students_df = pd.concat([current_students_df, new_students_df], ignore_index=True)
+                updated_students_df = append_students(current_students_df, new_students_df)
 
                 # print("\n\nupdated_students_df", updated_students_df)
-                if admin_save_students(selected_course, updated_students_df): # Pass selected_course
+                if admin_save_students_changes(selected_course, st.session_state.students_df_by_course[selected_course], updated_students_df): # Pass selected_course
                     st.success(f"¡{added_count} estudiante(s) agregado(s) exitosamente!")
                     if skipped_names:
                         st.caption(f"Nombres omitidos (ya existen o duplicados en la entrada): {', '.join(skipped_names)}")
@@ -476,9 +478,10 @@ if df_loaded is not None and not df_loaded.empty:
             df_display.insert(0, 'Eliminar', False)
 
         # Update module names using modulo_id
+        modules_last_updated = get_last_updated('modules', selected_course)
         for idx, row in df_display.iterrows():
             if pd.notna(row.get('modulo_id')) and row['modulo_id']:
-                module_name = get_module_name_by_id(selected_course, str(row['modulo_id']))
+                module_name = get_module_name_by_id(selected_course, str(row['modulo_id']), modules_last_updated)
                 # print("\n module name returned", module_name) # Diagnostic print, can remove
                 if module_name:
                     df_display.at[idx, 'modulo'] = module_name
@@ -601,8 +604,8 @@ if df_loaded is not None and not df_loaded.empty:
             # Iterate through the original DataFrame's indices to match with edited_df
             for i, original_row in df_loaded.iterrows():
                 # Get the corresponding row from edited_df (assuming row order is preserved by data_editor)
-                if i < len(edited_df): # Ensure index exists in edited_df
-                    edited_row = edited_df.loc[i] # Access by label if original index used for editable_df was simple numerical range
+                if i in edited_df.index: # Ensure index exists in edited_df
+                    edited_row = edited_df.loc[i] # editable_df keeps df_loaded's data/<i> labels
 
                     for col in user_editable_cols:
                         original_value = str(original_row.get(col, '')).strip()
@@ -613,7 +616,7 @@ if df_loaded is not None and not df_loaded.empty:
                             changes_detected = True
 
             if changes_detected:
-                if admin_save_students(selected_course, df_to_save): # Pass selected_course
+                if admin_save_students_changes(selected_course, df_loaded, df_to_save): # Pass selected_course
                     st.success("¡Cambios guardados exitosamente!")
                     st.session_state.students_df_by_course[selected_course] = df_to_save.copy() # Update session state copy
                     st.session_state.editor_key += 1 # Increment key to force data_editor refresh
@@ -642,7 +645,7 @@ if df_loaded is not None and not df_loaded.empty:
                     ~current_students_df_from_session['nombre'].astype(str).str.lower().str.strip().isin(normalized_names_to_delete)
                 ]
 
-                if admin_save_students(selected_course, students_to_keep_df): # Pass selected_course
+                if admin_save_students_changes(selected_course, current_students_df_from_session, students_to_keep_df): # Pass selected_course
                     st.success(f"¡{len(names_to_delete)} estudiante(s) eliminado(s) exitosamente!")
                     st.session_state.students_df_by_course[selected_course] = students_to_keep_df.copy() # Update session state copy
                     st.session_state.editor_key += 1 # Increment key to force data_editor refresh
@@ -2,11 +2,11 @@
 import streamlit as st
 import pandas as pd
 import datetime
-import re
-import io
 import time
-from utils import save_attendance, load_students, delete_attendance_dates, get_attendance_dates, get_last_updated
+from utils import save_attendance, save_attendance_bulk, load_students, delete_attendance_dates, get_attendance_dates, get_last_updated
 from config import setup_page, db
+from attendance_ingest import ingest_reports
+from profiling import checkpoint
 
 # --- Login Check ---
 if not st.session_state.get('logged_in', False):
@@ -72,87 +72,6 @@ if 'show_delete_selected_dialog' not in st.session_state:
 if 'to_delete' not in st.session_state:
     st.session_state.to_delete = []
 
-# --- Helper Functions ---
-def extract_date_from_filename(filename: str) -> datetime.date | None:
-    # Define patterns to match
-    patterns = [
-        r'(Informe de Asistencia )',
-        r'(Attendance report )'
-    ]
-
-    for pattern in patterns:
-        match_keyword = re.search(pattern, filename, re.IGNORECASE)
-        if match_keyword:
-            # Get the part after the matched keyword
-            date_str_candidate = filename[match_keyword.end():]
-
-            # Look for date pattern at the start
-            match_date = re.match(r'(\d{1,2})-(\d{1,2})-(\d{2})', date_str_candidate)
-            if match_date:
-                month, day, year_short = map(int, match_date.groups())
-                year = 2000 + year_short
-                try:
-                    return datetime.date(year, month, day)
-                except ValueError:
-                    return None
-    return None
-
-
-def parse_attendance_report(file_content_str: str, filename_for_debug: str) -> list:
-    lines = file_content_str.splitlines()
-    start_marker_found_at = -1
-    end_marker_found_at = -1
-
-    for i, line in enumerate(lines):
-        line_stripped_lower = line.strip().lower()
-        if line_stripped_lower.startswith("2. participants"):
-            start_marker_found_at = i
-            continue 
-        if start_marker_found_at != -1 and line_stripped_lower.startswith("3. in-meeting activities"):
-            end_marker_found_at = i
-            break 
-
-    if start_marker_found_at == -1:
-        st.warning(f"No se pudo encontrar el marcador de sección '2. Participants' en '{filename_for_debug}'.")
-        return []
-
-    actual_data_start_index = start_marker_found_at + 1
-    actual_data_end_index = end_marker_found_at if end_marker_found_at != -1 else len(lines)
-
-    participant_data_lines = lines[actual_data_start_index : actual_data_end_index]
-
-    if not participant_data_lines:
-        st.warning(f"No se encontraron líneas de datos entre '2. Participantes' y '3. Actividades en la reunión' (o fin de archivo) en '{filename_for_debug}'.")
-        return []
-
-    header_row_index_in_block = -1
-    for i, line_in_block in enumerate(participant_data_lines):
-        line_norm = line_in_block.strip().lower()
-        if "name" in line_norm and ("first join" in line_norm or "last leave" in line_norm or "email" in line_norm or "duration" in line_norm):
-            header_row_index_in_block = i
-            break
-    if header_row_index_in_block == -1:
-        st.warning(f"No se pudo encontrar la fila de encabezado en el archivo: {filename_for_debug}")
-        return []
-
-    csv_like_data_for_pandas = "\n".join(participant_data_lines[header_row_index_in_block:])
-    
-    try:
-        df = pd.read_csv(io.StringIO(csv_like_data_for_pandas), sep='\t')
-        df.columns = [col.strip().lower() for col in df.columns] 
-        
-        if "name" in df.columns:
-            return df["name"].astype(str).str.strip().unique().tolist()
-        else:
-            st.warning(f"Columna 'nombre' no encontrada después del análisis en '{filename_for_debug}'. Columnas encontradas: {df.columns.tolist()}")
-            return []
-    except pd.errors.EmptyDataError:
-        st.warning(f"No se pudieron analizar filas de datos del contenido CSV en '{filename_for_debug}'. El encabezado identificado podría haber sido la última línea o los datos estaban vacíos.")
-        return []
-    except Exception as e:
-        st.error(f"Error analizando datos CSV de la sección 'Participantes' de '{filename_for_debug}': {e}")
-        return []
-
 # --- Dialog Functions ---
 def reset_dialog_states():
     """Reset all dialog states to ensure only one can be open at a time"""
@@ -317,6 +236,7 @@ uploaded_reports = st.file_uploader(
     ],
     help="Suba archivos CSV. La fecha se detecta del nombre de archivo (p.ej., '...Attendance Report MM-DD-YY.csv')"
 )
+checkpoint("widgets")
 
 if uploaded_reports:
     # Clear previous data if new files are uploaded
@@ -329,52 +249,41 @@ if uploaded_reports:
     files_processed_summary = {}
     files_skipped_summary = {}
 
-    for report_file in uploaded_reports:
-        if report_file.name in st.session_state.processed_files_this_session:
-            continue
+    pending_reports = [
+        (report_file.name, report_file.getvalue())
+        for report_file in uploaded_reports
+        if report_file.name not in st.session_state.processed_files_this_session
+    ]
 
-        file_date = extract_date_from_filename(report_file.name)
+    if pending_reports:
+        progress_bar = st.progress(0.0, text=f"Procesando {len(pending_reports)} archivo(s)...")
 
-        if not file_date:
-            st.warning(f"Omitiendo '{report_file.name}': No se pudo extraer la fecha del nombre del archivo.")
-            files_skipped_summary[report_file.name] = "Sin fecha en el nombre del archivo"
-            st.session_state.processed_files_this_session.add(report_file.name)
-            continue
+        def report_progress(done, total, result):
+            progress_bar.progress(done / total, text=f"Procesado {done} de {total}: {result['filename']}")
 
-        file_bytes = report_file.getvalue()
-        file_content_str = None
-        successful_encoding = None
-        tried_encodings_list = ['utf-16', 'utf-8', 'utf-8-sig', 'latin-1', 'cp1252'] 
+        names_by_date, ingest_results = ingest_reports(pending_reports, on_progress=report_progress)
+        progress_bar.empty()
+        checkpoint("report parsing")
 
-        try:
-            file_content_str = file_bytes.decode('utf-16')
-            successful_encoding = 'utf-16'
-        except UnicodeDecodeError:
-            other_encodings_to_attempt = [enc for enc in tried_encodings_list if enc != 'utf-16']
-            for enc in other_encodings_to_attempt:
-                try:
-                    file_content_str = file_bytes.decode(enc)
-                    successful_encoding = enc
-                    break 
-                except UnicodeDecodeError:
-                    continue
-        
-        if file_content_str is None:
-            st.error(f"Error al decodificar '{report_file.name}'. Intentados: {', '.join(tried_encodings_list)}. El archivo podría estar corrupto o en una codificación no soportada.")
-            files_skipped_summary[report_file.name] = "Falló la decodificación"
-            st.session_state.processed_files_this_session.add(report_file.name)
-            continue
-
-        names_from_report = parse_attendance_report(file_content_str, report_file.name)
-        
-        if names_from_report:
+        for file_date, names_from_report in names_by_date.items():
             st.session_state.current_batch_data_by_date.setdefault(file_date, set()).update(names_from_report)
-            files_processed_summary.setdefault(file_date, []).append(report_file.name)
-        else:
-            st.warning(f"No se pudieron extraer nombres de '{report_file.name}' (después de decodificación exitosa). Verifique la lógica del analizador o la estructura del archivo.")
-            files_skipped_summary[report_file.name] = "Falló el análisis de nombres"
-        
-        st.session_state.processed_files_this_session.add(report_file.name)
+
+        for result in ingest_results:
+            filename = result['filename']
+            if result['names']:
+                files_processed_summary.setdefault(result['date'], []).append(filename)
+            elif result['date'] is None:
+                st.warning(f"Omitiendo '{filename}': No se pudo extraer la fecha del nombre del archivo.")
+                files_skipped_summary[filename] = result['error']
+            elif result['error'] and result['error'].startswith("Falló la decodificación"):
+                st.error(f"Error al decodificar '{filename}' ({result['encoding']}). El archivo podría estar corrupto o en una codificación no soportada.")
+                files_skipped_summary[filename] = "Falló la decodificación"
+            else:
+                if result['error']:
+                    st.warning(f"{result['error']} ('{filename}')")
+                st.warning(f"No se pudieron extraer nombres de '{filename}' (después de decodificación exitosa). Verifique la lógica del analizador o la estructura del archivo.")
+                files_skipped_summary[filename] = "Falló el análisis de nombres"
+            st.session_state.processed_files_this_session.add(filename)
 
     if files_processed_summary:
         st.markdown("### ✅ Archivos Procesados Exitosamente")
@@ -405,6 +314,7 @@ if uploaded_reports:
         if st.button("Preparar Tablas de Asistencia para Edición"):
             students_last_updated = get_last_updated('students')
             students_df, _ = load_students(students_last_updated)
+            checkpoint("data load")
             if students_df is None or students_df.empty:
                 st.error("No se encontraron datos de estudiantes. Por favor, suba una lista de estudiantes en la página 'Gestión de Estudiantes' primero.")
                 st.stop()
@@ -426,6 +336,7 @@ if uploaded_reports:
                 else:
                     st.info(f"No se generaron registros de asistencia para {date_obj.strftime('%Y-%m-%d')} porque la lista de estudiantes está vacía o no hubo coincidencias.")
             
+            checkpoint("transforms")
             if st.session_state.prepared_attendance_dfs:
                 st.success("Tablas de asistencia preparadas. Proceda al Paso 3.")
                 st.rerun()
@@ -496,26 +407,28 @@ if uploaded_reports:
                     
                     # Add Save All button at the top
                     if st.button("💾 Guardar Todos los Reportes", type="primary", key="save_all_reports"):
-                        save_success = True
-                        saved_count = 0
-                        
-                        for date_obj, df in st.session_state.prepared_attendance_dfs.items():
-                            date_str = date_obj.strftime('%Y-%m-%d')
-                            attendance_data = df.to_dict('records')
-                            if save_attendance(date_obj, attendance_data):
-                                saved_count += 1
-                            else:
-                                save_success = False
+                        attendance_by_date = {
+                            date_obj: df.to_dict('records')
+                            for date_obj, df in st.session_state.prepared_attendance_dfs.items()
+                        }
+                        checkpoint("widgets")
+                        save_status, save_seconds = save_attendance_bulk(attendance_by_date)
+                        checkpoint("save")
+                        saved_count = sum(save_status.values())
+                        save_success = all(save_status.values())
+                        for date_str, saved in save_status.items():
+                            if not saved:
                                 st.error(f"Error al guardar la asistencia para {date_str}.")
                         
                         if save_success and saved_count > 0:
                             st.toast("¡Informes guardados exitosamente!", icon="✅")
-                            st.success(f"¡Se guardaron exitosamente {saved_count} reporte(s) de asistencia!")
+                            st.success(f"¡Se guardaron exitosamente {saved_count} reporte(s) de asistencia en {save_seconds:.2f} s!")
                             st.balloons()
                             st.session_state.processed_files_this_session = set()
                             
                             # Add delay to ensure toast is visible before rerun
                             time.sleep(3)  # 3 seconds delay
+                            checkpoint("rerun delay")
                             st.rerun()
                         elif saved_count == 0:
                             st.warning("No se pudo guardar ningún reporte. Por favor intente de nuevo.")
@@ -3,9 +3,11 @@ import streamlit as st
 import pandas as pd
 import urllib.parse
 import datetime
-from config import setup_page # Assuming db is implicitly used by load_attendance via utils
-from utils import load_attendance, load_students # Use the centralized functions
-from utils import create_filename_date_range,get_student_email, get_student_start_date, get_student_phone, date_format, get_attendance_dates, get_last_updated
+from config import setup_page # Assuming db is implicitly used by load_attendance_range via utils
+from utils import load_attendance_range, load_attendance_stats_range, load_students # Use the centralized functions
+from utils import create_filename_date_range, format_date_for_display, date_format, get_attendance_dates, get_last_updated
+from attendance_matrix import normalize_student_keys, daily_counts, stats_attendance_matrix, never_attended, student_summary, build_contact_index, join_contact_info
+from profiling import checkpoint
 
 # --- Login Check ---
 if not st.session_state.get('logged_in', False):
@@ -51,10 +53,12 @@ with col2:
         key="report_end_date",
         format="MM/DD/YYYY"
     )
+checkpoint("widgets")
 
+all_attendance = []
 try:
     # Get all attendance dates
-    attendance_last_updated = get_last_updated('attendance')
+    attendance_last_updated = get_last_updated('attendance', st.session_state.email)
     all_attendance = get_attendance_dates(attendance_last_updated)
     
     if all_attendance:
@@ -67,6 +71,7 @@ try:
         
 except Exception as e:
     st.error(f"Error al cargar fechas de asistencia: {str(e)}")
+checkpoint("data load")
 
 if start_date > end_date:
     st.error("Error: La fecha de inicio no puede ser posterior a la fecha de fin.") # Translated
@@ -79,52 +84,59 @@ else:
             st.error("No se pudo cargar la lista de estudiantes. Por favor, registre estudiantes en la página 'Estudiantes'.") # Translated
             st.stop()
         
-        # Assuming student names are in 'nombre' column and are unique identifiers
-        master_student_list = set(all_students_df['nombre'].astype(str).str.strip().unique())
-        total_registered_students = len(master_student_list)
+        # Students are matched by normalized name (case and surrounding spaces ignored)
+        roster_keys = normalize_student_keys(all_students_df['nombre']).unique()
+        total_registered_students = len(roster_keys)
+        contact_index = build_contact_index(all_students_df)
+        checkpoint("data load")
 
         # 2. Process attendance data for the date range
         daily_summary_data = []
-        students_present_in_range = set() # This still considers all days for 'never attended'
-        
-        current_date_iter = start_date
         
         spinner_message = f"Cargando y procesando asistencia desde {start_date.strftime('%Y-%m-%d')} hasta {end_date.strftime('%Y-%m-%d')}..." # Translated
         with st.spinner(spinner_message):
-            while current_date_iter <= end_date:
-                # Exclude weekends (Saturday=5, Sunday=6 in weekday() method)
-                if current_date_iter.weekday() >= 5: # 0=Monday, 1=Tuesday, ..., 5=Saturday, 6=Sunday
-                    current_date_iter += datetime.timedelta(days=1)
-                    continue # Skip to next day if it's a weekend
+            attendance_last_updated = get_last_updated('attendance', st.session_state.email)
 
-                attendance_last_updated = get_last_updated('attendance')
-                daily_attendance_dict = load_attendance(current_date_iter, attendance_last_updated) # {name: {'status': 'Present', ...}}
-                
-                present_today_count = 0
-                if daily_attendance_dict:
-                    for student_name, details in daily_attendance_dict.items():
-                        # Ensure names are consistently handled (e.g. case, stripping) if needed for matching
-                        # For now, assume names from load_attendance match those in master_student_list
-                        if details.get('Presente', False):
-                            present_today_count += 1
-                            # For 'never attended', we still need to know if they were present on any day, including potential weekends if data existed
-                            # However, the daily summary table will exclude weekends.
-                            # If the requirement is to also exclude weekend presence from 'never attended', this logic would need adjustment.
-                            # For now, students_present_in_range includes all days where data is found.
-                            students_present_in_range.add(student_name) # Or details.get('name', student_name)
-                
+            # Exclude weekends (Saturday=5, Sunday=6 in weekday() method)
+            report_dates = [
+                start_date + datetime.timedelta(days=offset)
+                for offset in range((end_date - start_date).days + 1)
+                if (start_date + datetime.timedelta(days=offset)).weekday() < 5
+            ]
+            report_keys = [d.strftime('%Y-%m-%d') for d in report_dates]
+
+            # One small range read of the per-day aggregates (attendance_stats/<user>/)
+            day_stats = load_attendance_stats_range(start_date, end_date, attendance_last_updated)
+            # Dates saved before the aggregates existed need the full records
+            saved_dates = set(all_attendance)
+            if any(key in saved_dates and key not in day_stats for key in report_keys):
+                # One range read for the whole period: students × dates boolean matrix
+                attendance_matrix = load_attendance_range(start_date, end_date, attendance_last_updated)
+            else:
+                attendance_matrix = stats_attendance_matrix(day_stats)
+            checkpoint("data load")
+
+            weekday_columns = [key for key in report_keys if key in attendance_matrix.columns]
+            # Only roster students count towards the report
+            weekday_matrix = attendance_matrix.reindex(index=roster_keys, columns=weekday_columns, fill_value=False)
+            counts = daily_counts(weekday_matrix, total_registered_students)
+
+            for report_date in report_dates:
+                date_key = report_date.strftime('%Y-%m-%d')
+                present_today_count = int(counts['present'].get(date_key, 0))
                 absent_today_count = total_registered_students - present_today_count
-                english_day_name = current_date_iter.strftime('%A')
+                english_day_name = report_date.strftime('%A')
                 spanish_day_name = SPANISH_DAY_NAMES.get(english_day_name, english_day_name) # Fallback to English if not found
                 
                 daily_summary_data.append({
-                    'Fecha': date_format(current_date_iter, '%Y-%m-%d'), # Keep 'Fecha' or 'Date'
+                    'Fecha': date_format(report_date, '%Y-%m-%d'), # Keep 'Fecha' or 'Date'
                     'Día': spanish_day_name.capitalize(), # Spanish Day Name, capitalized
                     '# Presentes': present_today_count, # Translated
                     '# Ausentes': absent_today_count    # Translated
                 })
-                current_date_iter += datetime.timedelta(days=1)
         
+        checkpoint("transforms")
+
         # 3. Display Daily Summary Report
         if daily_summary_data:
             summary_header = f"Resumen Diario de Asistencia: {date_format(start_date, '%Y-%m-%d')} hasta {date_format(end_date, '%Y-%m-%d')}" # Translated
@@ -146,10 +158,23 @@ else:
         else:
             st.info("No se procesaron datos de asistencia para días laborables en el rango de fechas seleccionado.") # Translated
 
+        # Per-student attendance rate and absence streaks over the weekdays with data
+        if weekday_columns:
+            with st.expander("Asistencia por Estudiante"):
+                per_student = student_summary(weekday_matrix).join(contact_index['nombre'])
+                per_student_display = pd.DataFrame({
+                    'Nombre': per_student['nombre'],
+                    'Días Presente': per_student['days_present'],
+                    '% Asistencia': (per_student['attendance_rate'] * 100).round(1),
+                    'Máx. Ausencias Seguidas': per_student['longest_absent_streak'],
+                    'Ausencias Seguidas (actual)': per_student['current_absent_streak']
+                }).sort_values('% Asistencia')
+                st.dataframe(per_student_display, use_container_width=True, hide_index=True)
+
         # 4. Identify and Display Students Who Never Attended
         st.divider()
-        st.subheader("Estudiantes que Nunca Asistieron en las fechas Seleccionadas") # Clarify this includes weekends if data existed
-        students_never_attended_list = sorted(list(master_student_list - students_present_in_range))
+        st.subheader("Estudiantes que Nunca Asistieron en las fechas Seleccionadas")
+        never_attended_keys = never_attended(weekday_matrix, roster_keys)
         
         def create_whatsapp_link(phone: str, message: str) -> str:
             phone = ''.join(filter(str.isdigit, phone))
@@ -163,24 +188,18 @@ else:
         def get_first_name(full_name: str) -> str:
             return full_name.strip().split()[0].capitalize()
 
-        if students_never_attended_list:
-            warning_msg = f"{len(students_never_attended_list)} estudiante(s) no tuvieron registros de 'Presente' en este período:"
+        if len(never_attended_keys) > 0:
+            warning_msg = f"{len(never_attended_keys)} estudiante(s) no tuvieron registros de 'Presente' en este período:"
             st.warning(warning_msg)
             
-            # Get student data with start dates
-            try:
-                students_last_updated = get_last_updated('students')
-                all_students_df, _ = load_students(students_last_updated)
-            except Exception as e:
-                st.error(f"Error loading student data: {str(e)}")
-                all_students_df = pd.DataFrame()
+            # Resolve start date, phone and email for every absent student in one lookup
+            contacts = join_contact_info(never_attended_keys, contact_index).fillna('')
             
-            # Create DataFrame for display with start dates
             never_attended_data = []
-            for student_name in students_never_attended_list:
-                start_date = get_student_start_date(all_students_df, student_name)
-                phone = get_student_phone(all_students_df, student_name)
-                email = get_student_email(all_students_df, student_name)
+            for contact in contacts.itertuples(index=False):
+                student_name = str(contact.nombre)
+                phone = str(contact.telefono).strip()
+                email = str(contact.email).strip()
                 student_name_only = get_first_name(student_name)
                 if phone:
                     message = f"Hola {student_name_only}, notamos que no has asistido a clases. ¿Todo está bien? Por favor contáctanos."
@@ -196,7 +215,7 @@ else:
     
                 never_attended_data.append({
                     'Nombre': student_name.strip(),
-                    'Inicio': start_date,
+                    'Inicio': format_date_for_display(contact.fecha_inicio),
                     'Teléfono': phone or 'No disponible',
                     'Email': email or 'No disponible',
                     'WhatsApp': whatsapp_link,
@@ -262,3 +281,5 @@ else:
 
         else:
             st.success("Todos los estudiantes registrados asistieron al menos una vez en el rango de fechas seleccionado (considerando todos los días).")
+
+checkpoint("widgets")
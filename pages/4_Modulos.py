@@ -4,9 +4,14 @@ import datetime
 import time
 import math
 import uuid
+import logging
 from config import setup_page, db
+from app_log import get_logger, log_event
 from utils import set_last_updated  
 from utils import load_modules
+from row_highlight import date_range_status, highlight_rows
+
+logger = get_logger('pages.modulos')
 
 # --- Page Setup and Login Check ---
 setup_page("Gestión de Módulos")
@@ -22,17 +27,6 @@ def invalidate_cache_and_rerun():
         del st.session_state.modules_df
     st.rerun()
 
-def highlight_current_module(row):
-    today = datetime.date.today()
-    try:
-        start_date = datetime.datetime.strptime(row['Inicio'], '%m/%d/%Y').date()
-        end_date = datetime.datetime.strptime(row['Fin'], '%m/%d/%Y').date()
-        if start_date <= today <= end_date:
-            return ['background-color: #e6f7ff'] * len(row)
-    except:
-        pass
-    return [''] * len(row)
-
 # --- MAIN APP LOGIC ---
 user_email = st.session_state.get('email')
 
@@ -44,16 +38,13 @@ st.divider()
 if user_email:
     # st.button("Limpiar Caché", on_click=invalidate_cache_and_rerun)
 
-    print("user_email", user_email)
-    print("modules_df", st.session_state.modules_df)
 
     # Cargar desde la base de datos si el caché está vacío
     if 'modules_df' not in st.session_state or st.session_state.modules_df is None or st.session_state.modules_df.empty:
         with st.spinner("Cargando módulos..."):
             st.session_state.modules_df = load_modules(user_email)
-            print("----modules_df recargado", st.session_state.modules_df)
-    else:
-        print("Caché no está vacío", st.session_state.modules_df)
+            log_event(logger, logging.DEBUG, "modules.loaded", sampled=True, user=user_email,
+                      rows=lambda: len(st.session_state.modules_df))
     
     modules_df = st.session_state.modules_df
 
@@ -76,6 +67,8 @@ if user_email:
 
         # Sort by actual datetime
         modules_df = modules_df.sort_values('Inicio')
+        # Highlight the module running today, from the parsed dates
+        row_status = date_range_status(modules_df['Inicio'], modules_df['Fin'], datetime.date.today())
 
         # Format as strings for display (after sorting)
         for col in ['Inicio', 'Fin']:
@@ -91,7 +84,7 @@ if user_email:
             'Orden': 'width: 60px;'  # Also making Orden narrower for consistency
         }
 
-        styled_df = modules_df.style.apply(highlight_current_module, axis=1)
+        styled_df = highlight_rows(modules_df, row_status, {'current': 'background-color: #e6f7ff'})
         st.dataframe(styled_df, hide_index=True, use_container_width=True)
         
         # # --- Automatic Recalculation Logic ---
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 from config import setup_page
-from utils_admin import delete_module_from_db, update_module_to_db, admin_get_student_group_emails, save_new_module_to_db, admin_get_available_modules, load_breaks_from_db, parse_breaks, adjust_date_for_breaks, row_to_clean_dict, transform_module_input, sync_firebase_updates
+from utils_admin import admin_sync_modules, admin_save_module_dates, admin_get_student_group_emails, admin_get_available_modules, load_break_calendar, is_missing_firebase_key
+from module_schedule import find_anchor, schedule_modules, changed_dates
+from profiling import checkpoint
 import datetime
 import time
 
@@ -27,25 +29,9 @@ if 'modules_df_by_course' not in st.session_state:
     st.session_state.modules_df_by_course = {} # This will store DataFrames per course
 if 'force_refresh' not in st.session_state:
     st.session_state.force_refresh = False
-if 'modules_date_updates' not in st.session_state:
-    st.session_state.modules_date_updates = {}
 # --- End Initialize session state variables ---
 
 
-date_updates = st.session_state.get("modules_date_updates", {})
-
-if date_updates:
-    for course_email, course_data in date_updates.items():
-        for firebase_key, module_data in course_data.items():
-            if firebase_key is not None:
-                update_module_to_db(course_email, firebase_key, {
-                    'fecha_inicio_1': module_data['Fecha Inicio'].strftime('%Y-%m-%d'),
-                    'fecha_fin_1': module_data['Fecha Fin'].strftime('%Y-%m-%d')
-                })
-           
-    st.session_state.modules_date_updates = {} # Reset the cache after updating Firebase
-
-
 # --- Select Course ---
 st.subheader("1. Seleccionar Curso")
 
@@ -77,22 +63,25 @@ else:
     modules_selected_course = None # Ensure it's explicitly None if no courses
 
 
-def calculate_dates(start_date):
-    breaks_data = load_breaks_from_db()
-    # print("\n\nbreaks_data", breaks_data)
-    breaks = parse_breaks(breaks_data)
-    # print("\n\nbreaks", breaks)
-    # Ensure start_date is a date object for comparison
-    if hasattr(start_date, 'date'):
-        start_date = start_date.date()
-    adjusted_start = adjust_date_for_breaks(start_date, breaks)
-    # Convert back to datetime for consistency with the rest of the app
-    if isinstance(adjusted_start, datetime.date):
-        return pd.Timestamp(adjusted_start)
-    return adjusted_start
-
-def is_missing_firebase_key(val):
-    return pd.isna(val) or val in ["", "None", None]
+def to_date(value):
+    """A datetime.date for a Timestamp/date value, or None when missing."""
+    if pd.isna(value):
+        return None
+    return value.date() if hasattr(value, 'date') else value
+
+def schedule_rows(df):
+    """Module rows of the editor as plain values for module_schedule; rows without 'Orden' are skipped."""
+    return [
+        {
+            'id': index,
+            'order': order,
+            'duration_weeks': None if pd.isna(duration) else int(duration),
+            'start': to_date(start),
+            'end': to_date(end),
+        }
+        for index, order, duration, start, end in zip(df.index, df['Orden'], df['Duración'], df['Fecha Inicio'], df['Fecha Fin'])
+        if pd.notna(order)
+    ]
 
 # --- Select Module ---
 if modules_selected_course: # Only show module selection if a course is selected
@@ -119,6 +108,8 @@ try:
             module_options = module_data
             # print("\n\nmodule_options from db\n\n ----- ", module_options)
     
+    checkpoint("data load")
+
     # If we have valid module_options, process them
     if module_options is not None and ((isinstance(module_options, pd.DataFrame) and not module_options.empty) or 
                                      (isinstance(module_options, (list, dict)) and len(module_options) > 0)):
@@ -175,6 +166,8 @@ try:
             if date_col in display_df.columns:
                 display_df[date_col] = pd.to_datetime(display_df[date_col], errors='coerce')
 
+        checkpoint("transforms")
+
         # Define column configurations for st.data_editor
         editor_column_config = {
             "ID Módulo": st.column_config.TextColumn(disabled=True),
@@ -209,6 +202,7 @@ try:
             column_config=editor_column_config,
             key=editor_key
         )
+        checkpoint("widgets")
        
         # Add save button
 
@@ -219,155 +213,58 @@ try:
             
             # recalculate dates    
             if st.button("Recalcular las fechas", key="recalcular_fechas"):
-                today = pd.Timestamp.today().normalize()
-
-                # Encuentra el módulo que contiene la fecha de hoy
-                module_with_today = edited_df[
-                    (edited_df['Fecha Inicio'].notna()) &
-                    (edited_df['Fecha Fin'].notna()) &
-                    (edited_df['Fecha Inicio'] <= today) &
-                    (edited_df['Fecha Fin'] >= today)
-                ]
-
-                if not module_with_today.empty:
-                    current_index = module_with_today.index[0]
-                    current_order = edited_df.loc[current_index, 'Orden']
-                    # print(f"Hoy cae en el módulo con orden {current_order}")
-
-                    changed_rows = {}
-                    last_date_used = None
-
-                    # 👉 Recalcula fechas hacia adelante desde el módulo actual
-                    for index, row in edited_df[edited_df['Orden'] >= current_order].sort_values('Orden').iterrows():
-                        if pd.notna(row['Duración']):
-                            if last_date_used is None:
-                                new_start_date = calculate_dates(row['Fecha Inicio'])
-                            else:
-                                new_start_date = calculate_dates(last_date_used + pd.DateOffset(days=1))
-
-                            new_end_date = new_start_date + pd.DateOffset(weeks=row['Duración']) - pd.DateOffset(days=1)
-
-                            old_start = edited_df.loc[index, 'Fecha Inicio']
-                            old_end = edited_df.loc[index, 'Fecha Fin']
-
-                            if pd.Timestamp(new_start_date) != pd.Timestamp(old_start) or pd.Timestamp(new_end_date) != pd.Timestamp(old_end):
-                                edited_df.loc[index, 'Fecha Inicio'] = new_start_date
-                                edited_df.loc[index, 'Fecha Fin'] = new_end_date
-                                firebase_key = edited_df.loc[index, 'firebase_key']
-                                changed_rows.setdefault(modules_selected_course, {})[firebase_key] = {
-                                    'Fecha Inicio': new_start_date,
-                                    'Fecha Fin': new_end_date
-                                }
-
-                            last_date_used = new_end_date
-
-                    # 🔁 Recalcula módulos anteriores al módulo actual si están en el pasado
-                    for index, row in edited_df[edited_df['Orden'] < current_order].sort_values('Orden').iterrows():
-                        if pd.notna(row['Duración']) and last_date_used is not None:
-                            new_start_date = calculate_dates(last_date_used + pd.DateOffset(days=1))
-                            new_end_date = new_start_date + pd.DateOffset(weeks=row['Duración']) - pd.DateOffset(days=1)
-
-                            old_start = edited_df.loc[index, 'Fecha Inicio']
-                            old_end = edited_df.loc[index, 'Fecha Fin']
-
-                            if pd.Timestamp(new_start_date) != pd.Timestamp(old_start) or pd.Timestamp(new_end_date) != pd.Timestamp(old_end):
-                                edited_df.loc[index, 'Fecha Inicio'] = new_start_date
-                                edited_df.loc[index, 'Fecha Fin'] = new_end_date
-                                firebase_key = edited_df.loc[index, 'firebase_key']
-                                changed_rows.setdefault(modules_selected_course, {})[firebase_key] = {
-                                    'Fecha Inicio': new_start_date,
-                                    'Fecha Fin': new_end_date
-                                }
-
-                            last_date_used = new_end_date
-
-                    # Guarda cambios
-                    st.session_state.modules_df_by_course[modules_selected_course] = edited_df
-                    st.session_state.modules_date_updates = changed_rows
-
-                    # print(f"\n\nFinal result:\n{edited_df}")
-                    st.rerun()
+                modules = schedule_rows(edited_df)
+                anchor = find_anchor(modules, datetime.date.today())
+
+                if anchor is not None:
+                    # Recalcula todo el calendario en una pasada: desde el módulo actual hacia adelante
+                    # y luego los módulos anteriores, que pasan al final de la secuencia
+                    changes = changed_dates(modules, schedule_modules(modules, anchor, load_break_calendar()))
+                    checkpoint("module cascade")
+                    if changes:
+                        changed_index = list(changes)
+                        edited_df.loc[changed_index, 'Fecha Inicio'] = [pd.Timestamp(start) for start, _ in changes.values()]
+                        edited_df.loc[changed_index, 'Fecha Fin'] = [pd.Timestamp(end) for _, end in changes.values()]
+
+                    # Guarda todas las fechas cambiadas en una sola actualización
+                    dates_by_key = {
+                        edited_df.loc[index, 'firebase_key']: dates
+                        for index, dates in changes.items()
+                        if not is_missing_firebase_key(edited_df.loc[index, 'firebase_key'])
+                    }
+                    saved = admin_save_module_dates(modules_selected_course, dates_by_key)
+                    checkpoint("save")
+                    if saved:
+                        st.session_state.modules_df_by_course[modules_selected_course] = edited_df
+                        st.rerun()
                 else:
                     st.warning("No se encontró ningún módulo correspondiente al día actual.")
 
             # end date calculation
             if all(pd.notna(last_row[col]) for col in ['Fecha Inicio', 'Fecha Fin', 'Duración', 'Orden']):
                 if st.button("💾 Guardar Cambios"):
-                    
-
-                    # for key, updates in date_updates.items():
-                    #     idx = edited_df.index[edited_df['firebase_key'] == key]
-                    #     if not idx.empty:
-                    #         for field, value in updates.items():
-                    #             edited_df.loc[idx, field] = value
-                    
-                    # Renombrar columnas visibles a nombres de base de datos
-                    edited_df_for_save = edited_df.rename(columns=reverse_display_names)
                     old_df = st.session_state.modules_df_by_course[modules_selected_course]
-                    new_df = edited_df_for_save.copy()
-
-                    old_keys = set(old_df["firebase_key"].dropna().astype(str))
-                    new_keys = set(new_df["firebase_key"].dropna().astype(str))
-
-                    # Detectar filas nuevas (sin firebase_key)
-                    new_rows = new_df[new_df["firebase_key"].apply(is_missing_firebase_key)]
-
-                    # Guardar filas nuevas
-                    for _, row in new_rows.iterrows():
-                        clean = row_to_clean_dict(row)
-                        data = transform_module_input(clean)
-                        firebase_key = save_new_module_to_db(modules_selected_course, data)
-
-                        # Update the end date of the last module
-                        max_order = edited_df.loc[~edited_df.index.isin(new_rows.index), 'Orden'].max()
-                        max_order_module = edited_df.loc[edited_df['Orden'] == max_order].squeeze()
-                        fecha_fin = max_order_module['Fecha Fin']
-                        if pd.notna(fecha_fin):
-                            fecha_fin = fecha_fin + pd.DateOffset(days=1)
-                            # print(f"\n\nFecha fin del módulo con mayor orden que no es el actual (ID: {firebase_key}): {fecha_fin}")
-                            # data["Fecha Fin"] = fecha_fin
-                        
-
-                        if firebase_key:
-                            new_df.loc[row.name, "firebase_key"] = firebase_key
-                            st.session_state.modules_df_by_course[modules_selected_course] = new_df.copy()
-                            st.success(f"Módulo nuevo guardado con ID: {firebase_key}")
-                            st.session_state.editor_key += 1
-                            time.sleep(1)
-                            st.rerun()
-
-                    # 🔁 Detectar y guardar filas modificadas
-                    common_keys = old_keys & new_keys
-                    for key in common_keys:
-                        old_row = old_df[old_df["firebase_key"] == key].squeeze()
-                        new_row = new_df[new_df["firebase_key"] == key].squeeze()
-
-                        # Comparamos los valores excepto firebase_key
-                        if not old_row.drop(labels=["firebase_key"]).equals(new_row.drop(labels=["firebase_key"])):
-                            clean = row_to_clean_dict(new_row)
-                            data = transform_module_input(clean)
-                            update_module_to_db(modules_selected_course, key, data)
-
-                            st.success(f"Modulo con ID {key} actualizado.")
-                            st.session_state.modules_df_by_course[modules_selected_course] = new_df.copy()
-                            st.session_state.editor_key += 1
-                            time.sleep(1)
-                            st.rerun()
 
-                    # 🗑️ Detectar y eliminar filas eliminadas   
-                    deleted_keys = old_keys - new_keys
-                    for key in deleted_keys:
-                        try:
-                            delete_module_from_db(modules_selected_course, key)   
-                            # print(f"Nuevo DataFrame: {new_df[new_df["firebase_key"] != key]}")   
-                            new_df = new_df[new_df["firebase_key"] != key]
-                            st.session_state.modules_df_by_course[modules_selected_course] = new_df.copy()                     
-                            st.success(f"Módulo con ID {key} eliminado de la base de datos.")
+                    # Altas, cambios y bajas en una sola actualización (las bajas se envían como null)
+                    changes = admin_sync_modules(modules_selected_course, old_df, edited_df)
+                    checkpoint("save")
+                    if changes is not None:
+                        new_df = edited_df.copy()
+                        for index, firebase_key in changes['added'].items():
+                            new_df.loc[index, "firebase_key"] = firebase_key
+                        st.session_state.modules_df_by_course[modules_selected_course] = new_df
+
+                        if changes['added'] or changes['updated'] or changes['deleted']:
+                            st.success(
+                                f"Módulos guardados: {len(changes['added'])} nuevo(s), "
+                                f"{len(changes['updated'])} actualizado(s), {len(changes['deleted'])} eliminado(s)."
+                            )
                             st.session_state.editor_key += 1
                             time.sleep(1)
+                            checkpoint("rerun delay")
                             st.rerun()
-                        except Exception as e:
-                            st.error(f"Error al eliminar el módulo con ID {key}: {str(e)}")
+                        else:
+                            st.info("No hay cambios para guardar.")
                     
     else:
         st.info("No hay módulos disponibles. Por favor, agregue módulos.") # Keep this message
@@ -5,8 +5,9 @@ from config import setup_page
 from utils import (
     load_students,
     get_module_on_date, get_highest_module_credit, get_last_updated,
-    get_module_name_by_id, load_modules, highlight_style
+    get_module_name_by_id, load_modules, highlight_style, fetch_parallel
 )
+from row_highlight import student_row_status, highlight_rows
 from utils_admin import admin_get_student_group_emails, admin_load_students
 
 # --- Login Check ---
@@ -56,10 +57,13 @@ if course_emails:
     )
     # Student section
     students_last_updated = get_last_updated('students')
-    # print("\n\nstudents_last_updated\n", students_last_updated)
-    df_loaded, _ = admin_load_students(modules_selected_course)
-    # df_loaded = admin_load_students(modules_selected_course)
-    # print("\n\ndf_loaded\n", df_loaded)
+    # The course's students and its current module are independent reads: fetch them together
+    need_current_module = st.session_state.current_module_id_for_today is None
+    modules_last_updated = get_last_updated('modules', modules_selected_course)
+    (df_loaded, _), result = fetch_parallel(
+        lambda: admin_load_students(modules_selected_course),
+        lambda: get_module_on_date(modules_selected_course, modules_last_updated) if need_current_module else None,
+    )
 
     if df_loaded is None or df_loaded.empty:
         st.info("No hay estudiantes registrados.")
@@ -90,19 +94,14 @@ if course_emails:
             'modulo_fin_name': 'Módulo (Final)',
             }
 
-        if 'current_module_id_for_today' in st.session_state and st.session_state.current_module_id_for_today is None:
-            print("\n\nst.session_state.get('email')\n", modules_selected_course)
-            result = get_module_on_date(modules_selected_course)
-            print("\n\nresult\n", result)
+        if need_current_module:
             if result and 'module_id' in result:
                 st.session_state.current_module_id_for_today = result['firebase_key']
-                print("\n\ncurrent_module_id_for_today\n", result['firebase_key'])
             # else:
             #     st.warning("No se encontró un módulo activo para hoy.")
 
         current_module_id = st.session_state.get('current_module_id_for_today')
 
-        print("\n\ncurrent_module_id\n", current_module_id)
         total_students = len(df_loaded)
         # print("total_students", total_students)
 
@@ -198,75 +197,12 @@ if course_emails:
         }
         df_renamed = df.rename(columns=column_renames)
 
-        def highlight_row_warning(row):
-            """
-            Highlights a row in yellow if it's the current module and has already started.
-            """
-            try:
-                is_current_module = row.get('modulo_fin_id') == current_module_id
-                is_module_started = False
-                start_date_val = row.get('Fecha de Inicio')
-
-                if pd.notna(start_date_val):
-                    try:
-                        start_date = pd.to_datetime(start_date_val).date()
-                        is_module_started = start_date <= datetime.date.today()
-                    except (ValueError, TypeError):
-                        is_module_started = False
-                
-                if is_current_module and is_module_started:
-
-                    return [highlight_style('warning') for _ in row]
-
-            except Exception as e:
-                print(f"Error processing row in highlight_function: {row.to_dict()}")
-                print(f"Error was: {e}")
-
-            return ['' for _ in row]
-
-        def highlight_row_error(row):
-            """
-            Highlights a row in red if fecha_fin is in the past.
-            """
-            try:
-                # Asegúrate de que la columna exista y no sea nula antes de comparar
-                end_date_val = row.get('Fecha de Finalización') # <--- CORREGIDO
-                fecha_fin_in_past = False
-                if pd.notna(end_date_val):
-                    # Convierte a fecha para una comparación segura
-                    end_date = pd.to_datetime(end_date_val).date()
-                    fecha_fin_in_past = end_date < datetime.date.today()
-                
-                if fecha_fin_in_past:
-                    return [highlight_style('error') for _ in row]
-
-            except Exception as e:
-                print(f"Error processing row in highlight_function: {row.to_dict()}")
-                print(f"Error was: {e}")
-
-            return ['' for _ in row]
-
-        def highlight_row_success(row):
-            """
-            Highlights a row in green if fecha_inicio is in the future.
-            """
-            try:
-                # Asegúrate de que la columna exista y no sea nula antes de comparar
-                start_date_val = row.get('Fecha de Inicio') # <--- CORREGIDO
-                fecha_inicio_in_future = False
-                if pd.notna(start_date_val):
-                    # Convierte a fecha para una comparación segura
-                    start_date = pd.to_datetime(start_date_val).date()
-                    fecha_inicio_in_future = start_date > datetime.date.today()
-                
-                if fecha_inicio_in_future:
-                    return [highlight_style('success') for _ in row]
-
-            except Exception as e:
-                print(f"Error processing row in highlight_function: {row.to_dict()}")
-                print(f"Error was: {e}")
-
-            return ['' for _ in row]
+        # One status per row from the parsed dates; success > error > warning
+        row_status = student_row_status(
+            df_loaded['_fecha_inicio_dt'], df_loaded['_fecha_fin_dt'], today,
+            current_module=df_loaded['modulo_fin_id'] == current_module_id,
+        )
+        row_css = {theme: highlight_style(theme) for theme in ('warning', 'error', 'success')}
 
         # Sort the DataFrame by 'Fecha de Inicio'
         df_renamed = df_renamed.sort_values(by='Fecha de Inicio', ascending=True)   
@@ -274,7 +210,7 @@ if course_emails:
         # 4. Decide whether to apply styling
         if current_module_id:
             # Apply the style to the renamed DataFrame
-            df_to_show = df_renamed.style.apply(highlight_row_warning, axis=1).apply(highlight_row_error, axis=1).apply(highlight_row_success, axis=1)
+            df_to_show = highlight_rows(df_renamed, row_status, row_css)
         else:
             # If no ID is set, just use the regular DataFrame
             df_to_show = df_renamed
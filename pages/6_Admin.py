@@ -1,4 +1,7 @@
 import streamlit as st
+import pandas as pd
+from config import DB_METRICS_ENABLED, DB_METRICS_BYTES, PROCESS_DB_METRICS, PROFILING_ENABLED, PROFILING_DIR, session_db_metrics
+from profiling import recent_runs, recent_actions
 
 # Set page configuration
 st.set_page_config(page_title="Panel de Administración", page_icon="👨‍💼")
@@ -12,9 +15,102 @@ st.divider()
 # Add a placeholder for future admin content
 st.info("Bienvenido al panel de administración. Aquí podrás gestionar la configuración del sistema.")
 
+# --- Database usage (admins only) ---
+if st.session_state.get('logged_in', False) and st.session_state.get('admin', False):
+    TABLE_COLUMNS = {
+        'path': 'Ruta', 'operation': 'Operación', 'calls': 'Llamadas', 'seconds': 'Tiempo (s)',
+        'max_seconds': 'Máx. (s)', 'bytes': 'Datos (KB)',
+    }
+
+    def show_metrics(registry):
+        """Totals and top paths by time and by bytes for one metrics registry."""
+        totals = registry.totals()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Solicitudes", totals['requests'])
+        col2.metric("Tiempo total", f"{totals['seconds']:.2f} s")
+        col3.metric("Datos", f"{totals['bytes'] / 1024:,.0f} KB")
+        col4.metric("Caché (aciertos / fallos)", f"{totals['cache_hits']} / {totals['cache_misses']}")
+
+        rows = pd.DataFrame(registry.summary())
+        if rows.empty:
+            st.info("Todavía no hay llamadas registradas.")
+            return
+        requests = rows[rows['operation'] != 'cache'].copy()
+        requests['bytes'] = (requests['bytes'] / 1024).round(1)
+        requests[['seconds', 'max_seconds']] = requests[['seconds', 'max_seconds']].round(3)
+        requests = requests[list(TABLE_COLUMNS)].rename(columns=TABLE_COLUMNS)
+
+        st.markdown("**Rutas con más tiempo**")
+        st.dataframe(requests.sort_values('Tiempo (s)', ascending=False).head(10), hide_index=True, use_container_width=True)
+        if DB_METRICS_BYTES:
+            st.markdown("**Rutas con más datos**")
+            st.dataframe(requests.sort_values('Datos (KB)', ascending=False).head(10), hide_index=True, use_container_width=True)
+
+        loaders = rows[rows['operation'] == 'cache']
+        if not loaders.empty:
+            st.markdown("**Funciones con caché**")
+            loaders = loaders[['path', 'calls', 'cache_hits', 'cache_misses', 'seconds']].rename(columns={
+                'path': 'Función', 'calls': 'Llamadas', 'cache_hits': 'Aciertos', 'cache_misses': 'Fallos', 'seconds': 'Tiempo (s)'})
+            st.dataframe(loaders.round(3), hide_index=True, use_container_width=True)
+
+    st.divider()
+    st.subheader("Uso de la base de datos")
+    if not DB_METRICS_ENABLED:
+        st.info("La instrumentación de la base de datos está desactivada (database.metrics = false).")
+    else:
+        st.caption("Llamadas de esta sesión: ruta, operación, tiempo, datos transferidos y uso de la caché.")
+        if not DB_METRICS_BYTES:
+            st.caption("El tamaño de los datos no se mide (database.metrics_bytes = false).")
+        session_metrics = session_db_metrics()
+        show_metrics(session_metrics)
+        if st.button("Reiniciar métricas de la sesión"):
+            session_metrics.reset()
+            st.rerun()
+
+        with st.expander("Todo el proceso (todas las sesiones)"):
+            show_metrics(PROCESS_DB_METRICS)
+
 # You can add more admin components here
 # For example:
 # - User management
 # - System settings
 # - Data management tools
 # - Analytics and metrics
+
+    # --- Page profiling ---
+    st.divider()
+    st.subheader("Rendimiento de páginas")
+    if not PROFILING_ENABLED:
+        st.info("El perfilado de páginas está desactivado ([profiling] enabled = true para activarlo).")
+    else:
+        runs = pd.DataFrame(recent_runs())
+        if runs.empty:
+            st.info("Todavía no hay ejecuciones registradas.")
+        else:
+            per_page = runs.groupby('page').agg(
+                Ejecuciones=('seconds', 'size'),
+                Promedio_ms=('seconds', lambda s: round(s.mean() * 1000)),
+                Max_ms=('seconds', lambda s: round(s.max() * 1000)),
+                Reruns=('outcome', lambda s: int((s == 'rerun').sum())),
+            ).sort_values('Max_ms', ascending=False)
+            st.markdown("**Ejecuciones por página**")
+            st.dataframe(per_page, use_container_width=True)
+
+            actions = pd.DataFrame(recent_actions())
+            if not actions.empty:
+                st.markdown("**Ejecuciones por acción del usuario**")
+                st.dataframe(actions.groupby('page').agg(
+                    Acciones=('runs', 'size'),
+                    Ejecuciones_promedio=('runs', lambda s: round(s.mean(), 2)),
+                    Max_ejecuciones=('runs', 'max'),
+                ), use_container_width=True)
+
+            sections = pd.DataFrame([
+                {'page': run['page'], 'section': name, 'seconds': elapsed}
+                for run in recent_runs() for name, elapsed in run['sections'].items()
+            ])
+            if not sections.empty:
+                st.markdown("**Tiempo por sección (ms, promedio)**")
+                st.dataframe((sections.pivot_table(index='page', columns='section', values='seconds', aggfunc='mean') * 1000).round(0),
+                             use_container_width=True)
+            st.caption(f"Perfiles cProfile de las ejecuciones más lentas en: {PROFILING_DIR}")
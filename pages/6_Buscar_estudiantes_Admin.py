@@ -202,7 +202,6 @@ if submitted:
 
 
         if not display_df.empty:
-            print(modules_selected_course) # Keep this for your internal debugging
             
             # Determine the course message for the success message
             course_message = modules_selected_course.split('@')[0] if modules_selected_course else 'todos los cursos'
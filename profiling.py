@@ -0,0 +1,165 @@
+import contextlib
+import contextvars
+import cProfile
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+from config import PROFILING_ENABLED, PROFILING_DIR, PROFILING_KEEP_SLOWEST
+from app_log import get_logger, log_event
+
+# Opt-in page profiling around st.navigation's pg.run() (see Home.py).
+# Every script run records its wall time, the time spent in named sections of the page
+# (section() blocks or checkpoint() laps), how it ended (completed, st.rerun, st.stop or
+# error) and which run of the current user action it was: runs started by st.rerun()
+# belong to the action that triggered them. With profiling on, each run is also profiled
+# with cProfile and the slowest runs per page are kept as .pstats dumps in PROFILING_DIR.
+
+logger = get_logger(__name__)
+
+_current_run = contextvars.ContextVar('profiling_current_run', default=None)
+
+RECENT_RUNS = deque(maxlen=500)     # process-wide, newest last
+RECENT_ACTIONS = deque(maxlen=200)  # finished user actions: {'page', 'runs', 'seconds', 'at'}
+
+_lock = threading.Lock()
+_slowest = {}  # page -> min-heap of (seconds, dump path)
+# cProfile can only profile one thread at a time; concurrent sessions skip it
+_profiler_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def section(name: str):
+    """Add the wall time of the block to the named section of the current run."""
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        run['sections'][name] = run['sections'].get(name, 0.0) + elapsed
+        run['lap'] = time.perf_counter()
+
+
+def checkpoint(name: str):
+    """Add the time since the previous checkpoint (or the start of the run) to the named section."""
+    run = _current_run.get()
+    if run is None:
+        return
+    now = time.perf_counter()
+    run['sections'][name] = run['sections'].get(name, 0.0) + now - run['lap']
+    run['lap'] = now
+
+
+def _outcome(exception) -> str:
+    if exception is None:
+        return 'completed'
+    # Streamlit's control-flow exceptions, matched by name so no private module is imported
+    return {'RerunException': 'rerun', 'StopException': 'stop'}.get(type(exception).__name__, 'error')
+
+
+def _start_action(page: str) -> dict:
+    """The user action this run belongs to; a run following an st.rerun() continues the previous one."""
+    action = st.session_state.get('_profiling_action')
+    if action is not None and action.get('pending_rerun'):
+        action['pending_rerun'] = False
+        action['runs'] += 1
+        return action
+    if action is not None:
+        _finish_action(action)
+    action = {'page': page, 'runs': 1, 'seconds': 0.0, 'pending_rerun': False, 'at': time.time()}
+    st.session_state['_profiling_action'] = action
+    return action
+
+
+def _finish_action(action: dict):
+    with _lock:
+        RECENT_ACTIONS.append({key: action[key] for key in ('page', 'runs', 'seconds', 'at')})
+
+
+def _keep_if_slowest(page: str, seconds: float, profiler) -> str:
+    """Dump the profile if the run is among the slowest of its page; returns the dump path or None."""
+    with _lock:
+        heap = _slowest.setdefault(page, [])
+        if len(heap) >= PROFILING_KEEP_SLOWEST and seconds <= heap[0][0]:
+            return None
+        os.makedirs(PROFILING_DIR, exist_ok=True)
+        safe_page = re.sub(r'[^\w-]+', '_', page).strip('_') or 'page'
+        path = os.path.join(PROFILING_DIR, f"{safe_page}_{time.strftime('%Y%m%d-%H%M%S')}_{seconds * 1000:.0f}ms.pstats")
+        profiler.dump_stats(path)
+        heapq.heappush(heap, (seconds, path))
+        if len(heap) > PROFILING_KEEP_SLOWEST:
+            _, dropped = heapq.heappop(heap)
+            with contextlib.suppress(OSError):
+                os.remove(dropped)
+        return path
+
+
+def run_page(pg):
+    """
+    Run the page selected by st.navigation, profiled when [profiling] enabled is set.
+
+    Args:
+        pg: The StreamlitPage returned by st.navigation.
+    """
+    if not PROFILING_ENABLED:
+        pg.run()
+        return
+
+    page = str(getattr(pg, 'title', None) or getattr(pg, 'url_path', None) or 'page')
+    action = _start_action(page)
+    run = {'page': page, 'sections': {}, 'lap': time.perf_counter()}
+    token = _current_run.set(run)
+    profiler = cProfile.Profile() if _profiler_lock.acquire(blocking=False) else None
+    exception = None
+    started = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        pg.run()
+    except BaseException as e:
+        exception = e
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        if profiler is not None:
+            profiler.disable()
+            _profiler_lock.release()
+        _current_run.reset(token)
+
+        outcome = _outcome(exception)
+        action['seconds'] += seconds
+        action['pending_rerun'] = outcome == 'rerun'
+        dump = _keep_if_slowest(page, seconds, profiler) if profiler is not None else None
+        record = {
+            'page': page,
+            'seconds': seconds,
+            'sections': {name: elapsed for name, elapsed in run['sections'].items()},
+            'outcome': outcome,
+            'action_run': action['runs'],
+            'profile': dump,
+            'at': time.time(),
+        }
+        with _lock:
+            RECENT_RUNS.append(record)
+        log_event(logger, logging.INFO, "page.run", page=page, ms=round(seconds * 1000), outcome=outcome,
+                  action_run=action['runs'],
+                  sections=lambda: {name: round(elapsed * 1000) for name, elapsed in record['sections'].items()})
+
+
+def recent_runs() -> list:
+    with _lock:
+        return list(RECENT_RUNS)
+
+
+def recent_actions() -> list:
+    with _lock:
+        return list(RECENT_ACTIONS)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# Whole-row highlighting for st.dataframe without per-row Python callbacks.
+# A status is computed for every row at once from already-parsed date columns, and
+# a single Styler.apply(axis=None) turns it into the CSS frame, instead of chaining
+# Styler.apply(axis=1) passes that re-parse date strings row by row.
+
+
+def student_row_status(start: pd.Series, end: pd.Series, today, current_module: pd.Series = None) -> pd.Series:
+    """
+    Highlight status of each student row.
+
+    Later statuses win over earlier ones, as the chained highlight passes did:
+    'warning' (in the course's current module and already started), then 'error'
+    (already finished), then 'success' (not started yet). Missing dates match nothing.
+
+    Args:
+        start (Series): Start dates (datetime64 or datetime.date values).
+        end (Series): End dates, aligned with start.
+        today: The reference date.
+        current_module (Series, optional): Boolean mask of rows whose last module is the
+            course's current one; without it no row gets 'warning'.
+
+    Returns:
+        Series: 'warning', 'error', 'success' or '' per row, indexed like start.
+    """
+    start = pd.to_datetime(start, errors='coerce')
+    end = pd.to_datetime(end, errors='coerce')
+    today = pd.Timestamp(today).normalize()
+
+    status = pd.Series('', index=start.index, dtype=object)
+    if current_module is not None:
+        status[current_module.fillna(False).astype(bool) & (start <= today)] = 'warning'
+    status[end < today] = 'error'
+    status[start > today] = 'success'
+    return status
+
+
+def date_range_status(start: pd.Series, end: pd.Series, today, status: str = 'current') -> pd.Series:
+    """
+    Mark the rows whose [start, end] range contains today.
+
+    Args:
+        start (Series): Start dates (datetime64 or datetime.date values).
+        end (Series): End dates, aligned with start.
+        today: The reference date.
+        status (str): Status given to matching rows.
+
+    Returns:
+        Series: status or '' per row, indexed like start.
+    """
+    start = pd.to_datetime(start, errors='coerce')
+    end = pd.to_datetime(end, errors='coerce')
+    today = pd.Timestamp(today).normalize()
+    return pd.Series(np.where((start <= today) & (today <= end), status, ''), index=start.index, dtype=object)
+
+
+def status_styles(df: pd.DataFrame, status: pd.Series, css_by_status: dict) -> pd.DataFrame:
+    """
+    CSS for every cell of df, each row styled by its status (for Styler.apply(axis=None)).
+
+    Args:
+        df (DataFrame): The frame being styled.
+        status (Series): Status per row, aligned with df by index.
+        css_by_status (dict): {status: CSS string}; other statuses get no style.
+
+    Returns:
+        DataFrame: CSS strings shaped like df.
+    """
+    css = status.reindex(df.index).map(css_by_status).fillna('').to_numpy(dtype=object)
+    return pd.DataFrame(np.repeat(css[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns)
+
+
+def highlight_rows(df: pd.DataFrame, status: pd.Series, css_by_status: dict):
+    """
+    Style df with one background per row status.
+
+    Args:
+        df (DataFrame): The frame to display.
+        status (Series): Status per row, aligned with df by index.
+        css_by_status (dict): {status: CSS string}.
+
+    Returns:
+        Styler: df.style with the row styles applied in a single pass.
+    """
+    return df.style.apply(status_styles, axis=None, status=status, css_by_status=css_by_status)
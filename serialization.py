@@ -0,0 +1,60 @@
+import pandas as pd
+
+# Column-wise conversion of DataFrames into JSON-serializable records for Firebase.
+# Every column is converted once with vectorized pandas operations instead of
+# inspecting each cell, which is what made large saves slow.
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def serialize_column(values: pd.Series, null_value=None) -> pd.Series:
+    """
+    Convert one column into Python objects Firebase can store.
+
+    Args:
+        values (Series): The column to convert.
+        null_value: What missing values (and empty strings) become. None makes Firebase
+            drop the field; '' keeps it as empty text.
+
+    Returns:
+        Series: object dtype Series of Python scalars, strings or null_value.
+    """
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        # astype(object) boxes numpy scalars into Python int/float/bool
+        return values.astype('object').where(values.notna(), null_value)
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime(DATE_FORMAT).astype('object').where(values.notna(), null_value)
+
+    if pd.api.types.infer_dtype(values, skipna=True) in ('date', 'datetime', 'datetime64'):
+        # datetime.date / Timestamp objects, e.g. from a st.data_editor DateColumn
+        dates = pd.to_datetime(values, errors='coerce')
+        return dates.dt.strftime(DATE_FORMAT).astype('object').where(dates.notna(), null_value)
+
+    text = values.fillna('').astype(str).str.strip()
+    return text.astype('object').where(text != '', null_value)
+
+
+def dataframe_to_records(df: pd.DataFrame, null_value=None) -> list:
+    """
+    Convert a DataFrame into a list of JSON-serializable record dicts.
+
+    Args:
+        df (DataFrame): Rows to convert.
+        null_value: Replacement for missing values and empty strings (see serialize_column).
+
+    Returns:
+        list: One dict per row, in row order.
+    """
+    if df is None or len(df.columns) == 0:
+        return [{} for _ in range(0 if df is None else len(df))]
+    converted = pd.DataFrame(
+        {col: serialize_column(df[col], null_value) for col in df.columns},
+        index=df.index
+    )
+    return converted.to_dict('records')
+
+
+def dataframe_to_records_by_index(df: pd.DataFrame, null_value=None) -> dict:
+    """Like dataframe_to_records, but keyed by the DataFrame's index labels."""
+    return dict(zip(df.index, dataframe_to_records(df, null_value)))
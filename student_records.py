@@ -0,0 +1,105 @@
+import pandas as pd
+from serialization import dataframe_to_records_by_index
+
+# Helpers for the students/<course>/data array.
+# Rows keep the index they have in Firebase (data/<i>), so edits can be written as a
+# multi-path update of only the nodes that changed, and deletes never shift other rows.
+
+
+def student_records_by_index(raw_data) -> dict:
+    """
+    Normalize the stored data array into {index: record}.
+
+    Firebase returns the array as a list with None in place of deleted rows, or as a dict
+    with string keys once enough rows are missing.
+
+    Args:
+        raw_data: Value stored at students/<course>/data.
+
+    Returns:
+        dict: {int index: record dict}, without empty slots.
+    """
+    if isinstance(raw_data, list):
+        items = enumerate(raw_data)
+    elif isinstance(raw_data, dict):
+        items = ((int(key), value) for key, value in raw_data.items())
+    else:
+        return {}
+    return {index: record for index, record in items if isinstance(record, dict)}
+
+
+def students_dataframe(raw_data) -> pd.DataFrame:
+    """Build the students DataFrame from the stored data array, indexed by Firebase row index."""
+    records = student_records_by_index(raw_data)
+    if not records:
+        return pd.DataFrame()
+    indices = sorted(records)
+    return pd.DataFrame([records[i] for i in indices], index=indices)
+
+
+def serialize_student_records(df: pd.DataFrame) -> dict:
+    """
+    Convert a students DataFrame into JSON-serializable records keyed by its index.
+
+    Empty strings and nulls become None, which Firebase stores as a missing field.
+
+    Returns:
+        dict: {index: record dict}
+    """
+    return dataframe_to_records_by_index(df)
+
+
+def next_student_index(df: pd.DataFrame) -> int:
+    """First free data/<i> index after the rows of df."""
+    if df is None or df.empty:
+        return 0
+    return int(max(df.index)) + 1
+
+
+def append_students(current_df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Append new students after the existing rows without renumbering them.
+
+    New rows are labelled from next_student_index(current_df) on, so a diff against
+    current_df writes them to fresh data/<i> nodes.
+    """
+    new_df = new_df.copy()
+    start = next_student_index(current_df)
+    new_df.index = range(start, start + len(new_df))
+    if current_df is None or current_df.empty:
+        return new_df
+    return pd.concat([current_df, new_df])
+
+
+def diff_student_records(original_df: pd.DataFrame, edited_df: pd.DataFrame, base_path: str = 'data') -> dict:
+    """
+    Compute the multi-path update that turns original_df into edited_df.
+
+    Rows are matched by index label: changed fields are written as <base_path>/<i>/<field>,
+    rows missing from edited_df are deleted as <base_path>/<i>, and rows whose label is not
+    in original_df are written whole at their label.
+
+    Args:
+        original_df (DataFrame): Students as loaded from Firebase.
+        edited_df (DataFrame): Students after the edit, with the same index labels.
+        base_path (str): Path of the data array relative to the update root.
+
+    Returns:
+        dict: {path: value} for db.update(); empty if nothing changed.
+    """
+    original = serialize_student_records(original_df) if original_df is not None and not original_df.empty else {}
+    edited = serialize_student_records(edited_df) if edited_df is not None and not edited_df.empty else {}
+
+    updates = {}
+    for index, record in edited.items():
+        old_record = original.get(index)
+        if old_record is None:
+            updates[f"{base_path}/{index}"] = {key: value for key, value in record.items() if value is not None}
+            continue
+        for field in set(record) | set(old_record):
+            new_value = record.get(field)
+            if new_value != old_record.get(field):
+                updates[f"{base_path}/{index}/{field}"] = new_value
+    for index in original.keys() - edited.keys():
+        updates[f"{base_path}/{index}"] = None
+    return updates
@@ -0,0 +1,183 @@
+import datetime
+import threading
+
+import pandas as pd
+
+# In-memory search index over the students of every course.
+# Each student is a document identified by (course key, data/<i> index). Name, email,
+# phone and canvas_id are lowercased into one haystack and every 1..3 character n-gram
+# of it points at the document, so a query only verifies the few candidates that share
+# all of its n-grams. Courses are refreshed independently when their version changes.
+
+MAX_GRAM = 3
+SEARCH_FIELDS = ['nombre', 'email', 'telefono', 'canvas_id']
+RESULT_COLUMNS = ['nombre', 'email', 'telefono', 'modulo', 'fecha_inicio', 'modulo_fin_name', 'fecha_fin', 'course_email']
+STATUSES = ('in_progress', 'graduated', 'not_started')
+
+
+def _text(value) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ''
+    return str(value).strip()
+
+
+def _parse_date(value):
+    parsed = pd.to_datetime(_text(value) or None, errors='coerce')
+    return None if pd.isna(parsed) else parsed.date()
+
+
+def _haystack(record: dict) -> str:
+    """Lowercased searchable text of a student; fields are separated so matches never span them."""
+    parts = [_text(record.get(field)).lower() for field in SEARCH_FIELDS]
+    phone_digits = ''.join(filter(str.isdigit, _text(record.get('telefono'))))
+    if phone_digits:
+        parts.append(phone_digits)
+    return '\x00'.join(parts)
+
+
+def _grams(text: str, size: int) -> set:
+    return {text[i:i + size] for i in range(len(text) - size + 1)} - {''}
+
+
+def _all_grams(text: str) -> set:
+    grams = set()
+    for size in range(1, MAX_GRAM + 1):
+        grams |= {gram for gram in _grams(text, size) if '\x00' not in gram}
+    return grams
+
+
+def student_status(start, end, today: datetime.date):
+    """'in_progress', 'graduated', 'not_started' or None for a student's fecha_inicio/fecha_fin."""
+    if end is not None and end < today:
+        return 'graduated'
+    if start is not None and start > today:
+        return 'not_started'
+    if start is not None and end is not None and start <= today <= end:
+        return 'in_progress'
+    return None
+
+
+class StudentSearchIndex:
+    """
+    Token index over students of all courses, safe to share between sessions.
+
+    Call refresh_course whenever a course's version (its students last_updated) changes;
+    only the students whose searchable text or dates changed are re-indexed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}     # course -> version the course was indexed at
+        self._docs = {}         # (course, index) -> {'row', 'haystack', 'start', 'end'}
+        self._by_course = {}    # course -> set of doc ids
+        self._postings = {}     # n-gram -> set of doc ids
+        self._status_cache = None  # (today, {status: set of doc ids})
+
+    def course_version(self, course: str):
+        """Version the course was last indexed at, or None if it is not indexed."""
+        with self._lock:
+            return self._versions.get(course)
+
+    def courses(self) -> list:
+        with self._lock:
+            return list(self._versions)
+
+    def refresh_course(self, course: str, version, records_by_index: dict):
+        """
+        Bring one course up to date.
+
+        Args:
+            course (str): Course key (e.g. "cba2@iti,edu").
+            version: Opaque version of the data, usually its students last_updated.
+            records_by_index (dict): {data index: student record} as stored in Firebase.
+        """
+        with self._lock:
+            old_ids = self._by_course.get(course, set())
+            new_ids = set()
+            for index, record in records_by_index.items():
+                doc_id = (course, index)
+                new_ids.add(doc_id)
+                row = {col: _text(record.get(col)) for col in RESULT_COLUMNS if col != 'course_email'}
+                row['course_email'] = course
+                doc = {
+                    'row': row,
+                    'haystack': _haystack(record),
+                    'start': _parse_date(record.get('fecha_inicio')),
+                    'end': _parse_date(record.get('fecha_fin')),
+                }
+                current = self._docs.get(doc_id)
+                if current is not None and current['haystack'] == doc['haystack']:
+                    # Same searchable text: keep the postings, just refresh the row
+                    self._docs[doc_id] = doc
+                    continue
+                if current is not None:
+                    self._unindex(doc_id, current['haystack'])
+                self._docs[doc_id] = doc
+                for gram in _all_grams(doc['haystack']):
+                    self._postings.setdefault(gram, set()).add(doc_id)
+            for doc_id in old_ids - new_ids:
+                self._unindex(doc_id, self._docs.pop(doc_id)['haystack'])
+            self._by_course[course] = new_ids
+            self._versions[course] = version
+            self._status_cache = None
+
+    def drop_course(self, course: str):
+        """Forget a course that no longer exists."""
+        self.refresh_course(course, None, {})
+        with self._lock:
+            self._versions.pop(course, None)
+            self._by_course.pop(course, None)
+
+    def _unindex(self, doc_id, haystack: str):
+        for gram in _all_grams(haystack):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def _status_sets(self, today: datetime.date) -> dict:
+        """Doc ids per status, computed once per day and index change."""
+        if self._status_cache is None or self._status_cache[0] != today:
+            sets = {status: set() for status in STATUSES}
+            for doc_id, doc in self._docs.items():
+                status = student_status(doc['start'], doc['end'], today)
+                if status is not None:
+                    sets[status].add(doc_id)
+            self._status_cache = (today, sets)
+        return self._status_cache[1]
+
+    def search(self, search_term: str = '', course: str = None, status: str = 'all', today: datetime.date = None) -> pd.DataFrame:
+        """
+        Find students whose name, email, phone or canvas_id contains search_term.
+
+        Args:
+            search_term (str): Case-insensitive substring; empty matches everyone.
+            course (str, optional): Restrict to one course.
+            status (str): "all", "in_progress", "graduated" or "not_started".
+            today (datetime.date, optional): Reference date for status; defaults to today.
+
+        Returns:
+            DataFrame: Matching students with RESULT_COLUMNS, ordered by course and index.
+        """
+        today = today or datetime.date.today()
+        term = _text(search_term).lower()
+        with self._lock:
+            if course:
+                candidates = set(self._by_course.get(course, set()))
+            else:
+                candidates = set(self._docs)
+
+            if term:
+                size = min(MAX_GRAM, len(term))
+                for gram in sorted(_grams(term, size), key=lambda g: len(self._postings.get(g, ()))):
+                    candidates &= self._postings.get(gram, set())
+                    if not candidates:
+                        break
+                candidates = {doc_id for doc_id in candidates if term in self._docs[doc_id]['haystack']}
+
+            if status in STATUSES:
+                candidates &= self._status_sets(today)[status]
+
+            rows = [self._docs[doc_id]['row'] for doc_id in sorted(candidates, key=lambda d: (d[0], d[1]))]
+        return pd.DataFrame(rows, columns=RESULT_COLUMNS)
@@ -0,0 +1,30 @@
+import functools
+
+import streamlit as st
+
+# Per-tenant keys for loaders cached with st.cache_data.
+# st.cache_data is shared by every session of the process and keys entries only on the
+# function's arguments, so a loader that reads the signed-in course from st.session_state
+# could serve one teacher's data to another. tenant_scoped passes the session's email as
+# the loader's first argument instead, which makes it part of every cache entry.
+
+
+def current_tenant():
+    """The signed-in user's email (the course the session works on), or None."""
+    return st.session_state.get('email')
+
+
+def tenant_scoped(cached_func):
+    """
+    Decorator for st.cache_data loaders whose first parameter is the user's email.
+
+    Callers omit that argument: the wrapper fills it in with current_tenant(). Put it
+    between @track_loader and @st.cache_data; .clear() stays available.
+    """
+    @functools.wraps(cached_func)
+    def wrapper(*args, **kwargs):
+        return cached_func(current_tenant(), *args, **kwargs)
+
+    if hasattr(cached_func, 'clear'):
+        wrapper.clear = cached_func.clear
+    return wrapper
@@ -0,0 +1,133 @@
+import datetime
+import random
+
+from break_calendar import BreakCalendar, break_end_date, break_entries
+
+D = datetime.date
+
+
+# The scans BreakCalendar replaced (utils.adjust_for_breaks and
+# utils_admin.adjust_date_for_breaks before the interval index), kept as references.
+
+def legacy_adjust_for_breaks(start, end, breaks):
+    extra_days = datetime.timedelta(days=0)
+    for b_start, b_end in breaks:
+        if b_end < start or b_start > end:
+            continue
+        overlap_start = max(start, b_start)
+        overlap_end = min(end, b_end)
+        extra_days += datetime.timedelta(days=(overlap_end - overlap_start).days + 1)
+    return start, end + extra_days
+
+
+def legacy_adjust_date_for_breaks(current_date, breaks):
+    for b_start, b_end in breaks:
+        if b_start <= current_date <= b_end:
+            next_day = b_end + datetime.timedelta(days=1)
+            return next_day + datetime.timedelta(days=(7 - next_day.weekday()) % 7)
+    return current_date + datetime.timedelta(days=(7 - current_date.weekday()) % 7)
+
+
+def random_disjoint_breaks(rng, count):
+    """Non-overlapping, non-adjacent one- to three-week breaks starting on Mondays."""
+    breaks = []
+    start = D(2024, 1, 1) + datetime.timedelta(weeks=rng.randint(1, 4))
+    for _ in range(count):
+        end = break_end_date(start, rng.randint(1, 3))
+        breaks.append((start, end))
+        start = end + datetime.timedelta(days=1, weeks=rng.randint(1, 8))
+    rng.shuffle(breaks)
+    return breaks
+
+
+def test_matches_legacy_scan_for_disjoint_breaks():
+    rng = random.Random(7)
+    for _ in range(200):
+        breaks = random_disjoint_breaks(rng, rng.randint(0, 8))
+        calendar = BreakCalendar(breaks)
+        start = D(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 600))
+        end = start + datetime.timedelta(days=rng.randint(0, 120))
+        assert calendar.extend_for_breaks(start, end) == legacy_adjust_for_breaks(start, end, breaks)[1]
+        weeks = rng.randint(1, 10)
+        assert calendar.end_date(start, weeks) == legacy_adjust_for_breaks(start, start + datetime.timedelta(weeks=weeks), breaks)[1]
+        legacy_monday = legacy_adjust_date_for_breaks(start, breaks)
+        if calendar.is_break(legacy_monday):
+            # The legacy scan could return a Monday inside a break; the calendar skips past it
+            assert calendar.next_working_monday(start) == calendar.next_working_monday(legacy_monday) > legacy_monday
+        else:
+            assert calendar.next_working_monday(start) == legacy_monday
+
+
+def test_no_breaks():
+    calendar = BreakCalendar()
+    assert calendar.end_date(D(2025, 1, 6), 4) == D(2025, 2, 3)
+    assert calendar.next_working_monday(D(2025, 1, 8)) == D(2025, 1, 13)
+    assert calendar.next_working_monday(D(2025, 1, 6)) == D(2025, 1, 6)
+
+
+def test_break_inside_the_period_extends_it():
+    calendar = BreakCalendar([(D(2025, 1, 13), D(2025, 1, 19))])
+    assert calendar.end_date(D(2025, 1, 6), 4) == D(2025, 2, 10)
+
+
+def test_start_inside_a_break_counts_only_the_remaining_break_days():
+    breaks = [(D(2025, 1, 13), D(2025, 1, 26))]
+    calendar = BreakCalendar(breaks)
+    start, end = D(2025, 1, 20), D(2025, 2, 20)
+    assert calendar.extend_for_breaks(start, end) == end + datetime.timedelta(days=7)
+    assert calendar.extend_for_breaks(start, end) == legacy_adjust_for_breaks(start, end, breaks)[1]
+    assert calendar.next_working_monday(start) == D(2025, 1, 27)
+
+
+def test_adjacent_breaks_are_merged_and_counted_like_the_legacy_scan():
+    breaks = [(D(2025, 1, 13), D(2025, 1, 19)), (D(2025, 1, 20), D(2025, 1, 26))]
+    calendar = BreakCalendar(breaks)
+    assert calendar.intervals == [(D(2025, 1, 13), D(2025, 1, 26))]
+    start, end = D(2025, 1, 6), D(2025, 2, 3)
+    assert calendar.extend_for_breaks(start, end) == legacy_adjust_for_breaks(start, end, breaks)[1] == D(2025, 2, 17)
+
+
+def test_overlapping_breaks_count_shared_days_once():
+    # Behaviour change: the legacy scan counted the overlapping week twice
+    breaks = [(D(2025, 1, 13), D(2025, 1, 26)), (D(2025, 1, 20), D(2025, 2, 2))]
+    calendar = BreakCalendar(breaks)
+    assert calendar.intervals == [(D(2025, 1, 13), D(2025, 2, 2))]
+    start, end = D(2025, 1, 6), D(2025, 2, 3)
+    assert calendar.break_days_between(start, end) == 21
+    assert calendar.extend_for_breaks(start, end) == D(2025, 2, 24)
+    assert legacy_adjust_for_breaks(start, end, breaks)[1] == D(2025, 3, 3)
+
+
+def test_next_working_monday_skips_consecutive_breaks():
+    # Behaviour change: the legacy scan returned the Monday that starts the second break
+    breaks = [(D(2025, 1, 13), D(2025, 1, 17)), (D(2025, 1, 20), D(2025, 1, 26))]
+    calendar = BreakCalendar(breaks)
+    assert calendar.next_working_monday(D(2025, 1, 15)) == D(2025, 1, 27)
+    assert legacy_adjust_date_for_breaks(D(2025, 1, 15), breaks) == D(2025, 1, 20)
+
+
+def test_monday_after_a_weekday_that_lands_on_a_break():
+    # Behaviour change: the legacy scan snapped to the Monday that starts the break
+    breaks = [(D(2025, 1, 13), D(2025, 1, 19))]
+    calendar = BreakCalendar(breaks)
+    assert calendar.next_working_monday(D(2025, 1, 9)) == D(2025, 1, 20)
+    assert legacy_adjust_date_for_breaks(D(2025, 1, 9), breaks) == D(2025, 1, 13)
+
+
+def test_break_days_between_edges():
+    calendar = BreakCalendar([(D(2025, 1, 13), D(2025, 1, 19)), (D(2025, 3, 3), D(2025, 3, 9))])
+    assert calendar.break_days_between(D(2025, 1, 19), D(2025, 3, 3)) == 2
+    assert calendar.break_days_between(D(2025, 1, 20), D(2025, 3, 2)) == 0
+    assert calendar.break_days_between(D(2025, 3, 9), D(2025, 1, 1)) == 0
+    assert calendar.is_break(D(2025, 3, 9)) and not calendar.is_break(D(2025, 3, 10))
+
+
+def test_invalid_intervals_and_entries_are_skipped():
+    assert len(BreakCalendar([(D(2025, 1, 19), D(2025, 1, 13))])) == 0
+    entries = break_entries({
+        'a': {'name': 'Semana Santa', 'start_date': '2025-04-14', 'duration_weeks': 1},
+        'b': {'name': 'Sin fecha', 'start_date': 'x'},
+    })
+    assert [entry['id'] for entry in entries] == ['a', 'b']
+    assert entries[0]['end_date'] == D(2025, 4, 20)
+    assert BreakCalendar.from_entries(entries).intervals == [(D(2025, 4, 14), D(2025, 4, 20))]
@@ -0,0 +1,172 @@
+import json
+import queue
+
+import pytest
+
+from local_db import LocalAuth, LocalDatabase
+
+
+def students_db(**kwargs):
+    return LocalDatabase({
+        'students': {
+            'cba2@iti,edu': {'data': [{'nombre': 'Ana'}, {'nombre': 'Bruno'}], 'record_count': 2},
+            'xyz@iti,edu': {'data': [{'nombre': 'Carla'}], 'record_count': 1},
+        },
+        'metadata': {'students': {'last_updated': 't0'}},
+    }, **kwargs)
+
+
+def test_child_paths_chain_and_reset_after_each_request():
+    db = students_db()
+    assert db.child('students').child('cba2@iti,edu', 'record_count').get().val() == 2
+    assert db.path == ""
+    assert db.child('/metadata/students').child('last_updated').get().val() == 't0'
+    response = db.child('students').child('xyz@iti,edu').get()
+    assert response.key() == 'xyz@iti,edu'
+    assert [(item.key(), item.val()) for item in db.child('students', 'xyz@iti,edu', 'data').get().each()] == [
+        (0, {'nombre': 'Carla'})]
+    assert db.child('missing').get().val() is None
+
+
+def test_handles_share_the_tree_but_not_the_path():
+    db = students_db()
+    other = db.handle()
+    db.child('students')
+    other.child('metadata', 'students', 'last_updated').set('t1')
+    assert db.child('cba2@iti,edu', 'record_count').get().val() == 2
+    assert db.child('metadata', 'students', 'last_updated').get().val() == 't1'
+
+
+def test_order_by_key_start_and_end():
+    db = LocalDatabase({'attendance': {
+        'c@iti,edu': {'2025-01-06': {'n': 1}, '2025-01-13': {'n': 2}, '2025-01-20': {'n': 3}, '2025-02-03': {'n': 4}},
+    }})
+    value = db.child('attendance', 'c@iti,edu').order_by_key().start_at('2025-01-13').end_at('2025-01-20').get().val()
+    assert list(value) == ['2025-01-13', '2025-01-20']
+    assert list(db.child('attendance', 'c@iti,edu').order_by_key().start_at('2025-01-21').get().val()) == ['2025-02-03']
+    assert db.child('attendance', 'c@iti,edu').order_by_key().end_at('2024-12-31').get().val() is None
+    assert list(db.child('attendance', 'c@iti,edu').order_by_key().limit_to_last(2).get().val()) == [
+        '2025-01-20', '2025-02-03']
+
+
+def test_order_by_key_puts_integer_keys_first():
+    db = LocalDatabase({'n': {'b': 1, '10': 2, '9': 3, 'a': 4}})
+    assert list(db.child('n').order_by_key().get().val()) == ['9', '10', 'a', 'b']
+    assert list(db.child('n').order_by_key().start_at('a').get().val()) == ['a', 'b']
+
+
+def test_order_by_child_and_equal_to():
+    db = LocalDatabase({'users': {'u1': {'role': 'admin'}, 'u2': {'role': 'teacher'}, 'u3': {}}})
+    assert list(db.child('users').order_by_child('role').equal_to('teacher').get().val()) == ['u2']
+
+
+def test_shallow_returns_only_keys():
+    db = students_db()
+    assert sorted(db.child('students').shallow().get().val()) == ['cba2@iti,edu', 'xyz@iti,edu']
+
+
+def test_multi_path_update_is_applied_together():
+    db = students_db()
+    db.update({
+        'students/cba2@iti,edu/data/2': {'nombre': 'Diego'},
+        'students/cba2@iti,edu/record_count': 3,
+        'metadata/students/last_updated': 't1',
+    })
+    assert db.child('students', 'cba2@iti,edu').get().val() == {
+        'data': [{'nombre': 'Ana'}, {'nombre': 'Bruno'}, {'nombre': 'Diego'}], 'record_count': 3}
+    assert db.child('metadata', 'students', 'last_updated').get().val() == 't1'
+
+
+def test_update_paths_are_relative_to_the_child():
+    db = students_db()
+    db.child('students', 'xyz@iti,edu').update({'data/0/email': 'carla@iti.edu', 'record_count': 1})
+    assert db.child('students', 'xyz@iti,edu', 'data', '0').get().val() == {'nombre': 'Carla', 'email': 'carla@iti.edu'}
+
+
+def test_none_deletes_and_empty_parents_disappear():
+    db = students_db()
+    db.update({'students/xyz@iti,edu/data/0': None, 'students/cba2@iti,edu/record_count': None})
+    # xyz@iti,edu still has record_count; its data node emptied and went away
+    assert db.child('students', 'xyz@iti,edu').get().val() == {'record_count': 1}
+    db.update({'students/xyz@iti,edu/record_count': None, 'metadata/students/last_updated': None})
+    assert sorted(db.child('students').shallow().get().val()) == ['cba2@iti,edu']
+    assert db.child('metadata').get().val() is None
+    # Deleting below a missing node is a no-op
+    db.update({'missing/a/b': None})
+    assert db.child('missing').get().val() is None
+
+
+def test_array_export_follows_firebase_rules():
+    db = LocalDatabase({
+        'full': {'0': 'a', '1': 'b'},
+        'holes': {'0': 'a', '1': 'b', '3': 'd'},
+        'sparse': {'0': 'a', '5': 'f'},
+        'padded': {'00': 'a', '1': 'b'},
+    })
+    assert db.child('full').get().val() == ['a', 'b']
+    assert db.child('holes').get().val() == ['a', 'b', None, 'd']
+    assert db.child('sparse').get().val() == {'0': 'a', '5': 'f'}
+    assert db.child('padded').get().val() == {'1': 'b', '00': 'a'}
+    # Lists are stored as integer-keyed nodes, so a hole written later keeps its slot
+    db.child('full', '0').remove()
+    assert db.child('full').get().val() == {'1': 'b'}
+    assert db.child('holes').get().each()[2].key() == 3
+
+
+def test_reads_do_not_share_the_stored_tree():
+    db = students_db()
+    value = db.child('students', 'cba2@iti,edu', 'data').get().val()
+    value[0]['nombre'] = 'Changed'
+    assert db.child('students', 'cba2@iti,edu', 'data', '0', 'nombre').get().val() == 'Ana'
+
+
+def test_push_keys_are_ordered():
+    db = LocalDatabase()
+    names = [db.child('log').push({'i': i})['name'] for i in range(50)]
+    assert names == sorted(names) and len(set(names)) == 50
+    assert [item['i'] for item in db.child('log').order_by_key().get().val().values()] == list(range(50))
+
+
+def test_persists_to_and_loads_from_json(tmp_path):
+    path = str(tmp_path / 'db.json')
+    db = students_db(path=path)
+    db.child('metadata', 'students', 'last_updated').set('t1')
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['metadata'] == {'students': {'last_updated': 't1'}}
+    assert LocalDatabase(path=path).export() == db.export()
+
+
+def test_stream_gets_snapshot_then_puts_and_patches():
+    db = students_db()
+    messages = queue.Queue()
+    stream = db.child('metadata').stream(messages.put, stream_id='metadata')
+    assert messages.get(timeout=2) == {
+        'event': 'put', 'path': '/', 'data': {'students': {'last_updated': 't0'}}, 'stream_id': 'metadata'}
+
+    db.child('metadata', 'students', 'last_updated').set('t1')
+    assert messages.get(timeout=2)['path'] == '/students/last_updated'
+
+    db.update({'metadata/students/last_updated': 't2', 'metadata/attendance/last_updated': 'a0',
+               'students/xyz@iti,edu/record_count': 0})
+    message = messages.get(timeout=2)
+    assert message['event'] == 'patch' and message['data'] == {
+        'students/last_updated': 't2', 'attendance/last_updated': 'a0'}
+
+    # A write above the stream resends everything it watches
+    db.set({'metadata': {'students': {'last_updated': 't3'}}})
+    assert messages.get(timeout=2) == {
+        'event': 'put', 'path': '/', 'data': {'students': {'last_updated': 't3'}}, 'stream_id': 'metadata'}
+
+    stream.close()
+    stream.thread.join(timeout=2)
+    assert not stream.thread.is_alive()
+    db.child('metadata', 'students', 'last_updated').set('t4')
+    assert messages.empty()
+
+
+def test_auth_checks_configured_passwords():
+    auth = LocalAuth({'cba2@iti.edu': 'secret'})
+    assert auth.sign_in_with_email_and_password('cba2@iti.edu', 'secret')['email'] == 'cba2@iti.edu'
+    with pytest.raises(ValueError):
+        auth.sign_in_with_email_and_password('cba2@iti.edu', 'wrong')
+    assert LocalAuth().sign_in_with_email_and_password('any@iti.edu', 'x')['idToken'] == 'local-any@iti.edu'
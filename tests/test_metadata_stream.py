@@ -0,0 +1,187 @@
+import copy
+import threading
+import time
+
+from metadata_stream import MetadataListener
+
+
+class FakeStream:
+    """
+    Stands in for pyrebase's Stream: a thread that delivers messages to the handler.
+
+    connect=False makes the first connection fail, so the thread dies with sse still None;
+    stay_open=False ends the thread after the messages, like pyrebase's does when it fails
+    to parse a cancel payload. close() waits for the connection like pyrebase's does, i.e.
+    forever if it never opened.
+    """
+
+    def __init__(self, handler, messages=(), connect=True, stay_open=True):
+        self.sse = None
+        self.closed = False
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(handler, list(messages), connect, stay_open), daemon=True)
+        self.thread.start()
+
+    def _run(self, handler, messages, connect, stay_open):
+        if not connect:
+            return
+        self.sse = object()
+        for message in messages:
+            # pyrebase parses every message into new objects
+            handler(copy.deepcopy(message))
+        if stay_open:
+            self._stop.wait()
+
+    def close(self):
+        while self.sse is None:
+            time.sleep(0.01)
+        self.closed = True
+        self._stop.set()
+
+
+class StreamFactory:
+    """Returns a FakeStream per call; the first `failures` calls fail to connect."""
+
+    def __init__(self, messages=(), failures=0):
+        self.messages = messages
+        self.failures = failures
+        self.streams = []
+
+    def __call__(self, handler):
+        stream = FakeStream(handler, self.messages, connect=len(self.streams) >= self.failures)
+        self.streams.append(stream)
+        return stream
+
+
+SNAPSHOT = {'event': 'put', 'path': '/', 'data': {
+    'students': {'last_updated': 't0', 'cba2@iti,edu': {'last_updated': 't1'}},
+    'attendance': {'last_updated': 'a0'},
+}}
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_put_snapshot_makes_listener_live():
+    listener = MetadataListener(StreamFactory([SNAPSHOT]))
+    listener.start()
+    assert wait_for(listener.is_live)
+    assert listener.last_updated('students') == 't0'
+    assert listener.last_updated('students', 'cba2@iti.edu') == 't1'
+    listener.close()
+
+
+def test_put_and_patch_below_the_root():
+    listener = MetadataListener(StreamFactory([SNAPSHOT]))
+    listener.start()
+    assert wait_for(listener.is_live)
+
+    listener.handle_event({'event': 'put', 'path': '/students/cba2@iti,edu/last_updated', 'data': 't2'})
+    listener.handle_event({'event': 'patch', 'path': '/attendance', 'data': {
+        'last_updated': 'a1', 'xyz@iti,edu/last_updated': 'a2'}})
+    listener.handle_event({'event': 'put', 'path': '/students', 'data': None})
+
+    assert listener.last_updated('students') is None
+    assert listener.last_updated('students', 'cba2@iti,edu') is None
+    assert listener.last_updated('attendance') == 'a1'
+    assert listener.last_updated('attendance', 'xyz@iti.edu') == 'a2'
+    listener.close()
+
+
+def test_patch_with_non_dict_data_is_ignored():
+    listener = MetadataListener(StreamFactory([SNAPSHOT]))
+    listener.start()
+    assert wait_for(listener.is_live)
+    listener.handle_event({'event': 'patch', 'path': '/students', 'data': 'unexpected'})
+    assert listener.last_updated('students') == 't0'
+    listener.close()
+
+
+def test_failed_connect_is_not_live_and_close_does_not_block():
+    factory = StreamFactory([SNAPSHOT], failures=1)
+    listener = MetadataListener(factory)
+    listener.start()
+    assert wait_for(lambda: not factory.streams[0].thread.is_alive())
+    assert not listener.is_live()
+
+    started = time.monotonic()
+    listener.close()
+    assert time.monotonic() - started < 0.5
+    assert not factory.streams[0].closed
+
+
+def test_restart_after_failed_connect():
+    factory = StreamFactory([SNAPSHOT], failures=1)
+    listener = MetadataListener(factory, restart_interval=0)
+    listener.start()
+    assert wait_for(lambda: not factory.streams[0].thread.is_alive())
+
+    started = time.monotonic()
+    listener.ensure_running()
+    assert time.monotonic() - started < 0.5
+    assert len(factory.streams) == 2
+    assert wait_for(listener.is_live)
+    assert listener.last_updated('attendance') == 'a0'
+    listener.close()
+    assert factory.streams[1].closed
+
+
+def test_restart_waits_for_restart_interval():
+    factory = StreamFactory([SNAPSHOT], failures=1)
+    listener = MetadataListener(factory, restart_interval=60)
+    listener.start()
+    assert wait_for(lambda: not factory.streams[0].thread.is_alive())
+    listener.ensure_running()
+    assert len(factory.streams) == 1
+
+
+def test_cancel_stops_serving_from_the_stream():
+    factory = StreamFactory([SNAPSHOT])
+    listener = MetadataListener(factory, restart_interval=0)
+    listener.start()
+    assert wait_for(listener.is_live)
+    listener.handle_event({'event': 'cancel', 'path': '/', 'data': 'Permission denied'})
+    assert not listener.is_live()
+
+    listener.ensure_running()
+    assert factory.streams[0].closed
+    assert wait_for(listener.is_live)
+    listener.close()
+
+
+def test_restart_after_stream_thread_died():
+    streams = []
+
+    def factory(handler):
+        streams.append(FakeStream(handler, [SNAPSHOT], stay_open=bool(streams)))
+        return streams[-1]
+
+    listener = MetadataListener(factory, restart_interval=0)
+    listener.start()
+    assert wait_for(lambda: not streams[0].thread.is_alive())
+    assert not listener.is_live()
+
+    listener.ensure_running()
+    assert not streams[0].closed
+    assert wait_for(listener.is_live)
+    listener.close()
+
+
+def test_close_is_time_bounded():
+    class StuckStream:
+        sse = object()
+
+        def close(self):
+            time.sleep(60)
+
+    listener = MetadataListener(lambda handler: StuckStream(), close_timeout=0.1)
+    listener.start()
+    started = time.monotonic()
+    listener.close()
+    assert time.monotonic() - started < 1
@@ -0,0 +1,113 @@
+import datetime
+
+from break_calendar import BreakCalendar
+from module_schedule import changed_dates, find_anchor, schedule_modules
+
+D = datetime.date
+NO_BREAKS = BreakCalendar()
+
+
+def module(module_id, order, weeks, start=None, end=None):
+    return {'id': module_id, 'order': order, 'duration_weeks': weeks, 'start': start, 'end': end}
+
+
+def weeks_after(start, weeks):
+    """(start, last day) of a module of the given weeks starting on start."""
+    return start, start + datetime.timedelta(weeks=weeks, days=-1)
+
+
+def test_find_anchor_picks_the_module_running_today():
+    modules = [
+        module('a', 1, 4, D(2025, 1, 6), D(2025, 2, 2)),
+        module('b', 2, 4, D(2025, 2, 3), D(2025, 3, 2)),
+        module('c', 3, 4, None, None),
+    ]
+    assert find_anchor(modules, D(2025, 2, 3)) == 'b'
+    assert find_anchor(modules, D(2025, 2, 2)) == 'a'
+    assert find_anchor(modules, D(2025, 6, 1)) is None
+
+
+def test_anchor_first_schedules_in_order():
+    modules = [
+        module('a', 1, 4, D(2025, 1, 6), D(2025, 2, 2)),
+        module('b', 2, 2, D(2025, 3, 3), D(2025, 3, 16)),
+        module('c', 3, 3),
+    ]
+    assert schedule_modules(modules, 'a', NO_BREAKS) == {
+        'a': weeks_after(D(2025, 1, 6), 4),
+        'b': weeks_after(D(2025, 2, 3), 2),
+        'c': weeks_after(D(2025, 2, 17), 3),
+    }
+
+
+def test_anchor_in_the_middle_wraps_earlier_modules_to_the_end():
+    modules = [
+        module('a', 1, 2, D(2024, 11, 4), D(2024, 11, 17)),
+        module('b', 2, 4, D(2025, 1, 6), D(2025, 2, 2)),
+        module('c', 3, 1, D(2025, 2, 3), D(2025, 2, 9)),
+        module('d', 4, 2),
+    ]
+    assert schedule_modules(modules, 'b', NO_BREAKS) == {
+        'b': weeks_after(D(2025, 1, 6), 4),
+        'c': weeks_after(D(2025, 2, 3), 1),
+        'd': weeks_after(D(2025, 2, 10), 2),
+        'a': weeks_after(D(2025, 2, 24), 2),
+    }
+
+
+def test_input_order_and_anchor_start_weekday_do_not_matter():
+    modules = [
+        module('c', 3, 1),
+        module('a', 1, 2),
+        module('b', 2, 4, D(2025, 1, 8), D(2025, 2, 4)),
+    ]
+    schedule = schedule_modules(modules, 'b', NO_BREAKS)
+    # The anchor keeps its week: a mid-week start snaps to the following Monday
+    assert schedule['b'] == weeks_after(D(2025, 1, 13), 4)
+    assert schedule['c'] == weeks_after(D(2025, 2, 10), 1)
+    assert schedule['a'] == weeks_after(D(2025, 2, 17), 2)
+
+
+def test_module_without_duration_is_skipped_and_does_not_move_the_next():
+    modules = [
+        module('a', 1, 4, D(2025, 1, 6), D(2025, 2, 2)),
+        module('b', 2, None, D(2025, 2, 3), D(2025, 3, 2)),
+        module('c', 3, 2),
+    ]
+    schedule = schedule_modules(modules, 'a', NO_BREAKS)
+    assert 'b' not in schedule
+    assert schedule['c'] == weeks_after(D(2025, 2, 3), 2)
+
+
+def test_anchor_without_start_leaves_the_sequence_unscheduled_until_a_start():
+    modules = [module('a', 1, 4), module('b', 2, 2, D(2025, 3, 3), D(2025, 3, 16)), module('c', 3, 1)]
+    assert schedule_modules(modules, 'a', NO_BREAKS) == {
+        'b': weeks_after(D(2025, 3, 3), 2),
+        'c': weeks_after(D(2025, 3, 17), 1),
+    }
+
+
+def test_next_module_starts_after_a_break():
+    calendar = BreakCalendar([(D(2025, 2, 3), D(2025, 2, 16))])
+    modules = [module('a', 1, 4, D(2025, 1, 6), D(2025, 2, 2)), module('b', 2, 2)]
+    assert schedule_modules(modules, 'a', calendar)['b'] == weeks_after(D(2025, 2, 17), 2)
+
+
+def test_break_inside_a_module_span_does_not_extend_it():
+    # As before the one-pass rewrite: breaks only move start dates, the span stays duration weeks
+    calendar = BreakCalendar([(D(2025, 1, 20), D(2025, 1, 26))])
+    modules = [module('a', 1, 4, D(2025, 1, 6), D(2025, 2, 2)), module('b', 2, 1)]
+    schedule = schedule_modules(modules, 'a', calendar)
+    assert schedule['a'] == weeks_after(D(2025, 1, 6), 4)
+    assert schedule['b'] == weeks_after(D(2025, 2, 3), 1)
+
+
+def test_changed_dates_only_reports_moved_modules():
+    modules = [
+        module('a', 1, 4, D(2025, 1, 6), D(2025, 2, 2)),
+        module('b', 2, 2, D(2025, 2, 3), D(2025, 2, 16)),
+        module('c', 3, 2, D(2025, 3, 3), D(2025, 3, 16)),
+        module('d', 4, None),
+    ]
+    schedule = schedule_modules(modules, 'a', NO_BREAKS)
+    assert changed_dates(modules, schedule) == {'c': weeks_after(D(2025, 2, 17), 2)}
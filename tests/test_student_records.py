@@ -0,0 +1,120 @@
+import pandas as pd
+
+from student_records import (
+    append_students, diff_student_records, next_student_index, student_records_by_index, students_dataframe,
+)
+
+STORED = [
+    {'nombre': 'Ana Pérez', 'email': 'ana@iti.edu', 'telefono': '8091110000', 'canvas_id': 101},
+    {'nombre': 'Bruno Díaz', 'email': 'bruno@iti.edu', 'canvas_id': 102},
+    {'nombre': 'Carla Ruiz', 'telefono': '8093330000', 'canvas_id': 103},
+]
+
+
+def loaded():
+    return students_dataframe(STORED)
+
+
+def test_records_by_index_skips_empty_slots():
+    assert student_records_by_index([STORED[0], None, STORED[2]]) == {0: STORED[0], 2: STORED[2]}
+    # Sparse arrays come back from Firebase as dicts with string keys
+    assert student_records_by_index({'0': STORED[0], '5': STORED[1]}) == {0: STORED[0], 5: STORED[1]}
+    assert student_records_by_index(None) == {}
+
+
+def test_dataframe_keeps_firebase_indices():
+    df = students_dataframe({'0': STORED[0], '4': STORED[1]})
+    assert list(df.index) == [0, 4]
+    assert next_student_index(df) == 5
+    assert next_student_index(pd.DataFrame()) == 0
+
+
+def test_no_changes_gives_no_updates():
+    assert diff_student_records(loaded(), loaded()) == {}
+
+
+def test_edit_writes_only_changed_fields():
+    edited = loaded()
+    edited.loc[1, 'telefono'] = '8092220000'
+    edited.loc[0, 'email'] = 'ana.perez@iti.edu'
+    assert diff_student_records(loaded(), edited) == {
+        'data/1/telefono': '8092220000',
+        'data/0/email': 'ana.perez@iti.edu',
+    }
+
+
+def test_cleared_field_is_deleted():
+    edited = loaded()
+    edited.loc[0, 'telefono'] = ''
+    assert diff_student_records(loaded(), edited) == {'data/0/telefono': None}
+
+
+def test_delete_removes_only_that_slot():
+    edited = loaded().drop(index=1)
+    assert diff_student_records(loaded(), edited) == {'data/1': None}
+
+
+def test_append_writes_new_rows_at_fresh_indices():
+    new = pd.DataFrame([{'nombre': 'Diego Mora', 'email': 'diego@iti.edu'}])
+    combined = append_students(loaded(), new)
+    assert list(combined.index) == [0, 1, 2, 3]
+    assert diff_student_records(loaded(), combined) == {
+        'data/3': {'nombre': 'Diego Mora', 'email': 'diego@iti.edu'},
+    }
+
+
+def test_append_after_a_delete_does_not_reuse_the_slot():
+    original = students_dataframe([STORED[0], None, STORED[2]])
+    combined = append_students(original, pd.DataFrame([{'nombre': 'Diego Mora'}]))
+    assert list(combined.index) == [0, 2, 3]
+    assert diff_student_records(original, combined) == {'data/3': {'nombre': 'Diego Mora'}}
+
+
+def test_append_to_empty_course_starts_at_zero():
+    new = pd.DataFrame([{'nombre': 'Diego Mora'}, {'nombre': 'Elena Soto'}])
+    combined = append_students(pd.DataFrame(), new)
+    assert diff_student_records(pd.DataFrame(), combined) == {
+        'data/0': {'nombre': 'Diego Mora'},
+        'data/1': {'nombre': 'Elena Soto'},
+    }
+
+
+def test_mixed_add_edit_delete():
+    edited = loaded().drop(index=0)
+    edited.loc[2, 'email'] = 'carla@iti.edu'
+    edited = append_students(edited, pd.DataFrame([{'nombre': 'Diego Mora', 'canvas_id': 104}]))
+    assert list(edited.index) == [1, 2, 3]
+    assert diff_student_records(loaded(), edited) == {
+        'data/0': None,
+        'data/2/email': 'carla@iti.edu',
+        'data/3': {'nombre': 'Diego Mora', 'canvas_id': 104},
+    }
+
+
+def test_edits_after_an_append_leave_untouched_rows_alone():
+    # New rows without every column must not make the existing rows look changed
+    combined = append_students(loaded(), pd.DataFrame([{'nombre': 'Diego Mora'}]))
+    combined.loc[3, 'telefono'] = '8094440000'
+    combined.loc[1, 'nombre'] = 'Bruno Díaz Gil'
+    assert diff_student_records(loaded(), combined) == {
+        'data/1/nombre': 'Bruno Díaz Gil',
+        'data/3': {'nombre': 'Diego Mora', 'telefono': '8094440000'},
+    }
+
+
+def test_second_save_after_an_append_diffs_against_the_saved_rows():
+    saved = append_students(loaded(), pd.DataFrame([{'nombre': 'Diego Mora'}]))
+    edited = saved.copy()
+    edited.loc[3, 'email'] = 'diego@iti.edu'
+    edited = edited.drop(index=0)
+    assert diff_student_records(saved, edited) == {
+        'data/0': None,
+        'data/3/email': 'diego@iti.edu',
+    }
+
+
+def test_base_path_prefix():
+    edited = loaded().drop(index=2)
+    assert diff_student_records(loaded(), edited, base_path='students/cba2@iti,edu/data') == {
+        'students/cba2@iti,edu/data/2': None,
+    }
@@ -1,33 +1,75 @@
 # c:\Users\JulioRodriguez\Documents\GitHub\streamlit\utils.py
+import logging
 import streamlit as st
 import pandas as pd
-from config import db # Assuming db is your Firebase Realtime Database reference from config.py
+from config import db, track_loader, METADATA_TTL_SECONDS, METADATA_STREAM_ENABLED, COURSES_TTL_SECONDS, FETCH_MAX_WORKERS # Assuming db is your Firebase Realtime Database reference from config.py
 import datetime # Added for type hinting and date operations
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from attendance_matrix import attendance_records_to_dict, build_attendance_matrix, attendance_day_stats, ATTENDANCE_STATS_VERSION
+from metadata_stream import MetadataListener, lookup_last_updated
+from student_records import students_dataframe, serialize_student_records, diff_student_records
+from serialization import dataframe_to_records
+from break_calendar import as_break_calendar
+from tenant_cache import tenant_scoped
+from app_log import get_logger, log_event
+
+logger = get_logger(__name__)
+
+@track_loader
+@st.cache_data(ttl=METADATA_TTL_SECONDS, show_spinner=False)
+def load_metadata_snapshot() -> dict:
+    """
+    Read the whole metadata/ subtree (every last_updated timestamp) in a single request.
+
+    The snapshot is shared by all sessions and reused for METADATA_TTL_SECONDS, so every
+    last_updated lookup made while rendering a page is served without a network call.
+    Writes through set_last_updated clear it so they are visible right away.
+
+    Returns:
+        dict: The metadata tree, e.g. {'students': {'cba2@iti,edu': {'last_updated': ...}}}.
+    """
+    try:
+        return db.child("metadata").get().val() or {}
+    except Exception as e:
+        st.error(f"Error loading metadata: {str(e)}")
+        return {}
+
+@st.cache_resource(show_spinner=False)
+def get_metadata_listener():
+    """
+    Start the process-wide metadata/ stream that keeps last_updated timestamps current.
+
+    Returns:
+        MetadataListener or None: The running listener, or None when streaming is disabled.
+    """
+    if not METADATA_STREAM_ENABLED:
+        return None
+    listener = MetadataListener(lambda handler: db.child("metadata").stream(handler))
+    listener.start()
+    return listener
 
 def get_last_updated(table_name, user_email=None):
     """
-    Fetch the last_updated timestamp for a given table from Firebase metadata.
+    Fetch the last_updated timestamp for a given table from the streamed metadata, or from
+    the polled metadata snapshot while the stream is not connected.
     
     Args:
         table_name (str): The name of the data section ('attendance', 'students', 'modules', etc.)
+        user_email (str, optional): The user/course the timestamp belongs to.
     
     Returns:
         str or None: The last_updated ISO timestamp, or None if not found.
     """
-    if user_email:
-        user_email = user_email.replace('.', ',')
-        ref = db.child("metadata").child(table_name).child(user_email)
-        snapshot = ref.get()
-        if snapshot.val() is not None:
-            metadata = snapshot.val()
-        else:
-            return None
-    else:
-        metadata = db.child("metadata").child(table_name).get().val()
-    if metadata and 'last_updated' in metadata:
-        return metadata['last_updated']
-    else:
-        return None
+    listener = get_metadata_listener()
+    if listener is not None:
+        listener.ensure_running()
+        if listener.is_live():
+            return listener.last_updated(table_name, user_email)
+    # Stream not connected (yet): fall back to the polled snapshot
+    return lookup_last_updated(load_metadata_snapshot(), table_name, user_email)
         
 def set_last_updated(table_name, user_email=None):
     """
@@ -49,29 +91,89 @@ def set_last_updated(table_name, user_email=None):
         db.child("metadata").child(table_name).update({
             'last_updated': now_iso
         })
+    record_last_updated(table_name, now_iso, user_email)
     return now_iso
+
+def record_last_updated(table_name, last_updated, user_email=None):
+    """
+    Make a metadata timestamp written by this process visible to get_last_updated right away.
+    Used after writes that include metadata/<table>/.../last_updated in their own update().
     
+    Args:
+        table_name (str): The name of the data section ('attendance', 'students', 'modules', etc.)
+        last_updated (str): The ISO timestamp that was written.
+        user_email (str, optional): The user/course the timestamp belongs to.
+    """
+    load_metadata_snapshot.clear()
+    listener = get_metadata_listener()
+    if listener is not None:
+        listener.record_local_write(table_name, last_updated, user_email)
+    
+def fetch_parallel(*reads, max_workers: int = None) -> list:
+    """
+    Run independent reads (e.g. cached loaders) at the same time and return their results.
+
+    Each read runs on a worker thread that carries the current script run context, so it
+    can use st.session_state, st.cache_data and st.error like the page itself, and gets
+    its own Database handle (see config.thread_database). The page then waits for the
+    slowest read instead of the sum of all of them.
+
+    Args:
+        *reads: Callables without arguments, e.g. lambda: load_students(students_last_updated).
+        max_workers (int, optional): Thread limit; defaults to FETCH_MAX_WORKERS.
+
+    Returns:
+        list: The result of each read, in the order given. The first exception raised by a
+        read is raised here once all of them have finished.
+    """
+    if len(reads) <= 1:
+        return [read() for read in reads]
+    ctx = get_script_run_ctx()
+    workers = min(len(reads), max_workers or FETCH_MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch',
+                            initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)) as pool:
+        futures = [pool.submit(read) for read in reads]
+    return [future.result() for future in futures]
+
+@track_loader
+@st.cache_data(ttl=COURSES_TTL_SECONDS, show_spinner=False)
+def load_course_keys() -> list:
+    """
+    List the course keys under students/ with a shallow read, which returns only the
+    top-level keys instead of every student of every course.
+
+    Returns:
+        list: Sorted course keys (e.g. "cba2@iti,edu"), or an empty list on error.
+    """
+    try:
+        keys = db.child("students").shallow().get().val()
+        return sorted(keys) if keys else []
+    except Exception as e:
+        log_event(logger, logging.ERROR, "courses.list_failed", error=str(e))
+        return []
+
+@track_loader
+@tenant_scoped
 @st.cache_data
-def load_students(students_last_updated):
+def load_students(user_email, students_last_updated):
     """
     Load students data from Firebase and ensure all required fields are present.
+    Called without user_email, which tenant_scoped fills in from the session.
     
     Returns:
         tuple: (DataFrame with student data, filename) or (None, None) if error or no data
     """
     try:
-        user_email = st.session_state.email.replace('.', ',')
-        if 'call_count' not in st.session_state:
-            st.session_state.call_count = 0
+        user_email = user_email.replace('.', ',')
         data = db.child("students").child(user_email).get().val()
-        st.session_state.call_count += 1
-        print(f"\n{st.session_state.call_count} ---data from firebase----\n", data)
 
         if not data or 'data' not in data:
             return None, None
             
-        # Create DataFrame from records
-        df = pd.DataFrame(data['data'])
+        # Create DataFrame from records, keeping each row's data/<i> index
+        df = students_dataframe(data['data'])
+        if df.empty:
+            return None, None
         
         # Normalize column names
         df.columns = df.columns.str.lower().str.strip()
@@ -158,28 +260,8 @@ def save_students(students_df):
         # Clean and standardize data
         df['nombre'] = df['nombre'].astype(str).str.strip()
         
-        # Convert data types and ensure JSON serialization
-        for col in df.columns:
-            # Handle numeric types
-            if pd.api.types.is_numeric_dtype(df[col]):
-                df[col] = df[col].astype('object').where(df[col].notna(), None)
-            # Handle datetime types
-            elif pd.api.types.is_datetime64_any_dtype(df[col]):
-                df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d')
-            # Handle string types
-            else:
-                df[col] = df[col].fillna('').astype(str).str.strip()
-        
-        # Convert to records and ensure all values are JSON-serializable
-        records = []
-        for _, row in df.iterrows():
-            record = {}
-            for key, value in row.items():
-                if pd.isna(value) or value is None or value == '':
-                    record[key] = None
-                else:
-                    record[key] = str(value) if not isinstance(value, (int, float, bool, str)) else value
-            records.append(record)
+        # Convert to JSON-serializable records; the upload replaces the list, so renumber from 0
+        records = list(serialize_student_records(df).values())
         
         # Prepare data for Firebase
         data = {
@@ -193,11 +275,18 @@ def save_students(students_df):
             }
         }
         
-        # Save to Firebase with error handling
+        # Save to Firebase with error handling; the course node is replaced together with its timestamps
         try:
-            db.child("students").child(user_email).set(data)
+            now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            db.update({
+                f"students/{user_email}": data,
+                f"metadata/students/{user_email}/last_updated": now_iso,
+                "metadata/students/last_updated": now_iso,
+            })
+            record_last_updated('students', now_iso)
+            record_last_updated('students', now_iso, user_email)
             st.success(f"Successfully saved {len(df)} student records.")
-            set_last_updated('students')
+            load_course_keys.clear() # The save may have created the course
             return True
         except Exception as firebase_error:
             st.error(f"Firebase error: {str(firebase_error)}")
@@ -209,64 +298,139 @@ def save_students(students_df):
             st.error(f"Columns in DataFrame: {', '.join(df.columns)}")
         return False
 
-# --- Functions moved from 2_Attendance.py ---
-def save_attendance(date: datetime.date, attendance_data: dict):
-    """Save attendance data to Firebase for a specific date."""
+def save_students_changes(original_df, edited_df):
+    """
+    Save only what changed between the loaded and the edited students as one multi-path update.
+
+    Rows are matched by their data/<i> index (see student_records.diff_student_records), so
+    deleted rows leave their slot empty and new rows must be labelled with append_students.
+    The global and per-course metadata/students last_updated are written in the same update.
+    
+    Args:
+        original_df (DataFrame): Students as returned by load_students
+        edited_df (DataFrame): Students after the edit
+        
+    Returns:
+        bool: True if save was successful (or there was nothing to save), False otherwise
+    """
     try:
         user_email = st.session_state.email.replace('.', ',')
-        date_str = date.strftime('%Y-%m-%d')
-        # Ensure student names (keys in attendance_data) are safe for Firebase paths if necessary
-        # For now, assuming they are simple strings.
-        db.child("attendance").child(user_email).child(date_str).set(attendance_data)
-        set_last_updated('attendance')
+        base_path = f"students/{user_email}"
+        updates = diff_student_records(original_df, edited_df, base_path=f"{base_path}/data")
+        if not updates:
+            return True
+        now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        updates[f"{base_path}/timestamp"] = datetime.datetime.utcnow().isoformat() + 'Z'
+        updates[f"{base_path}/metadata/record_count"] = 0 if edited_df is None else len(edited_df)
+        updates[f"metadata/students/{user_email}/last_updated"] = now_iso
+        updates["metadata/students/last_updated"] = now_iso
+        db.update(updates)
+        record_last_updated('students', now_iso)
+        record_last_updated('students', now_iso, user_email)
+        if original_df is None or original_df.empty:
+            load_course_keys.clear() # First students of a new course
         return True
     except Exception as e:
-        st.error(f"Error saving attendance for {date_str}: {str(e)}")
+        st.error(f"Error saving students: {str(e)}")
         return False
 
+# --- Functions moved from 2_Attendance.py ---
+@track_loader
+@tenant_scoped
 @st.cache_data
-def load_attendance(date: datetime.date, attendance_last_updated: str) -> dict:
-    """Load attendance data from Firebase for a specific date."""
+def load_attendance(user_email: str, date: datetime.date, attendance_last_updated: str) -> dict:
+    """Load attendance data from Firebase for a specific date (user_email is filled in by tenant_scoped)."""
     try:
-        user_email = st.session_state.email.replace('.', ',')
+        user_email = user_email.replace('.', ',')
         date_str = date.strftime('%Y-%m-%d')
         raw_data = db.child("attendance").child(user_email).child(date_str).get().val()
 
-        if 'call_count' not in st.session_state:
-            st.session_state.call_count = 0
-        st.session_state.call_count += 1
-        print(f"\n{st.session_state.call_count} ---load attendance data from firebase----\n", raw_data)
-        
-        if isinstance(raw_data, list):
-            # Convert list of records to a dictionary keyed by student name
-            processed_data = {}
-            for record in raw_data:
-                if isinstance(record, dict) and 'Nombre' in record:
-                    # Ensure we don't overwrite if names aren't unique, though they should be per day
-                    processed_data[record['Nombre']] = record 
-                # else: st.warning(f"Skipping invalid record in list for {date_str}: {record}") # Optional: log bad records
-            return processed_data
-        elif isinstance(raw_data, dict):
-            # If it's already a dict (e.g., older data or different save format), return as is
-            return raw_data
-        else:
-            # No data or unexpected type
-            return {}
-            
+        return attendance_records_to_dict(raw_data)
+
     except Exception as e:
         st.error(f"Error loading attendance for {date_str}: {str(e)}")
         return {}
 
+@track_loader
+@tenant_scoped
+@st.cache_data
+def load_attendance_range(user_email: str, start_date: datetime.date, end_date: datetime.date, attendance_last_updated: str) -> pd.DataFrame:
+    """
+    Load attendance for every saved date between start_date and end_date with a single
+    range query on the ISO date keys of attendance/<user>/.
+
+    Args:
+        user_email (str): The user's email; filled in by tenant_scoped, callers omit it.
+        start_date (datetime.date): First date of the range (inclusive).
+        end_date (datetime.date): Last date of the range (inclusive).
+        attendance_last_updated (str): The attendance last_updated timestamp, used as cache key.
+
+    Returns:
+        DataFrame: Boolean students × dates matrix (see attendance_matrix.build_attendance_matrix).
+        The index holds normalized student keys, the columns the 'YYYY-MM-DD' dates that
+        have data. Empty DataFrame if there is no data.
+    """
+    try:
+        user_email = user_email.replace('.', ',')
+        raw_data = (
+            db.child("attendance").child(user_email)
+            .order_by_key()
+            .start_at(start_date.strftime('%Y-%m-%d'))
+            .end_at(end_date.strftime('%Y-%m-%d'))
+            .get().val()
+        )
+
+        return build_attendance_matrix(raw_data)
+
+    except Exception as e:
+        st.error(f"Error loading attendance from {start_date} to {end_date}: {str(e)}")
+        return pd.DataFrame(dtype=bool)
+
+@track_loader
+@tenant_scoped
+@st.cache_data
+def load_attendance_stats_range(user_email: str, start_date: datetime.date, end_date: datetime.date, attendance_last_updated: str) -> dict:
+    """
+    Load the per-day attendance aggregates between start_date and end_date with one range
+    query on attendance_stats/<user>/, without the attendance records themselves.
+
+    Args:
+        user_email (str): The user's email; filled in by tenant_scoped, callers omit it.
+        start_date (datetime.date): First date of the range (inclusive).
+        end_date (datetime.date): Last date of the range (inclusive).
+        attendance_last_updated (str): The attendance last_updated timestamp, used as cache key.
+
+    Returns:
+        dict: {'YYYY-MM-DD': {'present_keys', 'total', 'version'}} for the dates that have a
+        current aggregate. Dates saved before the current aggregate version are missing.
+    """
+    try:
+        user_email = user_email.replace('.', ',')
+        raw_data = (
+            db.child("attendance_stats").child(user_email)
+            .order_by_key()
+            .start_at(start_date.strftime('%Y-%m-%d'))
+            .end_at(end_date.strftime('%Y-%m-%d'))
+            .get().val()
+        )
+        return {
+            date_str: stats for date_str, stats in (raw_data or {}).items()
+            if isinstance(stats, dict) and stats.get('version') == ATTENDANCE_STATS_VERSION
+        }
+
+    except Exception as e:
+        st.error(f"Error loading attendance summary from {start_date} to {end_date}: {str(e)}")
+        return {}
+
 # --- Module Management Functions ---
 
+@track_loader
 @st.cache_data(ttl=3600)
-def load_modules_from_db(user_email: str) -> pd.DataFrame:
-    """Load modules data from Firebase with caching."""
-    print("\n\nload_modules_from_db")
+def load_modules_from_db(user_email: str, modules_last_updated: str) -> pd.DataFrame:
+    """Load modules data from Firebase with caching (modules_last_updated is the cache key)."""
     try:
         user_email_sanitized = user_email.replace('.', ',')
         modules_data = db.child("modules").child(user_email_sanitized).get().val()
-        print("\n\nmodules_data", modules_data)
         
         if not modules_data:
             return pd.DataFrame(columns=['Nombre', 'Duración (semanas)'])
@@ -287,7 +451,7 @@ def load_modules_from_db(user_email: str) -> pd.DataFrame:
 
 def load_modules(user_email: str) -> pd.DataFrame:
     if 'modules_df' not in st.session_state or st.session_state.modules_df is None:
-        modules = load_modules_from_db(user_email)
+        modules = load_modules_from_db(user_email, get_last_updated('modules', user_email))
         st.session_state.modules_df = modules if modules is not None else pd.DataFrame()
     return st.session_state.modules_df
 
@@ -299,28 +463,28 @@ def save_modules_to_db(user_email: str, modules_df: pd.DataFrame) -> bool:
     """Save modules to Firebase and update session."""
     try:
         user_email_sanitized = user_email.replace('.', ',')
-        db.child("modules").child(user_email_sanitized).set(modules_df.to_dict('records'))
+        db.child("modules").child(user_email_sanitized).set(dataframe_to_records(modules_df, null_value=''))
+        set_last_updated('modules', user_email_sanitized)
         update_modules_in_session(modules_df)
         return True
     except Exception as e:
         st.error(f"Error saving modules: {str(e)}")
         return False
 
+@track_loader
 @st.cache_data
-def get_module_name_by_id(user_email: str, module_id: str) -> str:
-    """Get the module name by its ID."""
-    print("calling get_module_name_by_id with module_id -", module_id)
+def get_module_name_by_id(user_email: str, module_id: str, modules_last_updated: str) -> str:
+    """Get the module name by its ID (modules_last_updated is the cache key)."""
     try:
         user_email_sanitized = user_email.replace('.', ',')
         modules_data = db.child("modules").child(user_email_sanitized).child(module_id).get().val()
-        print("\n-----modules_data from get_module_name_by_id database ---", modules_data)
         if modules_data:
             return modules_data.get('name')
         else:
-            print(f"Module with firebase_key '{module_id}' not found for user '{user_email}'.")
+            log_event(logger, logging.INFO, "module.not_found", module_id=module_id, user=user_email)
             return None
     except Exception as e:
-        print(f"Error getting module name by firebase_key: {e}")
+        log_event(logger, logging.ERROR, "module.name_failed", module_id=module_id, error=str(e))
         return None
 
 def delete_student(student_nombre_to_delete: str) -> bool:
@@ -349,13 +513,13 @@ def delete_student(student_nombre_to_delete: str) -> bool:
             st.warning(f"Student '{student_nombre_to_delete}' not found in the list.")
             return False
 
-        # Save the modified DataFrame (which overwrites the old list)
-        if save_students(students_to_keep_df):
-            # Note: save_students already calls set_last_updated('students')
+        # Only the deleted data/<i> nodes are removed
+        if save_students_changes(current_students_df, students_to_keep_df):
+            # Note: save_students_changes already writes the students last_updated timestamps
             st.success(f"Student '{student_nombre_to_delete}' deleted successfully.")
             return True
         else:
-            # save_students would have shown an error
+            # save_students_changes would have shown an error
             return False
             
     except Exception as e:
@@ -363,33 +527,85 @@ def delete_student(student_nombre_to_delete: str) -> bool:
         return False
 
 def save_attendance(date: datetime.date, attendance_data: list):
-    """Save attendance data to Firebase for a specific date."""
+    """
+    Save attendance data to Firebase for a specific date.
+
+    The records, the day's aggregate at attendance_stats/<user>/<date> and the global and
+    per-user metadata/attendance last_updated are written in one multi-path update.
+    """
     try:
         user_email = st.session_state.email.replace('.', ',')
         date_str = date.strftime('%Y-%m-%d')
         # Ensure student names (keys in attendance_data) are safe for Firebase paths if necessary
         # For now, assuming they are simple strings.
-        db.child("attendance").child(user_email).child(date_str).set(attendance_data)
-        set_last_updated('attendance', user_email)
+        now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        db.update({
+            f"attendance/{user_email}/{date_str}": attendance_data,
+            f"attendance_stats/{user_email}/{date_str}": attendance_day_stats(attendance_data),
+            f"metadata/attendance/{user_email}/last_updated": now_iso,
+            "metadata/attendance/last_updated": now_iso,
+        })
+        record_last_updated('attendance', now_iso)
+        record_last_updated('attendance', now_iso, user_email)
         return True
     except Exception as e:
         st.error(f"Error saving attendance for {date_str}: {str(e)}")
         return False
 
+def save_attendance_bulk(attendance_by_date: dict) -> tuple:
+    """
+    Save attendance for several dates with a single root-level multi-path update.
+
+    attendance/<user>/<date> and attendance_stats/<user>/<date> for every date and the
+    global and per-user metadata/attendance last_updated are written together, so either
+    all dates are saved or none is.
+
+    Args:
+        attendance_by_date (dict): {datetime.date: list of {'Nombre': ..., 'Presente': ...} records}
+
+    Returns:
+        tuple: ({'YYYY-MM-DD': bool saved}, elapsed seconds of the write)
+    """
+    user_email = st.session_state.email.replace('.', ',')
+    date_keys = [date.strftime('%Y-%m-%d') for date in attendance_by_date]
+    if not attendance_by_date:
+        return {}, 0.0
+
+    now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    updates = {}
+    for date, records in attendance_by_date.items():
+        date_key = date.strftime('%Y-%m-%d')
+        updates[f"attendance/{user_email}/{date_key}"] = records
+        updates[f"attendance_stats/{user_email}/{date_key}"] = attendance_day_stats(records)
+    updates[f"metadata/attendance/{user_email}/last_updated"] = now_iso
+    updates["metadata/attendance/last_updated"] = now_iso
+
+    started = time.perf_counter()
+    try:
+        db.update(updates)
+    except Exception as e:
+        elapsed = time.perf_counter() - started
+        st.error(f"Error saving attendance for {len(date_keys)} date(s): {str(e)}")
+        return {date_key: False for date_key in date_keys}, elapsed
+    elapsed = time.perf_counter() - started
+
+    record_last_updated('attendance', now_iso)
+    record_last_updated('attendance', now_iso, user_email)
+    return {date_key: True for date_key in date_keys}, elapsed
+
+@track_loader
+@tenant_scoped
 @st.cache_data
-def get_attendance_dates(attendance_last_updated: str):
+def get_attendance_dates(user_email: str, attendance_last_updated: str):
     """
-    Get a list of all dates with saved attendance records.
+    Get a list of all dates with saved attendance records of user_email (filled in by tenant_scoped).
     Returns a sorted list of date strings in 'YYYY-MM-DD' format.
     """
     try:
-        user_email = st.session_state.email.replace('.', ',')
-        docs = db.child("attendance").child(user_email).get().val()
+        user_email = user_email.replace('.', ',')
+        # Only the date keys are needed: a shallow read skips every day's records
+        docs = db.child("attendance").child(user_email).shallow().get().val()
 
-        if 'call_count' not in st.session_state:
-            st.session_state.call_count = 0
-        st.session_state.call_count += 1
-        print(f"\n{st.session_state.call_count} ---get_attendance_dates-data from firebase----\n{str(docs)[:100]}...")
 
         if not docs:
             return []
@@ -421,7 +637,7 @@ def delete_attendance_dates(dates_to_delete=None, delete_all=False):
     Returns:
         bool: True if at least one deletion was successful, False otherwise.
     """
-    print(f"Intentando eliminar fechas: {dates_to_delete}, delete_all={delete_all} DESDE utils")
+    log_event(logger, logging.INFO, "attendance.delete_requested", dates=dates_to_delete, delete_all=delete_all)
     success = False
 
     try:
@@ -431,29 +647,28 @@ def delete_attendance_dates(dates_to_delete=None, delete_all=False):
         if delete_all:
             # This case is for explicitly deleting ALL records for the user
             all_user_records_ref = db.child(user_base_attendance_path)
-            print(f"WARNING: Attempting to delete ALL attendance records at path: {all_user_records_ref.path}")
+            log_event(logger, logging.WARNING, "attendance.delete_all", path=all_user_records_ref.path)
             
             if not all_user_records_ref.path or all_user_records_ref.path == '/' or not all_user_records_ref.path.startswith('attendance/'):
                 st.error(f"CRITICAL SAFETY HALT: Unsafe path for full deletion: '{all_user_records_ref.path}'. Aborting.")
-                print(f"CRITICAL SAFETY HALT: Unsafe full deletion path: {all_user_records_ref.path}")
+                log_event(logger, logging.CRITICAL, "attendance.delete_all_unsafe_path", path=all_user_records_ref.path)
                 return False
 
             try:
                 all_user_records_ref.remove()
-                print(f"SUCCESS: All attendance records removed at path: {all_user_records_ref.path}")
-                print(f"SUCCESS: Attendance records last updated at: {get_last_updated('attendance')}")
+                db.child("attendance_stats").child(user_email_key).remove()
+                log_event(logger, logging.INFO, "attendance.deleted_all", path=user_base_attendance_path)
                 set_last_updated('attendance')
-                print(f"SUCCESS: Attendance records last updated at: {get_last_updated('attendance')}")
+                set_last_updated('attendance', user_email_key)
                 return True
             except Exception as e:
-                print(f"ERROR: Failed to remove all records: {str(e)}")
+                log_event(logger, logging.ERROR, "attendance.delete_all_failed", error=str(e))
                 st.error(f"Error al eliminar todos los registros: {str(e)}")
                 return False
 
         # If no dates provided, we don’t do anything
         if not dates_to_delete:
             st.warning("No dates provided for deletion.")
-            print("INFO: No dates provided, skipping deletion.")
             return False
 
         # Validate and clean dates
@@ -464,11 +679,10 @@ def delete_attendance_dates(dates_to_delete=None, delete_all=False):
                 valid_dates.append(date_str.strip())
             except ValueError:
                 st.warning(f"Formato de fecha inválido: {date_str}. Se omitirá.")
-                print(f"WARNING: Invalid date format '{date_str}' ignored.")
+                log_event(logger, logging.WARNING, "attendance.delete_invalid_date", date=date_str)
 
         if not valid_dates:
             st.error("No hay fechas válidas para eliminar después de la validación.")
-            print("ERROR: No valid dates to process after validation.")
             return False
 
         # Delete each valid date
@@ -478,22 +692,24 @@ def delete_attendance_dates(dates_to_delete=None, delete_all=False):
             data_snapshot = ref_for_get.get()
 
             if data_snapshot.val() is not None:
-                print(f"INFO: Removing data at path: {full_path}")
+                log_event(logger, logging.INFO, "attendance.delete_date", path=full_path)
                 try:
-                    db.child(full_path).remove()
+                    # The records and the day's aggregate go together
+                    db.update({full_path: None, f"attendance_stats/{user_email_key}/{date_str}": None})
                     set_last_updated('attendance')
+                    set_last_updated('attendance', user_email_key)
                     success = True
                 except Exception as e:
-                    print(f"ERROR: Failed to remove date {date_str}: {str(e)}")
+                    log_event(logger, logging.ERROR, "attendance.delete_date_failed", date=date_str, error=str(e))
                     st.error(f"Error al eliminar la fecha {date_str}: {str(e)}")
             else:
-                print(f"INFO: No data found for date {date_str}, skipping.")
+                log_event(logger, logging.DEBUG, "attendance.delete_date_missing", date=date_str)
 
         return success
 
     except Exception as e:
         st.error(f"Error deleting attendance records: {str(e)}")
-        print(f"EXCEPTION: {str(e)}")
+        log_event(logger, logging.ERROR, "attendance.delete_failed", exc_info=True)
         return False
 
 def format_date_for_display(date_value):
@@ -653,6 +869,7 @@ def date_format(date_value, from_format, to_format='%m/%d/%Y'):
     except (ValueError, TypeError, AttributeError):
         return 'No especificada'
 
+@track_loader
 @st.cache_data
 def get_highest_module_credit(user_email: str, modules_last_updated: str) -> int:
     """
@@ -668,10 +885,6 @@ def get_highest_module_credit(user_email: str, modules_last_updated: str) -> int
         # Create a fresh Firebase reference for this operation
         modules_ref = db.child("modules").child(user_email).get()
 
-        if 'call_count' not in st.session_state:
-            st.session_state.call_count = 0
-        st.session_state.call_count += 1
-        print(f"\n{st.session_state.call_count} ---get_highest_module_credit-data from firebase----\n", modules_ref.val())
         if not modules_ref.val():
             return 0
             
@@ -693,20 +906,21 @@ def get_highest_module_credit(user_email: str, modules_last_updated: str) -> int
         st.error(f"Error al obtener el crédito máximo del módulo: {str(e)}")
         return 0
 
+@track_loader
 @st.cache_data
-def get_module_on_date(user_email: str, target_date: datetime.date = None) -> dict:
+def get_module_on_date(user_email: str, modules_last_updated: str, target_date: datetime.date = None) -> dict:
     """
     Finds the module active on a given date for the user.
     
     Args:
         user_email: The user's email (with . replaced with ,)
+        modules_last_updated: The modules last_updated timestamp of the user, used as cache key
         target_date: The date to check (defaults to today)
 
     Returns:
         dict: Module information if found, None otherwise
     """
-    print("\n\ntarget_date\n", target_date)
-    print("\n\nuser_email\n", user_email)
+    log_event(logger, logging.DEBUG, "module_on_date.lookup", sampled=True, user=user_email, date=target_date)
 
     if target_date is None:
         target_date = datetime.date.today()
@@ -714,10 +928,6 @@ def get_module_on_date(user_email: str, target_date: datetime.date = None) -> di
     try:
         modules_ref = db.child("modules").child(user_email).get()
 
-        if 'call_count' not in st.session_state:
-            st.session_state.call_count = 0
-        st.session_state.call_count += 1
-        print(f"\n{st.session_state.call_count} ---get_module_on_date-data from firebase----\n", modules_ref.val())
 
         modules_data = modules_ref.val()
         if not modules_data:
@@ -752,7 +962,7 @@ def get_module_on_date(user_email: str, target_date: datetime.date = None) -> di
                     }
 
             except (ValueError, TypeError) as e:
-                print(f"Error processing module {module_key}: {e}")
+                log_event(logger, logging.WARNING, "module.invalid_dates", module=module_key, error=str(e))
                 continue
 
         return None
@@ -763,6 +973,7 @@ def get_module_on_date(user_email: str, target_date: datetime.date = None) -> di
 
 
 
+@track_loader
 @st.cache_data
 def get_available_modules(user_email: str, modules_last_updated: str) -> list:
     """
@@ -778,10 +989,6 @@ def get_available_modules(user_email: str, modules_last_updated: str) -> list:
         # Create a fresh Firebase reference for this operation
         modules_ref = db.child("modules").child(user_email).get()
 
-        if 'call_count' not in st.session_state:
-            st.session_state.call_count = 0
-        st.session_state.call_count += 1
-        print(f"\n{st.session_state.call_count} ---get_available_modules-data from firebase----\n", modules_ref.val())
         
         if not modules_ref.val():
             return []
@@ -851,16 +1058,9 @@ def get_available_modules(user_email: str, modules_last_updated: str) -> list:
 def adjust_for_breaks(start, end, breaks):
     """
     Adjusts the end date if a break overlaps the module period.
+    `breaks` is a BreakCalendar or a list of (start_date, end_date) tuples.
     """
-    extra_days = datetime.timedelta(days=0)
-    for b_start, b_end in breaks:
-        if b_end < start or b_start > end:
-            continue  # no overlap
-        overlap_start = max(start, b_start)
-        overlap_end = min(end, b_end)
-        overlap_days = (overlap_end - overlap_start + datetime.timedelta(days=1)).days
-        extra_days += datetime.timedelta(days=overlap_days)
-    return start, end + extra_days
+    return start, as_break_calendar(breaks).extend_for_breaks(start, end)
 
 def generate_module_schedule(modules, first_cycle_start, num_cycles):
     """
@@ -1,37 +1,33 @@
 # c:\Users\JulioRodriguez\Documents\GitHub\streamlit\utils.py
+import logging
 import streamlit as st
 import pandas as pd
 import uuid
-import numpy as np
-from config import db # Assuming db is your Firebase Realtime Database reference from config.py
+from config import db, track_loader # Assuming db is your Firebase Realtime Database reference from config.py
+from utils import get_last_updated, record_last_updated, load_course_keys
+from student_records import students_dataframe, serialize_student_records, diff_student_records, student_records_by_index
+from student_search import StudentSearchIndex, RESULT_COLUMNS
+from break_calendar import BreakCalendar, as_break_calendar
+from serialization import dataframe_to_records_by_index
+from app_log import get_logger, log_event
 import datetime
 import time
 
+logger = get_logger(__name__)
+
 
 def admin_get_last_updated(table_name, course_email):
     """
-    Fetch the last_updated timestamp for a given table from Firebase metadata.
+    Fetch the last_updated timestamp for a given table and course from the metadata snapshot.
     
     Args:
         table_name (str): The name of the data section ('attendance', 'students', 'modules', etc.)
+        course_email (str): The email of the course
     
     Returns:
         str or None: The last_updated ISO timestamp, or None if not found.
     """
-    if user_email:
-        user_email = user_email.replace('.', ',')
-        ref = db.child("metadata").child(table_name).child(user_email)
-        snapshot = ref.get()
-        if snapshot.val() is not None:
-            metadata = snapshot.val()
-        else:
-            return None
-    else:
-        metadata = db.child("metadata").child(table_name).get().val()
-    if metadata and 'last_updated' in metadata:
-        return metadata['last_updated']
-    else:
-        return None
+    return get_last_updated(table_name, course_email)
         
 def admin_set_last_updated(table_name, course_email):
     """
@@ -54,6 +50,7 @@ def admin_set_last_updated(table_name, course_email):
         db.child("metadata").child(table_name).update({
             'last_updated': now_iso
         })
+    record_last_updated(table_name, now_iso, course_email)
     return now_iso
     
 def admin_get_students_by_email(email):
@@ -84,7 +81,7 @@ def admin_get_students_by_email(email):
 
         # Check if any data was returned for that specific email key
         if not snapshot.val():
-            print(f"No student entry found for email key: {email}")
+            log_event(logger, logging.INFO, "students.by_email_missing", email=email)
             return {}
 
         # The data under this email key is an object, and within it,
@@ -92,7 +89,7 @@ def admin_get_students_by_email(email):
         student_data_array = snapshot.val().get("data")
 
         if not student_data_array:
-            print(f"No 'data' array found for email key: {email}")
+            log_event(logger, logging.INFO, "students.by_email_no_data", email=email)
             return {}
 
         # If you want to return a dictionary where keys are derived (e.g., index)
@@ -104,45 +101,28 @@ def admin_get_students_by_email(email):
             key = f"{email}_{i}" # Example key: "cba2@iti.edu_0"
             found_students[key] = student_record
 
-        print(f"Found {len(student_data_array)} records for email key: {email}")
-        print(found_students)
+        log_event(logger, logging.DEBUG, "students.by_email_found", sampled=True, email=email, records=len(found_students))
         return found_students
 
     except Exception as e:
-        print(f"Error querying students by email key '{email}': {str(e)}")
+        log_event(logger, logging.ERROR, "students.by_email_failed", email=email, error=str(e))
         return {}
 
-@st.cache_data
 def admin_get_student_group_emails():
     """
     Retrieves the top-level email keys (representing student groups)
-    from the 'students' node in the database.
+    from the 'students' node in the database, without downloading the students.
 
     Returns:
         list: A list of email strings (e.g., "cba2@iti,edu"), or an empty list
               if no student groups are found or an error occurs.
     """
-    try:
-        students_ref = db.child("students")
-        students_snapshot = students_ref.get()
-        print('\n\n---------------------------------database readed-------------------------\n\n', {k: v['data'][0] if v and 'data' in v else None for k, v in students_snapshot.val().items()})
-
-        if not students_snapshot.val():
-            print("No student entries found in the database")
-            return []
-
-        email_keys = []
-        for student_key, _ in students_snapshot.val().items():
-            email_keys.append(student_key)
-
-        print(f"Found {len(email_keys)} student group emails.")
-        print(email_keys)
-        return email_keys
-
-    except Exception as e:
-        print(f"Error retrieving student group emails: {str(e)}")
-        return []
+    email_keys = load_course_keys()
+    if not email_keys:
+        log_event(logger, logging.INFO, "courses.none_found")
+    return email_keys
     
+@track_loader
 @st.cache_data
 def admin_load_students(course_email):
     """
@@ -153,17 +133,15 @@ def admin_load_students(course_email):
     """
     try:
         user_email = course_email
-        if 'call_count' not in st.session_state:
-            st.session_state.call_count = 0
         data = db.child("students").child(user_email).get().val()
-        st.session_state.call_count += 1
-        print(f"\n{st.session_state.call_count} ---data from firebase----\n", data)
 
         if not data or 'data' not in data:
             return None, None
             
-        # Create DataFrame from records
-        df = pd.DataFrame(data['data'])
+        # Create DataFrame from records, keeping each row's data/<i> index
+        df = students_dataframe(data['data'])
+        if df.empty:
+            return None, None
         
         # Normalize column names
         df.columns = df.columns.str.lower().str.strip()
@@ -250,28 +228,8 @@ def admin_save_students(course_email, students_df):
         # Clean and standardize data
         df['nombre'] = df['nombre'].astype(str).str.strip()
         
-        # Convert data types and ensure JSON serialization
-        for col in df.columns:
-            # Handle numeric types
-            if pd.api.types.is_numeric_dtype(df[col]):
-                df[col] = df[col].astype('object').where(df[col].notna(), None)
-            # Handle datetime types
-            elif pd.api.types.is_datetime64_any_dtype(df[col]):
-                df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d')
-            # Handle string types
-            else:
-                df[col] = df[col].fillna('').astype(str).str.strip()
-        
-        # Convert to records and ensure all values are JSON-serializable
-        records = []
-        for _, row in df.iterrows():
-            record = {}
-            for key, value in row.items():
-                if pd.isna(value) or value is None or value == '':
-                    record[key] = None
-                else:
-                    record[key] = str(value) if not isinstance(value, (int, float, bool, str)) else value
-            records.append(record)
+        # Convert to JSON-serializable records; the upload replaces the list, so renumber from 0
+        records = list(serialize_student_records(df).values())
         
         # Prepare data for Firebase
         data = {
@@ -290,6 +248,7 @@ def admin_save_students(course_email, students_df):
             db.child("students").child(course_email).set(data)
             st.success(f"Successfully saved {len(df)} student records to {course_email}.")
             admin_set_last_updated('students', course_email)
+            load_course_keys.clear() # The save may have created the course
             return True
         except Exception as firebase_error:
             st.error(f"Firebase error: {str(firebase_error)}")
@@ -301,6 +260,35 @@ def admin_save_students(course_email, students_df):
             st.error(f"Columns in DataFrame: {', '.join(df.columns)}")
         return False
 
+def admin_save_students_changes(course_email, original_df, edited_df):
+    """
+    Save only what changed between the loaded and the edited students of a course
+    as one multi-path update.
+    
+    Args:
+        course_email (str): Email of the course to save students to
+        original_df (DataFrame): Students as returned by admin_load_students
+        edited_df (DataFrame): Students after the edit, new rows labelled with append_students
+        
+    Returns:
+        bool: True if save was successful (or there was nothing to save), False otherwise
+    """
+    try:
+        updates = diff_student_records(original_df, edited_df)
+        if not updates:
+            return True
+        updates['timestamp'] = datetime.datetime.utcnow().isoformat() + 'Z'
+        updates['metadata/record_count'] = 0 if edited_df is None else len(edited_df)
+        db.child("students").child(course_email).update(updates)
+        admin_set_last_updated('students', course_email)
+        if original_df is None or original_df.empty:
+            load_course_keys.clear() # First students of a new course
+        return True
+    except Exception as e:
+        st.error(f"Error saving students: {str(e)}")
+        return False
+
+@track_loader
 @st.cache_data(ttl=1)
 def admin_get_available_modules(user_email: str) -> list:
     """
@@ -316,11 +304,6 @@ def admin_get_available_modules(user_email: str) -> list:
         # Create a fresh Firebase reference for this operation
         # Note: You should ensure 'db' is initialized before this function is called.
         modules_ref = db.child("modules").child(user_email).get()
-        # print("\n\nAvailable modules for user:", modules_ref.val())
-        # if 'call_count' not in st.session_state:
-        #     st.session_state.call_count = 0
-        # st.session_state.call_count += 1
-        # print(f"\n{st.session_state.call_count} ---get_available_modules-data from firebase----\n", modules_ref.val())
 
         if not modules_ref.val():
             return []
@@ -363,8 +346,7 @@ def admin_get_available_modules(user_email: str) -> list:
                 
             ciclo = module_data.get('ciclo', 1)  # Default to 1 if not specified
             
-            # Debug: Print the extracted values
-            print(f"Extracted values - duration: {duration_weeks}, credits: {credits}, description: {description}")
+            log_event(logger, logging.DEBUG, "module.parsed", sampled=True, duration=duration_weeks, credits=credits)
 
             start_date_dt = None
             if isinstance(start_date_str, str):
@@ -403,52 +385,6 @@ def admin_get_available_modules(user_email: str) -> list:
         st.error(f"Error al cargar los módulos: {str(e)}")
         return []
 
-def save_modules_to_db(user_email: str, modules_data: list[dict]) -> bool:
-    """
-    Save module changes to Firebase, updating existing ones and adding new ones.
-    Handles deletions by omission if the entire list is considered the source of truth.
-    """
-    try:
-        # --- FIX: Sanitize the email to create a valid Firebase key ---
-        user_email_sanitized = user_email # Example sanitization
-        
-        # --- CRITICAL FIX: Use update/push instead of set ---
-        user_modules_ref = db.child("modules").child(user_email_sanitized)
-        
-        updates = {}
-        for module in modules_data:
-            # Check if the module has a firebase_key. A key means it's an existing record.
-            # pd.notna() is important because the key could be NaN for new rows.
-            firebase_key = module.get('firebase_key')
-
-            if firebase_key and pd.notna(firebase_key):
-                # --- This is an UPDATE to an existing module ---
-                # We build a dictionary of updates to send in one batch
-                updates[f"{firebase_key}"] = module
-            else:
-                # --- This is a NEW module, so we PUSH it ---
-                # .push() generates the unique ID for us
-                user_modules_ref.push(module)
-
-        # Send all updates for existing records in a single, efficient call
-        if updates:
-            user_modules_ref.update(updates)
-
-        # Note: This logic does not handle row DELETION from the database.
-        # If a user can delete rows, you would need a more complex sync:
-        # 1. Fetch all keys from Firebase.
-        # 2. Get all keys from the UI DataFrame.
-        # 3. For any key in Firebase but not in the UI, issue a .child(key).remove() call.
-
-        # update_modules_in_session() might need to be called after the operation
-        # or rely on the st.rerun() to reload from DB. The rerun is cleaner.
-        admin_set_last_updated('modules', user_email)
-        return True
-
-    except Exception as e:
-        st.error(f"Error al guardar los módulos: {str(e)}")
-        return False
-
 def load_breaks():
     """
     Loads all 'breaks' data from the Firebase Realtime Database.
@@ -522,60 +458,36 @@ def adjust_date_for_breaks(current_date, breaks):
     Verifica si una fecha cae dentro de un período de vacaciones.
     Si es así, retorna el próximo lunes después del final del break.
     Si no, retorna la misma fecha (ajustada a lunes si no lo es).
+    `breaks` puede ser un BreakCalendar o una lista de tuplas (inicio, fin).
     """
-    for b_start, b_end in breaks:
-        if b_start <= current_date <= b_end:
-            next_day = b_end + datetime.timedelta(days=1)
-            # Snap to next Monday
-            days_to_monday = (7 - next_day.weekday()) % 7
-            adjusted_date = next_day + datetime.timedelta(days=days_to_monday)
-            return adjusted_date
-
-    # Si no cae en vacaciones, también ajustar al lunes más cercano si no lo es
-    if current_date.weekday() != 0:
-        days_to_monday = (7 - current_date.weekday()) % 7
-        current_date += datetime.timedelta(days=days_to_monday)
-
-    return current_date
+    return as_break_calendar(breaks).next_working_monday(current_date)
 
 def calculate_end_date(start_date, num_weeks, breaks):
     """
     Calculates the end date from a start date and a number of weeks,
     taking into account any breaks within that period.
-    The `breaks` parameter is expected to be a list of (start_date, end_date) tuples.
-    """
-    end_date = start_date + datetime.timedelta(weeks=num_weeks)
-
-    # print("\n\nstart_date from calculate_end_date", start_date)
-    # print("\n\nnum_weeks from calculate_end_date", num_weeks)
-    # print("\n\nbreaks from calculate_end_date", breaks)
-    total_break_days = 0
-    for b_start, b_end in breaks:
-        if start_date <= b_end and end_date >= b_start:
-            overlap_start = max(start_date, b_start)
-            overlap_end = min(end_date, b_end)
-            # Include the end date in count
-            total_break_days += (overlap_end - overlap_start).days + 1  
-
-    end_date += datetime.timedelta(days=total_break_days)
-    print("\n\nend_date", end_date)
+    The `breaks` parameter is a BreakCalendar or a list of (start_date, end_date) tuples.
+    """
+    end_date = as_break_calendar(breaks).end_date(start_date, num_weeks)
     return end_date
 
-def row_to_clean_dict(row: pd.Series) -> dict:
+@track_loader
+@st.cache_data(show_spinner=False)
+def load_break_calendar_version(breaks_last_updated) -> BreakCalendar:
     """
-    • Converts NaN / None / pd.NA to "" (empty text)  
-    • Converts pandas.Timestamp → python datetime.datetime  
-    • Leaves every other value unchanged
+    Load breaks from Firebase into a BreakCalendar for date calculations.
+
+    Args:
+        breaks_last_updated (str): The breaks last_updated timestamp, used as cache key.
+
+    Returns:
+        BreakCalendar: Parsed, merged break intervals.
     """
-    clean = {}
-    for k, v in row.items():
-        if v is None or (isinstance(v, float) and np.isnan(v)) or v is pd.NA:
-            clean[k] = ""
-        elif isinstance(v, pd.Timestamp):
-            clean[k] = v.strftime("%Y-%m-%d")  # <- convert to string
-        else:
-            clean[k] = v
-    return clean
+    return BreakCalendar(parse_breaks(load_breaks_from_db()))
+
+def load_break_calendar() -> BreakCalendar:
+    """The BreakCalendar for the current breaks version; fetched at most once per version."""
+    return load_break_calendar_version(get_last_updated('breaks'))
 
 def save_new_module_to_db(user_email: str, module_data: dict) -> str:
     """
@@ -603,54 +515,117 @@ def transform_module_input(raw: dict) -> dict:
         # firebase_key will be added AFTER saving to Firebase, if needed
     }
 
-def sync_firebase_updates(df_old: pd.DataFrame, df_new: pd.DataFrame):
+def update_module_to_db(course_id: str, firebase_key: str, module_data: dict):
+    try:
+        db.child("modules").child(course_id).child(firebase_key).update(module_data)
+        admin_set_last_updated('modules', course_id)
+    except Exception as e:
+        st.error(f"Error al actualizar el módulo: {str(e)}")
+
+def admin_save_module_dates(course_id: str, dates_by_key: dict) -> bool:
     """
-    Syncs changes between old and new DataFrames to Firebase:
-    - Deletes removed rows
-    - Updates modified rows
-    - Does NOT add new rows
+    Save recalculated module dates with a single root-level multi-path update.
+
+    fecha_inicio_1/fecha_fin_1 of every module and metadata/modules/<course>/last_updated
+    are written together.
 
     Args:
-        df_old (pd.DataFrame): Original DataFrame with firebase_key
-        df_new (pd.DataFrame): Edited DataFrame with firebase_key
+        course_id (str): The course key under modules/ (e.g. "cba2@iti,edu")
+        dates_by_key (dict): {firebase_key: (start date, end date)}
+
+    Returns:
+        bool: True if the update was written (or there was nothing to write)
+    """
+    if not dates_by_key:
+        return True
+    safe_email = course_id.replace('.', ',')
+    now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    updates = {}
+    for firebase_key, (start_date, end_date) in dates_by_key.items():
+        updates[f"modules/{course_id}/{firebase_key}/fecha_inicio_1"] = start_date.strftime('%Y-%m-%d')
+        updates[f"modules/{course_id}/{firebase_key}/fecha_fin_1"] = end_date.strftime('%Y-%m-%d')
+    updates[f"metadata/modules/{safe_email}/last_updated"] = now_iso
+    try:
+        db.update(updates)
+    except Exception as e:
+        st.error(f"Error al actualizar las fechas de {len(dates_by_key)} módulo(s): {str(e)}")
+        return False
+    record_last_updated('modules', now_iso, course_id)
+    return True
+
+def is_missing_firebase_key(value) -> bool:
+    return value is None or (not isinstance(value, str) and pd.isna(value)) or value in ["", "None"]
+
+def module_sync_changes(old_df: pd.DataFrame, new_df: pd.DataFrame, generate_key=None) -> dict:
     """
-    # Make sure indexes are clean
-    df_old = df_old.reset_index(drop=True)
-    df_new = df_new.reset_index(drop=True)
+    Compute the module adds, updates and deletes between two editor DataFrames.
 
-    # Drop rows without firebase_key
-    df_old = df_old[df_old["firebase_key"] != ""]
-    df_new = df_new[df_new["firebase_key"] != ""]
+    Args:
+        old_df (pd.DataFrame): Modules as last loaded/saved, with display columns and firebase_key
+        new_df (pd.DataFrame): Edited modules; rows without firebase_key are new
+        generate_key (callable, optional): Returns a new push ID; defaults to db.generate_key
 
-    # Find deleted rows
-    old_keys = set(df_old["firebase_key"])
-    new_keys = set(df_new["firebase_key"])
-    deleted_keys = old_keys - new_keys
+    Returns:
+        dict: {'updates': {relative path: value} (deleted modules map to None),
+               'added': {row index: new firebase_key}, 'updated': [keys], 'deleted': [keys]}
+    """
+    generate_key = generate_key or db.generate_key
+    old_records = dataframe_to_records_by_index(old_df, null_value="")
+    new_records = dataframe_to_records_by_index(new_df, null_value="")
+    old_by_key = {
+        str(record['firebase_key']): record
+        for record in old_records.values()
+        if not is_missing_firebase_key(record.get('firebase_key'))
+    }
 
-    for key in deleted_keys:
-        try:
-            db.child("modules").child(key).delete()
-        except Exception as e:
-            print(f"Error deleting {key}: {e}")
+    updates, added, updated, seen = {}, {}, [], set()
+    for index, record in new_records.items():
+        firebase_key = record.get('firebase_key')
+        if is_missing_firebase_key(firebase_key):
+            firebase_key = generate_key()
+            added[index] = firebase_key
+            updates[firebase_key] = transform_module_input(record)
+            continue
+        firebase_key = str(firebase_key)
+        seen.add(firebase_key)
+        old_record = old_by_key.get(firebase_key)
+        if old_record is None or {k: v for k, v in old_record.items() if k != 'firebase_key'} != {k: v for k, v in record.items() if k != 'firebase_key'}:
+            # Field paths keep update() semantics: fields not sent are left untouched
+            for field, value in transform_module_input(record).items():
+                updates[f"{firebase_key}/{field}"] = value
+            updated.append(firebase_key)
 
-    # Find modified rows
-    for key in new_keys:
-        new_row = df_new[df_new["firebase_key"] == key].iloc[0]
-        old_row = df_old[df_old["firebase_key"] == key].iloc[0]
+    deleted = [firebase_key for firebase_key in old_by_key if firebase_key not in seen]
+    for firebase_key in deleted:
+        updates[firebase_key] = None
+    return {'updates': updates, 'added': added, 'updated': updated, 'deleted': deleted}
 
-        if not new_row.equals(old_row):
-            try:
-                clean_data = row_to_clean_dict(new_row)
-                db.child("modules").child(key).update(clean_data)
-            except Exception as e:
-                print(f"Error updating {key}: {e}")
+def admin_sync_modules(course_id: str, old_df: pd.DataFrame, new_df: pd.DataFrame) -> dict:
+    """
+    Save every module add, update and delete of an edit with one root-level multi-path update.
 
-def update_module_to_db(course_id: str, firebase_key: str, module_data: dict):
+    Args:
+        course_id (str): The course key under modules/ (e.g. "cba2@iti,edu")
+        old_df (pd.DataFrame): Modules as last loaded/saved
+        new_df (pd.DataFrame): Edited modules
+
+    Returns:
+        dict: The changes from module_sync_changes, or None if the write failed
+    """
+    changes = module_sync_changes(old_df, new_df)
+    if not changes['updates']:
+        return changes
+    safe_email = course_id.replace('.', ',')
+    now_iso = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    updates = {f"modules/{course_id}/{path}": value for path, value in changes['updates'].items()}
+    updates[f"metadata/modules/{safe_email}/last_updated"] = now_iso
     try:
-        db.child("modules").child(course_id).child(firebase_key).update(module_data)
-        admin_set_last_updated('modules', course_id)
+        db.update(updates)
     except Exception as e:
-        st.error(f"Error al actualizar el módulo: {str(e)}")
+        st.error(f"Error al guardar los módulos: {str(e)}")
+        return None
+    record_last_updated('modules', now_iso, course_id)
+    return changes
 
 def delete_module_from_db(course_id: str, firebase_key: str):
     try:
@@ -659,137 +634,68 @@ def delete_module_from_db(course_id: str, firebase_key: str):
     except Exception as e:
         st.error(f"Error al eliminar el módulo: {str(e)}")
 
+@st.cache_resource(show_spinner=False)
+def get_student_search_index() -> StudentSearchIndex:
+    """Process-wide search index over the students of every course."""
+    return StudentSearchIndex()
+
+def refresh_student_search_index(course_emails: list = None) -> StudentSearchIndex:
+    """
+    Re-index the courses whose students last_updated changed since they were indexed.
+
+    Args:
+        course_emails (list, optional): Courses to refresh. Defaults to every course.
+
+    Returns:
+        StudentSearchIndex: The up-to-date shared index.
+    """
+    index = get_student_search_index()
+    all_courses = load_course_keys()
+    courses = course_emails if course_emails is not None else all_courses
+    # Teacher and admin saves both write metadata/students/<course>/last_updated
+    versions = {course: get_last_updated('students', course) for course in courses}
+    indexed = set(index.courses())
+    # Courses without a timestamp yet have version None, which must still be indexed once
+    stale = [course for course in courses if course not in indexed or index.course_version(course) != versions[course]]
+
+    if len(stale) > 1:
+        # Several courses to (re)build: one read of students/ is cheaper than one per course
+        students_data = db.child("students").get().val() or {}
+        for course in stale:
+            course_data = students_data.get(course) or {}
+            index.refresh_course(course, versions[course], student_records_by_index(course_data.get('data')))
+    elif stale:
+        course = stale[0]
+        raw_data = db.child("students").child(course).child("data").get().val()
+        index.refresh_course(course, versions[course], student_records_by_index(raw_data))
+
+    for course in set(index.courses()) - set(all_courses):
+        index.drop_course(course)
+    return index
+
 def find_students(search_term: str, course_email: str = None, status: str = "in_progress") -> pd.DataFrame:
     """
-    Fetches student data from Firebase, applies name/email search and status filters.
+    Searches students by name, email, phone or canvas_id and applies the status filter,
+    using the shared in-memory index (see student_search.py).
 
     Args:
-        search_term (str): The name or email substring to search for.
+        search_term (str): The substring to search for (case-insensitive).
         course_email (str, optional): The specific course email to filter by.
                                        Defaults to None (search all courses).
         status (str, optional): The enrollment status to filter by ("all", "in_progress", "graduated", "not_started").
-                                Defaults to "all".
+                                Defaults to "in_progress".
 
     Returns:
         pd.DataFrame: A DataFrame of matched students with expected columns.
     """
     try:
-        students_ref = db.child("students")
-
         if course_email == "":
             course_email = None
-
-        raw_students_data = []
-
-        if course_email:
-            # Fetch data for a specific course
-            snapshot = students_ref.child(course_email).child("data").get()
-            if snapshot.val() is not None:
-                # Firebase can return dict (if a single item) or list (if multiple items)
-                # Ensure we handle both cases correctly
-                if isinstance(snapshot.val(), dict):
-                    # If data is a dictionary where keys are student IDs/indices
-                    for student_key, student_data_raw in snapshot.val().items():
-                        if isinstance(student_data_raw, dict):
-                            student_data_raw['course_email'] = course_email # Add course_email
-                            raw_students_data.append(student_data_raw)
-                elif isinstance(snapshot.val(), list):
-                    # If data is a list (e.g., if pushed as an array in Firebase)
-                    for student_data_raw in snapshot.val():
-                        if isinstance(student_data_raw, dict):
-                            student_data_raw['course_email'] = course_email # Add course_email
-                            raw_students_data.append(student_data_raw)
-        else:
-            # Fetch data for all courses
-            all_courses_snapshot = students_ref.get()
-            if all_courses_snapshot.val() is not None:
-                for course_node in all_courses_snapshot.each():
-                    course_key = course_node.key()
-                    course_data_val = course_node.val()
-
-                    if isinstance(course_data_val, dict):
-                        data_node = course_data_val.get("data", {})
-                        if isinstance(data_node, dict):
-                            # Students are dictionaries within "data"
-                            for student_key, student_data_raw in data_node.items():
-                                if isinstance(student_data_raw, dict):
-                                    student_data_raw['course_email'] = course_key
-                                    raw_students_data.append(student_data_raw)
-                        elif isinstance(data_node, list):
-                            # Students are a list within "data"
-                            for student_data_raw in data_node:
-                                if isinstance(student_data_raw, dict):
-                                    student_data_raw['course_email'] = course_key
-                                    raw_students_data.append(student_data_raw)
-
-        # Define expected columns and their default values
-        expected_columns = {
-            'nombre': '',
-            'email': '',
-            'telefono': '',
-            'modulo': '',
-            'fecha_inicio': '',
-            'modulo_fin_name': '',
-            'fecha_fin': '',
-            'course_email': ''
-        }
-
-        # Create DataFrame from raw data, ensuring all expected columns are present
-        if raw_students_data:
-            df = pd.DataFrame(raw_students_data)
-            # Fill missing expected columns with empty strings
-            for col in expected_columns:
-                if col not in df.columns:
-                    df[col] = expected_columns[col]
-            # Ensure column order
-            df = df[list(expected_columns.keys())]
-        else:
-            return pd.DataFrame(columns=list(expected_columns.keys()))
-
-        # Convert date columns to datetime objects for filtering
-        df['_fecha_inicio_dt'] = pd.to_datetime(df['fecha_inicio'], errors='coerce')
-        df['_fecha_fin_dt'] = pd.to_datetime(df['fecha_fin'], errors='coerce')
-        today_dt = pd.Timestamp(datetime.date.today())
-
-        # --- Apply Filters ---
-        filtered_df = df.copy()
-
-        # 1. Apply search_term filter
-        if search_term:
-            search_term_lower = search_term.lower()
-            filtered_df = filtered_df[
-                filtered_df['nombre'].astype(str).str.lower().str.contains(search_term_lower) |
-                filtered_df['email'].astype(str).str.lower().str.contains(search_term_lower)
-            ]
-
-        # 2. Apply status filter
-        if status == "in_progress":
-            filtered_df = filtered_df[
-                (filtered_df['_fecha_inicio_dt'].notna()) &
-                (filtered_df['_fecha_fin_dt'].notna()) &
-                (filtered_df['_fecha_inicio_dt'] <= today_dt) &
-                (filtered_df['_fecha_fin_dt'] >= today_dt)
-            ]
-        elif status == "graduated":
-            filtered_df = filtered_df[
-                (filtered_df['_fecha_fin_dt'].notna()) &
-                (filtered_df['_fecha_fin_dt'] < today_dt)
-            ]
-        elif status == "not_started":
-            filtered_df = filtered_df[
-                (filtered_df['_fecha_inicio_dt'].notna()) &
-                (filtered_df['_fecha_inicio_dt'] > today_dt)
-            ]
-        # No 'else' needed for "all" as it means no status filtering applied
-
-        return filtered_df.drop(columns=['_fecha_inicio_dt', '_fecha_fin_dt'], errors='ignore')
-
+        index = refresh_student_search_index([course_email] if course_email else None)
+        return index.search(search_term, course_email, status)
     except Exception as e:
-        # It's better to log the full traceback for debugging in production
-        # import traceback
-        # st.error(f"Error al buscar estudiantes: {e}\n{traceback.format_exc()}")
         st.error(f"Error al buscar estudiantes: {e}")
-        return pd.DataFrame(columns=list(expected_columns.keys())) # Ensure expected_columns is defined or passed
+        return pd.DataFrame(columns=RESULT_COLUMNS)
 
 # students
 #     cba2@iti,edu